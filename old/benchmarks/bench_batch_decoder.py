@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Batch decoder throughput
+
+Decodes N recorded-style snapshots (read plan blocks concatenated per row)
+with the vectorized stateless decoder and the sequential Mother Brain pass,
+and compares against parse_complete_game_state one snapshot at a time.
+
+Usage: python bench_batch_decoder.py [snapshots]
+"""
+
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+import numpy as np
+
+from batch_decoder import decode_batch, mother_brain_pass, plan_layout
+from game_state_parser import SuperMetroidGameStateParser
+from read_plan import ReadPlan, GAME_STATE_FIELDS
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    logging.disable(logging.INFO)
+    plan = ReadPlan(GAME_STATE_FIELDS)
+    layout = plan_layout(plan)
+    row_size = sum(block.size for block in plan.blocks)
+    frames = np.random.default_rng(1).integers(0, 256, size=(count, row_size), dtype=np.uint8)
+
+    start = time.perf_counter()
+    columns = decode_batch(frames, layout)
+    stateless = time.perf_counter() - start
+
+    sample = min(count, 20000)
+    start = time.perf_counter()
+    mother_brain_pass(decode_batch(frames[:sample], layout))
+    mb_pass = time.perf_counter() - start
+
+    parser = SuperMetroidGameStateParser()
+    rows = [row.tobytes() for row in frames[:sample]]
+    start = time.perf_counter()
+    for data in rows:
+        blocks, offset = [], 0
+        for block in plan.blocks:
+            blocks.append(data[offset:offset + block.size])
+            offset += block.size
+        parser.parse_complete_game_state(plan.slice_blocks(blocks))
+    sequential = time.perf_counter() - start
+
+    print(f"rows: {count} x {row_size} bytes")
+    print(f"stateless batch decode: {count / stateless / 1e6:8.2f} M snapshots/s")
+    print(f"batch + MB pass:        {sample / mb_pass / 1e3:8.1f} k snapshots/s")
+    print(f"per-snapshot parser:    {sample / sequential / 1e3:8.1f} k snapshots/s")
+    print(f"columns: {len(columns['items'])} items, {len(columns['beams'])} beams, {len(columns['bosses'])} bosses")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Mother Brain state machine cost
+
+Replays a recorded-style input sequence (approach, MB1, MB2, escape) through
+MotherBrainFSM from a snapshot and compares a single transition with a full
+parse_bosses call on the same poll.
+
+Usage: python bench_mb_fsm.py [iterations]
+"""
+
+import os
+import struct
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from game_state_parser import SuperMetroidGameStateParser
+from mother_brain_fsm import MBInputs, MotherBrainFSM, mb_inputs
+
+MB_ROOM = dict(area_id=5, room_id=56664, missiles=40, max_missiles=135, health=300, max_health=999)
+SEQUENCE = ([MBInputs(area_id=5, room_id=1000)] * 20 +
+            [MBInputs(boss_hp_3=45000, **MB_ROOM)] * 50 +
+            [MBInputs(official_hp=18000, boss_hp_3=45000, **MB_ROOM)] +
+            [MBInputs(boss_hp_3=12000, boss_plus_1=0x0703, **MB_ROOM)] * 50 +
+            [MBInputs(official_hp=36000, **MB_ROOM)] +
+            [MBInputs(area_id=5, room_id=56867, escape_timer=True, escape_timer_primary=True)] * 50)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    fsm = MotherBrainFSM()
+    start = fsm.snapshot()
+
+    def replay():
+        fsm.restore(start)
+        for inputs in SEQUENCE:
+            fsm.step(inputs)
+
+    replay_us = timeit.timeit(replay, number=iterations) / iterations / len(SEQUENCE) * 1e6
+
+    word = lambda value: struct.pack('<H', value)
+    memory = {'main_bosses': word(0x0104), 'boss_plus_1': word(0x0703), 'boss_hp_3': word(12000),
+              'mother_brain_official_hp': word(0)}
+    location = dict(MB_ROOM, beams={})
+    parser = SuperMetroidGameStateParser()
+    n = iterations * 10
+    inputs_us = timeit.timeit(lambda: mb_inputs(memory, location), number=n) / n * 1e6
+    parse_us = timeit.timeit(lambda: parser.parse_bosses(memory, location), number=n) / n * 1e6
+
+    print(f"MB transition (replay, {len(SEQUENCE)} polls): {replay_us:8.2f} µs/poll")
+    print(f"MB input vector decode:                 {inputs_us:8.2f} µs")
+    print(f"parse_bosses (rules + MB + ship):        {parse_us:8.2f} µs")
+    print(f"phase: {fsm.phase}, last transitions: {[t.target for t in list(fsm.history)[-5:]]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Parser cost baseline
+
+Polls a memory-mapped WRAM file through MmapWramBackend so there is no
+network or decode noise, and reports how a poll splits between reading the
+read plan and parse_complete_game_state.
+
+Usage: python bench_parse_baseline.py [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from file_backends import MmapWramBackend
+from game_state_parser import SuperMetroidGameStateParser
+from read_plan import ReadPlan, GAME_STATE_FIELDS
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'wram.bin')
+        with open(path, 'wb') as f:
+            f.write(bytes((i * 13 + 5) & 0xFF for i in range(0x20000)))
+
+        backend = MmapWramBackend(path)
+        backend.connect()
+        plan = ReadPlan(GAME_STATE_FIELDS)
+        parser = SuperMetroidGameStateParser()
+        memory_data = plan.execute(backend)
+
+        read_us = timeit.timeit(lambda: plan.execute(backend), number=iterations) / iterations * 1e6
+        parse_us = timeit.timeit(lambda: parser.parse_complete_game_state(memory_data),
+                                 number=iterations) / iterations * 1e6
+        del memory_data
+        backend.close()
+
+    print(f"read plan (mmap): {read_us:8.2f} us/poll")
+    print(f"parse:            {parse_us:8.2f} us/poll")
+    print(f"total:            {read_us + parse_us:8.2f} us/poll")
+
+
+if __name__ == '__main__':
+    main()
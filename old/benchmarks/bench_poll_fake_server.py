@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Poll latency benchmark against the fake RetroArch server
+
+Runs the poller's full read plan through RetroArchUDPReader against a local
+FakeRetroArchServer under a few network profiles and reports per-poll
+latency percentiles and failed polls.
+
+Usage: python bench_poll_fake_server.py [polls]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from fake_retroarch_server import FakeRetroArchServer, FaultProfile, WramImageSource
+from read_plan import ReadPlan, GAME_STATE_FIELDS
+from retroarch_backend import RetroArchUDPReader
+
+PROFILES = {
+    'clean': FaultProfile(seed=1),
+    'lan': FaultProfile(latency=0.0005, jitter=0.0005, seed=1),
+    'lossy': FaultProfile(latency=0.001, jitter=0.002, loss=0.02, seed=1),
+    'hostile': FaultProfile(latency=0.002, jitter=0.004, loss=0.05, duplicate=0.05, reorder=0.1, seed=1),
+}
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def main():
+    polls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    image = bytes((i * 13 + 5) & 0xFF for i in range(0x20000))
+    plan = ReadPlan(GAME_STATE_FIELDS)
+
+    print(f"{len(plan.blocks)} blocks per poll, {polls} polls per profile")
+    print(f"{'profile':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'failed':>7}")
+    for name, faults in PROFILES.items():
+        with FakeRetroArchServer(WramImageSource(image), faults=faults) as server:
+            reader = RetroArchUDPReader('127.0.0.1', server.port)
+            samples = []
+            failed = 0
+            for _ in range(polls):
+                start = time.perf_counter()
+                memory_data = plan.execute(reader)
+                samples.append((time.perf_counter() - start) * 1000)
+                if len(memory_data) != len(GAME_STATE_FIELDS):
+                    failed += 1
+            reader.close()
+        print(f"{name:>8} {percentile(samples, 0.5):8.2f} {percentile(samples, 0.95):8.2f} "
+              f"{max(samples):8.2f} {failed:7d}")
+
+
+if __name__ == '__main__':
+    main()
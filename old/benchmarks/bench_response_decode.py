@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+READ_CORE_MEMORY decode microbenchmark
+
+Compares the original string path (decode/strip/split/replace/fromhex) with
+ReadReplyDecoder for the reply sizes the poller actually requests. "assign"
+is what PipelinedUDPEngine does per chunk: decode() plus one slice
+assignment into the reassembly buffer.
+
+Usage: python bench_response_decode.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from response_decoder import ReadReplyDecoder
+
+SIZES = [2, 22, 118, 256, 330]
+
+
+def legacy_decode(data: bytes):
+    """The pre-decoder path from RetroArchUDPReader.read_memory_range"""
+    response = data.decode().strip()
+    if not response.startswith("READ_CORE_MEMORY"):
+        return None
+    parts = response.split(' ', 2)
+    if len(parts) < 3:
+        return None
+    return bytes.fromhex(parts[2].replace(' ', ''))
+
+
+def make_reply(address: int, size: int) -> bytes:
+    payload = ' '.join(f'{(i * 7) & 0xFF:02x}' for i in range(size))
+    return f"READ_CORE_MEMORY {address:x} {payload}\n".encode()
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    decoder = ReadReplyDecoder()
+    print(f"📊 READ_CORE_MEMORY decode, {iterations} iterations per size")
+    print(f"{'size':>6} {'legacy µs':>10} {'decode µs':>10} {'assign µs':>10} {'speedup':>8}")
+
+    for size in SIZES:
+        address = 0x7E0900
+        reply = make_reply(address, size)
+        nbytes = len(reply)
+        decoder.buffer[:nbytes] = reply
+        dest = memoryview(bytearray(size))
+        assert legacy_decode(reply) == decoder.decode(nbytes, address)
+
+        # The legacy path receives a fresh bytes object per datagram, the
+        # decoder reads from its preallocated buffer - neither includes recv
+        legacy = timeit.timeit(lambda: legacy_decode(reply), number=iterations)
+        decoded = timeit.timeit(lambda: decoder.decode(nbytes, address), number=iterations)
+
+        def decode_and_assign():
+            dest[:] = decoder.decode(nbytes, address)
+        assign = timeit.timeit(decode_and_assign, number=iterations)
+
+        per_call = 1e6 / iterations
+        print(f"{size:>6} {legacy * per_call:>10.2f} {decoded * per_call:>10.2f} "
+              f"{assign * per_call:>10.2f} {legacy / decoded:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
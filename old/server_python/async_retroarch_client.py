@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Asyncio RetroArch Network Command Client
+
+asyncio-native counterpart to RetroArchUDPReader, built on
+loop.create_datagram_endpoint. Every request gets its own future and timeout,
+and replies are routed back to the waiting future by the command name (and,
+for READ_CORE_MEMORY, the echoed address), so any number of reads can be
+outstanding on one socket inside a single event loop.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from udp_command_engine import READ_CORE_MEMORY, parse_read_reply
+
+logger = logging.getLogger(__name__)
+
+ReplyKey = Tuple
+
+
+def reply_key(response: str) -> ReplyKey:
+    """Routing key for a reply line - must match request_key for its command"""
+    if response.startswith(READ_CORE_MEMORY):
+        address, _ = parse_read_reply(response)
+        return (READ_CORE_MEMORY, address)
+    if response.startswith("GET_STATUS"):
+        return ("GET_STATUS",)
+    # VERSION replies are a bare version string
+    return ("VERSION",)
+
+
+def request_key(command: str) -> ReplyKey:
+    """Routing key for an outgoing command"""
+    parts = command.split(' ')
+    if parts[0] == READ_CORE_MEMORY:
+        return (READ_CORE_MEMORY, int(parts[1], 16))
+    return (parts[0],)
+
+
+class RetroArchDatagramProtocol(asyncio.DatagramProtocol):
+    """Hands every datagram to the owning client for routing"""
+
+    def __init__(self, client: 'AsyncRetroArchClient'):
+        self.client = client
+
+    def datagram_received(self, data: bytes, addr):
+        self.client._on_datagram(data)
+
+    def error_received(self, exc: Exception):
+        # ICMP port unreachable etc. - requests will simply time out and retry
+        logger.debug(f"UDP error received: {exc}")
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.client._on_connection_lost(exc)
+
+
+class AsyncRetroArchClient:
+    """Concurrent RetroArch UDP client with per-request futures and timeouts"""
+
+    def __init__(self, host: str = "localhost", port: int = 55355, timeout: float = 1.0,
+                 max_retries: int = 1, max_in_flight: int = 16):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_in_flight = max_in_flight
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self._waiters: Dict[ReplyKey, Deque[asyncio.Future]] = {}
+        self._in_flight: Optional[asyncio.Semaphore] = None
+
+    async def connect(self) -> bool:
+        """Create the datagram endpoint (idempotent)"""
+        if self.transport is not None:
+            return True
+        loop = asyncio.get_running_loop()
+        try:
+            self.transport, _ = await loop.create_datagram_endpoint(
+                lambda: RetroArchDatagramProtocol(self),
+                remote_addr=(self.host, self.port))
+        except OSError as e:
+            logger.error(f"UDP endpoint creation failed: {e}")
+            return False
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        return True
+
+    async def close(self):
+        """Close the endpoint and fail anything still waiting"""
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        self._fail_waiters(ConnectionError("client closed"))
+
+    async def __aenter__(self) -> 'AsyncRetroArchClient':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _on_datagram(self, data: bytes):
+        response = data.decode(errors='replace').strip()
+        waiters = self._waiters.get(reply_key(response))
+        while waiters:
+            future = waiters.popleft()
+            if not future.done():
+                future.set_result(response)
+                return
+        logger.debug(f"Discarding unmatched UDP reply: {response[:40]}")
+
+    def _on_connection_lost(self, exc: Optional[Exception]):
+        self.transport = None
+        self._fail_waiters(exc or ConnectionError("connection lost"))
+
+    def _fail_waiters(self, exc: Exception):
+        for waiters in self._waiters.values():
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(exc)
+        self._waiters.clear()
+
+    async def send_command(self, command: str) -> Optional[str]:
+        """Send one command and await its reply; None after timeout and retries"""
+        if not await self.connect():
+            return None
+
+        key = request_key(command)
+        loop = asyncio.get_running_loop()
+
+        async with self._in_flight:
+            for attempt in range(self.max_retries + 1):
+                if self.transport is None:
+                    return None
+                future = loop.create_future()
+                self._waiters.setdefault(key, deque()).append(future)
+                self.transport.sendto(command.encode())
+                try:
+                    return await asyncio.wait_for(future, self.timeout)
+                except asyncio.TimeoutError:
+                    logger.debug(f"UDP timeout for command: {command} (attempt {attempt + 1})")
+                except ConnectionError as e:
+                    logger.debug(f"UDP error for command {command}: {e}")
+                    return None
+                finally:
+                    waiters = self._waiters.get(key)
+                    if waiters and future in waiters:
+                        waiters.remove(future)
+        return None
+
+    async def read_memory_range(self, start_address: int, size: int) -> Optional[bytes]:
+        """Read memory range from RetroArch"""
+        response = await self.send_command(f"{READ_CORE_MEMORY} 0x{start_address:X} {size}")
+        if not response:
+            return None
+        _, data = parse_read_reply(response)
+        return data
+
+    async def read_many(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """Read every (address, size) range concurrently; results in request order"""
+        return list(await asyncio.gather(
+            *(self.read_memory_range(address, size) for address, size in ranges)))
+
+    async def get_status(self) -> Optional[str]:
+        """GET_STATUS reply line, e.g. 'GET_STATUS PLAYING super_nes,Super Metroid,crc32=...'"""
+        return await self.send_command("GET_STATUS")
+
+    async def version(self) -> Optional[str]:
+        """RetroArch version string"""
+        return await self.send_command("VERSION")
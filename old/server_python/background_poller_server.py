@@ -7,143 +7,60 @@ NEW ARCHITECTURE:
 - HTTP server serves cached data instantly  
 - No blocking, no request flooding, much more stable
 
-Usage: python background_poller_server.py
+Usage: python background_poller_server.py [--backend=retroarch|qusb2snes|mesen|file|replay] [--http-workers=N]
 """
 
 import json
-import socket
-import struct
+import os
 import time
 import logging
 import threading
 import queue
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from typing import Dict, Any, Optional
+from collections import deque
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, Any, List, Optional
 import sys
 import signal
 
 from game_state_parser import SuperMetroidGameStateParser
+from read_plan import ReadPlan, GAME_STATE_FIELDS, BOSS_FIELD_NAMES, DEFAULT_GAP_TOLERANCE
+from emulator_backend import EmulatorBackend, create_backend, parse_backend_config
+from retroarch_backend import RetroArchUDPReader
+from logging_setup import logging_stats, setup_logging
+from pooled_http_server import DEFAULT_WORKERS, KEEP_ALIVE_TIMEOUT, PooledHTTPServer, PooledRequestHandler
+from json_views import JsonView, ViewStore, etag_matches
+from snapshot import GameSnapshot
+from wram_mirror import WramMirror, WRAM_BASE, WRAM_SIZE
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('background_poller.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
-class RetroArchUDPReader:
-    """Handles UDP communication with RetroArch - separated from parsing logic"""
-    
-    def __init__(self, host="localhost", port=55355):
-        self.host = host
-        self.port = port
-        self.sock = None
-        self.last_connection_attempt = 0
-        self.connection_retry_delay = 5  # seconds
-        
-    def connect(self) -> bool:
-        """Connect to RetroArch UDP interface"""
-        try:
-            if self.sock:
-                self.sock.close()
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            self.sock.settimeout(1.0)  # Fast timeout for background polling
-            return True
-        except Exception as e:
-            logger.error(f"UDP connection failed: {e}")
-            return False
-    
-    def send_command(self, command: str) -> Optional[str]:
-        """Send single command to RetroArch"""
-        if not self.sock:
-            if not self.connect():
-                return None
-                
-        try:
-            # Clear any pending data
-            self.sock.settimeout(0.1)
-            try:
-                while True:
-                    self.sock.recv(1024)
-            except socket.timeout:
-                pass
-                
-            # Send command
-            self.sock.settimeout(1.0)
-            self.sock.sendto(command.encode(), (self.host, self.port))
-            data, addr = self.sock.recvfrom(1024)
-            return data.decode().strip()
-            
-        except socket.timeout:
-            logger.debug(f"UDP timeout for command: {command}")
-            return None
-        except Exception as e:
-            logger.debug(f"UDP error for command {command}: {e}")
-            return None
-    
-    def read_memory_range(self, start_address: int, size: int) -> Optional[bytes]:
-        """Read memory range from RetroArch"""
-        command = f"READ_CORE_MEMORY 0x{start_address:X} {size}"
-        response = self.send_command(command)
-        
-        if not response or not response.startswith("READ_CORE_MEMORY"):
-            return None
-            
-        try:
-            parts = response.split(' ', 2)
-            if len(parts) < 3:
-                return None
-            hex_data = parts[2].replace(' ', '')
-            return bytes.fromhex(hex_data)
-        except ValueError:
-            return None
-    
-    def is_game_loaded(self) -> bool:
-        """Check if Super Metroid is loaded"""
-        response = self.send_command("GET_STATUS")
-        if response and "PLAYING" in response:
-            response_lower = response.lower()
-            if "super metroid" in response_lower:
-                return True
-            # Check for ROM hacks and randomizers
-            rom_hack_keywords = [
-                "metroid", "samus", "zebes", "crateria", "norfair", "maridia",
-                "map rando", "rando", "randomizer", "random", "sm ", "super_metroid"
-            ]
-            return any(keyword in response_lower for keyword in rom_hack_keywords)
-        return False
-    
-    def get_retroarch_info(self) -> Dict[str, Any]:
-        """Get RetroArch connection info"""
-        version = self.send_command("VERSION")
-        status = self.send_command("GET_STATUS")
-        
-        return {
-            'connected': version is not None,
-            'retroarch_version': version,
-            'game_info': status,
-            'game_loaded': self.is_game_loaded()
-        }
+DEFAULT_HISTORY_SIZE = 1000
+# Counters that change on every poll - served in the status view but left out
+# of its version, so its ETag only changes with the game state or connection
+POLL_COUNTERS = ('last_update', 'poll_count')
 
 class BackgroundGamePoller:
     """Background thread that polls game state and updates cache"""
     
-    def __init__(self, update_interval=2.5):
+    def __init__(self, update_interval=2.5, read_gap_tolerance=DEFAULT_GAP_TOLERANCE, connection_ttl=5.0,
+                 backend: Optional[EmulatorBackend] = None, history_size=DEFAULT_HISTORY_SIZE):
         self.update_interval = update_interval
-        self.udp_reader = RetroArchUDPReader()
+        self.backend = backend if backend is not None else RetroArchUDPReader(info_ttl=connection_ttl)
         self.parser = SuperMetroidGameStateParser()
+        self.read_plan = ReadPlan(GAME_STATE_FIELDS, gap_tolerance=read_gap_tolerance)
+        self.wram_mirror = WramMirror()
+        self.boss_read_plan = self.read_plan.subset(BOSS_FIELD_NAMES)
         self.cache = {
-            'game_state': {},
+            'game_state': None,  # latest GameSnapshot
+            'history': deque(maxlen=history_size),  # snapshots where the game state changed
             'connection_info': {},
             'last_update': 0,
             'poll_count': 0,
             'error_count': 0
         }
         self.cache_lock = threading.Lock()
+        # Served views, serialized once per poll (see json_views.py)
+        self.views = ViewStore()
         self.running = False
         self.thread = None
         self.bootstrap_attempted = False  # Track if we've tried bootstrapping MB cache
@@ -163,22 +80,71 @@ class BackgroundGamePoller:
         self.running = False
         if self.thread:
             self.thread.join(timeout=5)
+        self.backend.close()
         logger.info("🛑 Background poller stopped")
     
     def get_cached_state(self) -> Dict[str, Any]:
         """Get current cached game state"""
         with self.cache_lock:
-            return {
+            snapshot = self.cache['game_state']
+            cached_state = {
                 'connected': self.cache['connection_info'].get('connected', False),
                 'game_loaded': self.cache['connection_info'].get('game_loaded', False),
                 'retroarch_version': self.cache['connection_info'].get('retroarch_version'),
                 'game_info': self.cache['connection_info'].get('game_info'),
-                'stats': self.cache['game_state'],
+                'stats': snapshot,
+                'last_update': self.cache['last_update'],
+                'poll_count': self.cache['poll_count'],
+                'error_count': self.cache['error_count']
+            }
+        # Snapshots are immutable - expand to the dict shape outside the lock
+        cached_state['stats'] = snapshot.to_dict() if snapshot else {}
+        return cached_state
+    
+    def get_poll_stats(self) -> Dict[str, Any]:
+        """Per-poll counters (current even when /api/status answers 304)"""
+        with self.cache_lock:
+            return {
                 'last_update': self.cache['last_update'],
                 'poll_count': self.cache['poll_count'],
                 'error_count': self.cache['error_count']
             }
     
+    def get_view(self, name: str) -> JsonView:
+        """Pre-serialized view ('status' or 'stats') for the latest poll"""
+        view = self.views.get(name)
+        if view is None:  # Nothing published before the first poll
+            self._publish_views()
+            view = self.views.get(name)
+        return view
+    
+    def _publish_views(self):
+        """Serialize what the cache-serving endpoints return; unchanged views keep their ETag"""
+        cached_state = self.get_cached_state()
+        self.views.publish('status', cached_state,
+                           version_key={key: value for key, value in cached_state.items() if key not in POLL_COUNTERS})
+        self.views.publish('stats', cached_state['stats'] or {'error': 'No game data available'})
+    
+    def get_snapshot(self) -> Optional[GameSnapshot]:
+        """Latest game state snapshot (None before the first valid read)"""
+        with self.cache_lock:
+            return self.cache['game_state']
+    
+    def get_history(self, limit: Optional[int] = None) -> List[GameSnapshot]:
+        """Snapshots where the game state changed, oldest first (the last `limit` if given)"""
+        with self.cache_lock:
+            history = list(self.cache['history'])
+        return history[-limit:] if limit else history
+    
+    def _store_snapshot(self, game_state: Dict[str, Any], now: float):
+        """Pack a parsed game state into the cache (call with cache_lock held)"""
+        snapshot = GameSnapshot.from_game_state(game_state, now, self.cache['poll_count'] + 1)
+        # An unchanged poll keeps the existing snapshot and adds no history
+        if snapshot.same_state(self.cache['game_state']):
+            return
+        self.cache['game_state'] = snapshot
+        self.cache['history'].append(snapshot)
+    
     def _poll_loop(self):
         """Main polling loop - runs in background thread"""
         logger.info("📡 Starting background polling loop...")
@@ -187,8 +153,11 @@ class BackgroundGamePoller:
             try:
                 start_time = time.time()
                 
+                # Apply tracker commands queued by HTTP handlers (even while disconnected)
+                self.parser.tracker.apply_pending()
+                
                 # Get connection info
-                connection_info = self.udp_reader.get_retroarch_info()
+                connection_info = self.backend.connection_info()
                 
                 # Read game state if game is loaded
                 game_state = {}
@@ -202,11 +171,13 @@ class BackgroundGamePoller:
                 
                 # Update cache atomically
                 with self.cache_lock:
+                    now = time.time()
                     self.cache['connection_info'] = connection_info
                     if game_state:  # Only update if we got valid data
-                        self.cache['game_state'] = game_state
-                    self.cache['last_update'] = time.time()
+                        self._store_snapshot(game_state, now)
+                    self.cache['last_update'] = now
                     self.cache['poll_count'] += 1
+                self._publish_views()
                 
                 poll_duration = time.time() - start_time
                 logger.debug(f"Poll completed in {poll_duration:.2f}s")
@@ -221,107 +192,16 @@ class BackgroundGamePoller:
                 time.sleep(1)  # Brief pause on error
     
     def _read_game_state(self) -> Dict[str, Any]:
-        """Read complete game state via bulk memory operations"""
+        """Refresh the WRAM mirror and parse the game state out of it (see wram_mirror.py)"""
         try:
-            # BULK READ: Get all basic stats in one 22-byte read
-            basic_stats = self.udp_reader.read_memory_range(0x7E09C2, 22)
-            
-            # Individual reads for other data
-            room_id = self.udp_reader.read_memory_range(0x7E079B, 2)
-            area_id = self.udp_reader.read_memory_range(0x7E079F, 1)  # FIXED: Use standard area address (0x7E079F)
-            game_state = self.udp_reader.read_memory_range(0x7E0998, 2)
-            player_x = self.udp_reader.read_memory_range(0x7E0AF6, 2)
-            player_y = self.udp_reader.read_memory_range(0x7E0AFA, 2)
-            items = self.udp_reader.read_memory_range(0x7E09A4, 2)
-            beams = self.udp_reader.read_memory_range(0x7E09A8, 2)
-            
-            # Boss memory (multiple addresses for advanced detection)
-            main_bosses = self.udp_reader.read_memory_range(0x7ED828, 2)
-            crocomire = self.udp_reader.read_memory_range(0x7ED829, 2)
-            boss_plus_1 = self.udp_reader.read_memory_range(0x7ED829, 2)  # Fixed: was 0x7ED82A
-            boss_plus_2 = self.udp_reader.read_memory_range(0x7ED82A, 2)  # Fixed: was 0x7ED82B
-            boss_plus_3 = self.udp_reader.read_memory_range(0x7ED82B, 2)  # Fixed: was 0x7ED82C
-            boss_plus_4 = self.udp_reader.read_memory_range(0x7ED82C, 2)  # Added
-            boss_plus_5 = self.udp_reader.read_memory_range(0x7ED82D, 2)
-            
-            # Escape timer for MB2 detection (multiple addresses to try)
-            escape_timer_1 = self.udp_reader.read_memory_range(0x7E0943, 2)  # Common escape timer location
-            escape_timer_2 = self.udp_reader.read_memory_range(0x7E0945, 2)  # Alternative location
-            escape_timer_3 = self.udp_reader.read_memory_range(0x7E09E2, 2)  # Another possible location
-            escape_timer_4 = self.udp_reader.read_memory_range(0x7E09E0, 2)  # Another possible location
-            escape_timer_5 = self.udp_reader.read_memory_range(0x7E0947, 2)  # Sequential check
-            escape_timer_6 = self.udp_reader.read_memory_range(0x7E0949, 2)  # Sequential check
-            
-            # ADDITIONAL ESCAPE TIMER ADDRESSES - commonly known locations
-            escape_timer_7 = self.udp_reader.read_memory_range(0x7E0911, 2)  # Known timer location
-            escape_timer_8 = self.udp_reader.read_memory_range(0x7E0913, 2)  # Alternative timer  
-            escape_timer_9 = self.udp_reader.read_memory_range(0x7E0915, 2)  # Sequential
-            escape_timer_10 = self.udp_reader.read_memory_range(0x7E0917, 2) # Sequential
-            escape_timer_11 = self.udp_reader.read_memory_range(0x7E0919, 2) # Sequential
-            escape_timer_12 = self.udp_reader.read_memory_range(0x7E0921, 2) # Different block
-            
-            # MEMORY SCAN - Look for any non-zero timers in common areas
-            scan_090x = self.udp_reader.read_memory_range(0x7E0900, 32)  # Scan 0x900-0x91F
-            scan_094x = self.udp_reader.read_memory_range(0x7E0940, 32)  # Scan 0x940-0x95F  
-            scan_09Ex = self.udp_reader.read_memory_range(0x7E09E0, 32)  # Scan 0x9E0-0x9FF
-            
-            # Boss HP for direct detection (MB room boss HP)
-            boss_hp_1 = self.udp_reader.read_memory_range(0x7E0F8C, 2)  # Common boss HP location
-            boss_hp_2 = self.udp_reader.read_memory_range(0x7E0F8E, 2)  # Alternative boss HP
-            boss_hp_3 = self.udp_reader.read_memory_range(0x7E1000, 2)  # Another potential location
-            
-            # OFFICIAL AUTOSPLITTER ADDRESS: Mother Brain HP for phase detection
-            mother_brain_official_hp = self.udp_reader.read_memory_range(0x7E0FCC, 2)
-            
-            # OFFICIAL AUTOSPLITTER ADDRESSES: Ship detection
-            ship_ai = self.udp_reader.read_memory_range(0x7E0FB2, 2)    # Ship AI state
-            event_flags = self.udp_reader.read_memory_range(0x7ED821, 1) # Event flags (zebesAblaze)
-            
-            # Game state (escape sequence often changes game state)
-            game_state_extended = self.udp_reader.read_memory_range(0x7E0998, 2)
-            
-            # Package all memory data
-            memory_data = {
-                'basic_stats': basic_stats,
-                'room_id': room_id,
-                'area_id': area_id,
-                'game_state': game_state,
-                'player_x': player_x,
-                'player_y': player_y,
-                'items': items,
-                'beams': beams,
-                'main_bosses': main_bosses,
-                'crocomire': crocomire,
-                'boss_plus_1': boss_plus_1,
-                'boss_plus_2': boss_plus_2,
-                'boss_plus_3': boss_plus_3,
-                'boss_plus_4': boss_plus_4,
-                'boss_plus_5': boss_plus_5,
-                'escape_timer_1': escape_timer_1,
-                'escape_timer_2': escape_timer_2,
-                'escape_timer_3': escape_timer_3,
-                'escape_timer_4': escape_timer_4,
-                'escape_timer_5': escape_timer_5,
-                'escape_timer_6': escape_timer_6,
-                'escape_timer_7': escape_timer_7,
-                'escape_timer_8': escape_timer_8,
-                'escape_timer_9': escape_timer_9,
-                'escape_timer_10': escape_timer_10,
-                'escape_timer_11': escape_timer_11,
-                'escape_timer_12': escape_timer_12,
-                'scan_090x': scan_090x,
-                'scan_094x': scan_094x,
-                'scan_09Ex': scan_09Ex,
-                'boss_hp_1': boss_hp_1,
-                'boss_hp_2': boss_hp_2,
-                'boss_hp_3': boss_hp_3,
-                'mother_brain_official_hp': mother_brain_official_hp,
-                
-                # Official autosplitter ship detection
-                'ship_ai': ship_ai,
-                'event_flags': event_flags,
-                'game_state_extended': game_state_extended,
-            }
+            # BULK READ: due mirror regions in one pipelined batch, then every
+            # parser field is sliced from the local copy. Zero-copy backends
+            # (mmap) already are local memory and are parsed in place.
+            if self.backend.zero_copy:
+                memory_data = self.read_plan.execute(self.backend)
+            else:
+                self.wram_mirror.refresh(self.backend)
+                memory_data = self.read_plan.execute(self.wram_mirror)
             
             # Parse into structured game state
             parsed_state = self.parser.parse_complete_game_state(memory_data)
@@ -330,12 +210,26 @@ class BackgroundGamePoller:
                 return parsed_state
             else:
                 logger.warning("Invalid game state parsed")
+                # Could be a reset or a different ROM - re-probe next poll
+                self.backend.invalidate_info("invalid game state")
                 return {}
                 
         except Exception as e:
             logger.error(f"Error reading game state: {e}")
             return {}
     
+    def reset_caches(self):
+        """Reset MB tracking, parser memo and the cached state (run on the poll thread)"""
+        self.parser.reset_mb_cache()
+        # Re-run every parser section instead of reusing memoized results
+        self.parser.clear_section_cache()
+        with self.cache_lock:
+            self.cache['game_state'] = None
+        # Re-bootstrap the MB cache on the next read
+        self.bootstrap_attempted = False
+        self._publish_views()
+        logger.info("🔄 MB cache, parser memo and background poller cache cleared")
+    
     def _bootstrap_mb_cache_if_needed(self, game_state: Dict[str, Any]):
         """Bootstrap Mother Brain cache if current state shows MB phases completed"""
         try:
@@ -369,15 +263,7 @@ class BackgroundGamePoller:
                 logger.info("🔄 Attempting to bootstrap MB cache from current state...")
                 
                 # Re-read boss memory to get raw data for bootstrap
-                memory_data = {
-                    'main_bosses': self.udp_reader.read_memory_range(0x7ED828, 2),
-                    'crocomire': self.udp_reader.read_memory_range(0x7ED829, 2),
-                    'boss_plus_1': self.udp_reader.read_memory_range(0x7ED829, 2),
-                    'boss_plus_2': self.udp_reader.read_memory_range(0x7ED82A, 2),
-                    'boss_plus_3': self.udp_reader.read_memory_range(0x7ED82B, 2),
-                    'boss_plus_4': self.udp_reader.read_memory_range(0x7ED82C, 2),
-                    'boss_plus_5': self.udp_reader.read_memory_range(0x7ED82D, 2),
-                }
+                memory_data = self.boss_read_plan.execute(self.backend)
                 
                 # Use parser's bootstrap method
                 self.parser.bootstrap_mb_cache(memory_data, game_state)
@@ -388,9 +274,16 @@ class BackgroundGamePoller:
         except Exception as e:
             logger.error(f"Error during MB cache bootstrap: {e}")
 
-class CacheServingHTTPHandler(BaseHTTPRequestHandler):
+class CacheServingHTTPHandler(PooledRequestHandler):
     """HTTP handler that serves cached data instantly - no UDP blocking"""
     
+    # Keep-alive: overlays polling every second reuse one connection
+    # (every response must carry Content-Length)
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body go out in separate writes - don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+    
     def __init__(self, *args, poller=None, **kwargs):
         self.poller = poller
         super().__init__(*args, **kwargs)
@@ -410,8 +303,26 @@ class CacheServingHTTPHandler(BaseHTTPRequestHandler):
                 self.serve_game_state()
             elif self.path == '/api/stats':
                 self.serve_stats()
+            elif self.path == '/api/udp-timing':
+                self.serve_udp_timing()
+            elif self.path == '/api/wram-stats':
+                self.serve_wram_stats()
+            elif urlparse(self.path).path == '/api/trace':
+                self.serve_trace()
+            elif self.path == '/api/logging-stats':
+                self.serve_logging_stats()
+            elif self.path == '/api/http-stats':
+                self.serve_http_stats()
+            elif self.path == '/api/poll-stats':
+                self.serve_poll_stats()
+            elif urlparse(self.path).path == '/api/wram':
+                self.serve_wram()
             elif self.path == '/api/bootstrap-mb':
                 self.serve_bootstrap_mb()
+            elif urlparse(self.path).path == '/api/history':
+                self.serve_history()
+            elif urlparse(self.path).path == '/api/mb-state':
+                self.serve_mb_state()
             elif self.path == '/api/manual-mb-complete':
                 self.serve_manual_mb_complete()
             elif self.path == '/api/reset-mb-cache':
@@ -431,26 +342,105 @@ class CacheServingHTTPHandler(BaseHTTPRequestHandler):
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', 'http://localhost:3000')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def serve_status(self):
         """Serve status from cache - instant response"""
-        cached_state = self.poller.get_cached_state()
-        self.send_json_response(cached_state)
+        self.send_view('status')
     
     def serve_game_state(self):
         """Serve game state in format expected by React app"""
-        cached_state = self.poller.get_cached_state()
-        self.send_json_response(cached_state)
+        self.send_view('status')
     
     def serve_stats(self):
         """Serve stats from cache - instant response"""
-        cached_state = self.poller.get_cached_state()
-        stats = cached_state.get('stats', {})
-        if not stats:
-            stats = {'error': 'No game data available'}
-        self.send_json_response(stats)
+        self.send_view('stats')
+    
+    def serve_udp_timing(self):
+        """Serve adaptive UDP timeout estimator stats per command type (RetroArch backend only)"""
+        rtt = getattr(self.poller.backend, 'rtt', None)
+        self.send_json_response(rtt.stats() if rtt else {})
+    
+    def serve_wram(self):
+        """Serve bytes from the WRAM mirror: /api/wram?address=0x7E09A2&length=16"""
+        params = parse_qs(urlparse(self.path).query)
+        try:
+            address = int(params.get('address', ['0x7E0000'])[0], 0)
+            length = int(params.get('length', ['16'])[0], 0)
+        except ValueError:
+            self.send_json_response({'error': 'address and length must be integers'}, 400)
+            return
+        if length <= 0 or length > 0x1000 or address < WRAM_BASE or address + length > WRAM_BASE + WRAM_SIZE:
+            self.send_json_response({'error': 'range must lie within 0x7E0000-0x7FFFFF, length 1-4096'}, 400)
+            return
+        
+        backend = self.poller.backend
+        source = backend if backend.zero_copy else self.poller.wram_mirror
+        data = source.read_memory_range(address, length)
+        if data is None:
+            self.send_json_response({'error': 'range not mirrored yet'}, 503)
+            return
+        self.send_json_response({
+            'address': f"0x{address:06X}",
+            'length': length,
+            'data': data.hex(' '),
+            'age': 0.0 if backend.zero_copy else self.poller.wram_mirror.age(address, length)
+        })
+    
+    def serve_wram_stats(self):
+        """Serve WRAM mirror refresh / change-rate stats per region"""
+        self.send_json_response(self.poller.wram_mirror.stats())
+    
+    def serve_logging_stats(self):
+        """Serve logging queue depth and dropped-record count"""
+        self.send_json_response(logging_stats())
+    
+    def serve_http_stats(self):
+        """Serve HTTP worker pool usage and pre-serialized view versions"""
+        stats = getattr(self.server, 'stats', None)
+        self.send_json_response({'pool': stats() if stats else {}, 'views': self.poller.views.stats()})
+    
+    def serve_poll_stats(self):
+        """Serve poll count and last update time, always current (a 304 from /api/status may not be)"""
+        self.send_json_response(self.poller.get_poll_stats())
+    
+    def serve_trace(self):
+        """Dump the parser trace ring buffer: /api/trace?polls=5&channel=bosses"""
+        params = parse_qs(urlparse(self.path).query)
+        try:
+            polls = int(params['polls'][0]) if 'polls' in params else None
+        except ValueError:
+            self.send_json_response({'error': 'polls must be an integer'}, 400)
+            return
+        channel = params.get('channel', [None])[0]
+        parser = self.poller.parser
+        memo = {'hits': parser.memo_hits, 'misses': parser.memo_misses, 'boss_rules': parser.boss_rules.stats()}
+        self.send_json_response({'stats': parser.trace.stats(), 'memo': memo,
+                                 'polls': parser.trace.dump(polls, channel)})
+    
+    def serve_mb_state(self):
+        """Mother Brain phase and recent phase transitions: /api/mb-state?history=10"""
+        params = parse_qs(urlparse(self.path).query)
+        try:
+            history = int(params['history'][0]) if 'history' in params else None
+        except ValueError:
+            self.send_json_response({'error': 'history must be an integer'}, 400)
+            return
+        self.send_json_response(self.poller.parser.mb_fsm.to_dict(history))
+    
+    def serve_history(self):
+        """Recent game state changes, oldest first: /api/history?limit=20"""
+        params = parse_qs(urlparse(self.path).query)
+        try:
+            limit = int(params['limit'][0]) if 'limit' in params else None
+        except ValueError:
+            self.send_json_response({'error': 'limit must be an integer'}, 400)
+            return
+        self.send_json_response([{'timestamp': snapshot.timestamp, 'poll': snapshot.poll,
+                                  'stats': snapshot.to_dict()}
+                                 for snapshot in self.poller.get_history(limit)])
     
     def serve_bootstrap_mb(self):
         """Serve a dummy response for the bootstrap endpoint"""
@@ -463,11 +453,11 @@ class CacheServingHTTPHandler(BaseHTTPRequestHandler):
     def serve_manual_mb_complete(self):
         """Manually set MB completion for testing/troubleshooting"""
         try:
-            # Force set MB completion in the parser
+            # Force set MB completion - queued for the poll thread, which owns the tracker
             if hasattr(self.poller, 'parser'):
-                self.poller.parser.mother_brain_phase_state['mb1_detected'] = True
-                self.poller.parser.mother_brain_phase_state['mb2_detected'] = True
-                message = 'MB1 and MB2 manually set to completed'
+                self.poller.parser.tracker.submit(
+                    'manual MB completion', lambda tracker: tracker.set_mb_flags(True, True, 'manual completion via API'))
+                message = 'MB1 and MB2 will be set to completed on the next poll'
                 logger.info(f"🔧 Manual MB completion triggered via API")
             else:
                 message = 'Parser not available'
@@ -490,11 +480,8 @@ class CacheServingHTTPHandler(BaseHTTPRequestHandler):
         """Reset Mother Brain cache to default (not detected)"""
         try:
             if hasattr(self.poller, 'parser'):
-                self.poller.parser.mother_brain_phase_state = {
-                    'mb1_detected': False,
-                    'mb2_detected': False
-                }
-                message = 'MB cache reset to default (not detected)'
+                self.poller.parser.tracker.submit('MB cache reset', lambda tracker: tracker.reset_mb('manual reset'))
+                message = 'MB cache will be reset to default (not detected) on the next poll'
                 logger.info(f"🔄 MB cache reset via API")
             else:
                 message = 'Parser not available'
@@ -516,24 +503,10 @@ class CacheServingHTTPHandler(BaseHTTPRequestHandler):
     def serve_reset_cache(self):
         """Reset all caches and force fresh game state read"""
         try:
-            if hasattr(self.poller, 'parser'):
-                # Reset Mother Brain cache
-                self.poller.parser.mother_brain_phase_state = {
-                    'mb1_detected': False,
-                    'mb2_detected': False
-                }
-                logger.info(f"🔄 MB cache reset via API")
-            
-            # Clear the background poller's cache to force fresh reads
-            if hasattr(self.poller, 'cache_lock') and hasattr(self.poller, 'cache'):
-                with self.poller.cache_lock:
-                    self.poller.cache['game_state'] = {}
-                    logger.info(f"🔄 Background poller cache cleared")
-            
-            # Force bootstrap flag reset so it will re-bootstrap on next read
-            if hasattr(self.poller, 'bootstrap_attempted'):
-                self.poller.bootstrap_attempted = False
-                logger.info(f"🔄 Bootstrap flag reset - will re-bootstrap on next poll")
+            # Everything the reset touches belongs to the poll thread - queue it there
+            poller = self.poller
+            poller.parser.tracker.submit('reset all caches', lambda tracker: poller.reset_caches())
+            logger.info(f"🔄 Cache reset queued via API")
             
             message = 'All caches reset - fresh game state will be read on next poll'
             
@@ -577,26 +550,51 @@ class CacheServingHTTPHandler(BaseHTTPRequestHandler):
         except FileNotFoundError:
             self.send_error(404)
     
+    def send_view(self, name):
+        """Send a view the poller already serialized, or 304 if the client has this version"""
+        view = self.poller.get_view(name)
+        if etag_matches(self.headers.get('If-None-Match'), view.etag):
+            self.send_response(304)
+            self.send_header('ETag', view.etag)
+            self.send_cors_headers()
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', len(view.body))
+        self.send_header('ETag', view.etag)
+        # Cacheable, but revalidate every time (cheap: usually a 304)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(view.body)
+    
+    def send_cors_headers(self):
+        """CORS headers to allow React app access"""
+        self.send_header('Access-Control-Allow-Origin', 'http://localhost:3000')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
+    
     def send_json_response(self, data, status_code=200):
         """Send JSON response with CORS headers"""
         json_data = json.dumps(data, indent=2)
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Content-Length', len(json_data.encode()))
-        # Add CORS headers to allow React app access
-        self.send_header('Access-Control-Allow-Origin', 'http://localhost:3000')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_cors_headers()
         self.end_headers()
         self.wfile.write(json_data.encode())
 
 class BackgroundPollerServer:
     """Main server that orchestrates background polling and HTTP serving"""
     
-    def __init__(self, port=3000, poll_interval=1.0):
+    def __init__(self, port=3000, poll_interval=1.0, backend: Optional[EmulatorBackend] = None,
+                 http_workers=DEFAULT_WORKERS):
         self.port = port
         self.poll_interval = poll_interval
-        self.poller = BackgroundGamePoller(poll_interval)
+        self.http_workers = http_workers
+        self.poller = BackgroundGamePoller(poll_interval, backend=backend)
         self.http_server = None
         
     def start(self):
@@ -609,7 +607,9 @@ class BackgroundPollerServer:
             def handler_factory(*args, **kwargs):
                 return CacheServingHTTPHandler(*args, poller=self.poller, **kwargs)
             
-            self.http_server = HTTPServer(('localhost', self.port), handler_factory)
+            # Each connection gets a pool worker, so one stalled client can't block the rest
+            self.http_server = PooledHTTPServer(('localhost', self.port), handler_factory,
+                                                max_workers=self.http_workers)
             
             logger.info("🚀 Background Polling Super Metroid Tracker Server")
             logger.info("=" * 50)
@@ -618,6 +618,8 @@ class BackgroundPollerServer:
             logger.info(f"📈 API Stats:  http://localhost:{self.port}/api/stats")
             logger.info(f"⚡ Background polling: {self.poll_interval}s intervals")
             logger.info(f"🎯 Architecture: Background UDP + Instant Cache Serving")
+            logger.info(f"🧵 HTTP workers: {self.http_workers} (keep-alive {KEEP_ALIVE_TIMEOUT:.0f}s)")
+            logger.info(f"🎮 Emulator backend: {self.poller.backend.backend_type}")
             logger.info(f"⏹️  Press Ctrl+C to stop")
             logger.info("=" * 50)
             
@@ -646,10 +648,18 @@ def signal_handler(signum, frame):
     sys.exit(0)
 
 if __name__ == "__main__":
+    # Queue-based logging: file/terminal I/O happens off the poll thread
+    setup_logging('background_poller.log')
+    
     # Handle shutdown signals
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
     # Start server on port 8081 (to avoid conflict with React dev server on 3000)
-    server = BackgroundPollerServer(port=8081, poll_interval=1.0)
+    # Emulator backend from --backend=... / EMULATOR_BACKEND (default: RetroArch UDP)
+    backend = create_backend(parse_backend_config(sys.argv[1:]))
+    # HTTP worker pool size from --http-workers=N / HTTP_WORKERS
+    http_workers = int(next((arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--http-workers=')),
+                            os.environ.get('HTTP_WORKERS', DEFAULT_WORKERS)))
+    server = BackgroundPollerServer(port=8081, poll_interval=1.0, backend=backend, http_workers=http_workers)
     server.start() 
\ No newline at end of file
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Batch Snapshot Decoder
+
+Decodes many memory snapshots at once for offline analysis and replays of
+recorded sessions. Input is an (N, row_size) uint8 array with one snapshot
+per row; a SnapshotLayout says where each field sits in a row (a raw WRAM
+region, or the read plan's blocks concatenated as a poller would record
+them).
+
+The stateless sections of parse_complete_game_state - location, stats with
+intro filtering, item/beam bits with the item reset rules, and the boss rule
+table - are computed as NumPy column operations over all rows. The Mother
+Brain state machine and what depends on it (MB flags, Samus's ship, Hyper
+Beam) runs afterwards as a sequential pass over the decoded columns
+(mother_brain_pass), so the two together give the same game states as
+polling the snapshots one by one.
+
+NumPy is optional; only this module needs it.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional - only needed for batch decoding
+    np = None
+
+from boss_rules import BOSS_WORDS, BossRule, load_rules
+from game_state_decoder import AREA_NAMES, INTRO_ROOMS, LOCATION_FIELDS
+from game_state_parser import SuperMetroidGameStateParser
+from memory_layout import BEAM_BITS, ITEM_BITS, LAYOUT_BY_NAME, STATS_BLOCK
+from mother_brain_fsm import MB_ROOM_ID, PHASES, MBInputs, reset_reason
+from read_plan import GAME_STATE_FIELDS, ReadPlan
+from wram_mirror import WRAM_BASE, WRAM_SIZE
+
+logger = logging.getLogger(__name__)
+
+ESCAPE_ROOM_ID = 56867
+BOSS_HP_FIELDS = ('boss_hp_1', 'boss_hp_2', 'boss_hp_3')
+# Fields a row must contain (area_id is a byte, the rest are words)
+REQUIRED_FIELDS = ('basic_stats',) + LOCATION_FIELDS + ('items', 'beams') + BOSS_WORDS + BOSS_HP_FIELDS
+# Intro scene hides these stats (see GameStateDecoder.parse_basic_stats)
+INTRO_HIDDEN_STATS = ('missiles', 'max_missiles', 'supers', 'max_supers', 'power_bombs', 'max_power_bombs')
+
+_BATCH_OPERATORS = {
+    'mask': lambda v, x: (v & x) != 0,
+    'clear': lambda v, x: (v & x) == 0,
+    'eq': lambda v, x: v == x,
+    'ge': lambda v, x: v >= x,
+    'gt': lambda v, x: v > x,
+    'not_in': lambda v, x: ~np.isin(v, x),
+}
+
+SnapshotLayout = Dict[str, int]
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Batch decoding needs numpy (pip install numpy)")
+
+
+def region_layout(base: int = WRAM_BASE, size: int = WRAM_SIZE,
+                  fields: Iterable = GAME_STATE_FIELDS) -> SnapshotLayout:
+    """Field offsets for rows that are raw memory starting at base (the whole WRAM by default)"""
+    return {field.name: field.address - base for field in fields
+            if base <= field.address and field.address + field.size <= base + size}
+
+
+def plan_layout(plan: Optional[ReadPlan] = None) -> SnapshotLayout:
+    """Field offsets for rows that are a read plan's block reads concatenated in plan order"""
+    plan = plan or ReadPlan(GAME_STATE_FIELDS)
+    layout: SnapshotLayout = {}
+    row_offset = 0
+    for block in plan.blocks:
+        for field in block.fields:
+            layout[field.name] = row_offset + field.address - block.address
+        row_offset += block.size
+    return layout
+
+
+def _byte(frames: Any, offset: int) -> Any:
+    return frames[:, offset]
+
+
+def _word(frames: Any, offset: int) -> Any:
+    return frames[:, offset].astype(np.uint16) | (frames[:, offset + 1].astype(np.uint16) << 8)
+
+
+def evaluate_rules(rules: Sequence[BossRule], words: Dict[str, Any]) -> Dict[str, Any]:
+    """Vectorized BossRule table: boss name -> bool column"""
+    count = len(next(iter(words.values())))
+    bosses = {}
+    for rule in rules:
+        detected = np.zeros(count, dtype=bool)
+        for clause in rule.clauses:
+            matched = np.ones(count, dtype=bool)
+            for word, op, value in clause:
+                if word not in words or op not in _BATCH_OPERATORS:
+                    raise ValueError(f"rule {rule.name}: unknown term {(word, op, value)!r}")
+                matched &= _BATCH_OPERATORS[op](words[word], value)
+            detected |= matched
+        bosses[rule.name] = detected
+    return bosses
+
+
+def decode_batch(frames: Any, layout: Optional[SnapshotLayout] = None,
+                 rules: Optional[Sequence[BossRule]] = None) -> Dict[str, Any]:
+    """
+    Decode the stateless fields of every snapshot row into columns.
+
+    Returns game_state-shaped columns: location and stats arrays at the top
+    level, 'items', 'beams' and 'bosses' as name -> bool array, plus the
+    raw words the Mother Brain pass needs under 'raw'.
+    """
+    _require_numpy()
+    frames = np.asarray(frames, dtype=np.uint8)
+    if frames.ndim != 2:
+        raise ValueError(f"frames must be a 2-D (snapshots, row_size) array, got shape {frames.shape}")
+    layout = region_layout() if layout is None else layout
+    missing = [name for name in REQUIRED_FIELDS if name not in layout]
+    if missing:
+        raise ValueError(f"snapshot layout is missing fields: {', '.join(missing)}")
+    sizes = {'basic_stats': STATS_BLOCK.size, 'area_id': 1}
+    if any(layout[name] + sizes.get(name, 2) > frames.shape[1] for name in REQUIRED_FIELDS):
+        raise ValueError(f"snapshot rows of {frames.shape[1]} bytes are too short for the layout")
+
+    columns: Dict[str, Any] = {}
+    for name in LOCATION_FIELDS:
+        columns[name] = _byte(frames, layout[name]) if name == 'area_id' else _word(frames, layout[name])
+    area, room = columns['area_id'], columns['room_id']
+
+    # Basic stats, with the intro scene hiding ammo
+    stats_offset = layout['basic_stats']
+    for name in STATS_BLOCK.names:
+        columns[name] = _word(frames, stats_offset + LAYOUT_BY_NAME[name].address - STATS_BLOCK.address)
+    health = columns['health']
+    intro = (area == 0) & np.isin(room, INTRO_ROOMS) & (health >= 99) & (health <= 150)
+    for name in INTRO_HIDDEN_STATS:
+        columns[name] = np.where(intro, 0, columns[name]).astype(np.uint16)
+    missiles, max_missiles = columns['missiles'], columns['max_missiles']
+
+    # Items and beams, cleared by the item reset rules (see _should_reset_item_state)
+    reset = (((area == 0) & (health <= 99) & (room < 1000)) |
+             ((area == 5) & (room == MB_ROOM_ID) & (missiles == 0) & (max_missiles > 100) &
+              (health > 0) & (health < 200)) |
+             ((health <= 99) & (max_missiles == 0) & (missiles == 0) & (area == 0) & (room < 40000)) |
+             ((health == 0) & (missiles == 0) & (max_missiles == 0)))
+    items_value = _word(frames, layout['items'])
+    beams_value = _word(frames, layout['beams'])
+    kept = ~reset
+    columns['items'] = {name: ((items_value & bit) != 0) & kept for name, bit in ITEM_BITS}
+    columns['beams'] = {name: ((beams_value & bit) != 0) & kept for name, bit in BEAM_BITS}
+    columns['beams']['hyper'] = np.zeros(len(frames), dtype=bool)
+
+    # Boss defeat flags from the rule table
+    words = {name: _word(frames, layout[name]) for name in BOSS_WORDS}
+    columns['bosses'] = evaluate_rules(load_rules() if rules is None else rules, words)
+
+    raw = dict(words)
+    raw.update({name: _word(frames, layout[name]) for name in BOSS_HP_FIELDS})
+    # Hyper Beam needs every beam in the escape room, plus MB2 (known only in the sequential pass)
+    all_beams = np.logical_and.reduce([(beams_value & bit) != 0 for _, bit in BEAM_BITS])
+    raw['hyper_candidate'] = kept & (area == 5) & (room == ESCAPE_ROOM_ID) & all_beams
+    columns['raw'] = raw
+    return columns
+
+
+def mother_brain_pass(columns: Dict[str, Any],
+                      parser: Optional[SuperMetroidGameStateParser] = None) -> Dict[str, Any]:
+    """
+    Run the MB state machine over decoded columns in order.
+
+    Adds mother_brain_1, mother_brain_2 and samus_ship to columns['bosses'],
+    applies Hyper Beam to columns['beams'] and adds 'mb_phase' (index into
+    mother_brain_fsm.PHASES). The parser's MB state is the starting state
+    and is left at the last snapshot's.
+    """
+    _require_numpy()
+    parser = parser or SuperMetroidGameStateParser()
+    fsm = parser.mb_fsm
+    count = len(columns['health'])
+    mb1_column = np.zeros(count, dtype=bool)
+    mb2_column = np.zeros(count, dtype=bool)
+    ship_column = np.zeros(count, dtype=bool)
+    phase_column = np.zeros(count, dtype=np.uint8)
+    phase_index = {phase: i for i, phase in enumerate(PHASES)}
+    raw = columns['raw']
+    hyper_column, plasma_column = columns['beams']['hyper'], columns['beams']['plasma']
+
+    rows = zip(*(columns[name].tolist() for name in ('area_id', 'room_id', 'player_x', 'player_y', 'health',
+                                                      'max_health', 'missiles', 'max_missiles')),
+               *(raw[name].tolist() for name in BOSS_HP_FIELDS + ('boss_plus_1', 'boss_plus_2', 'hyper_candidate')))
+    for i, (area, room, player_x, player_y, health, max_health, missiles, max_missiles,
+            hp1, hp2, hp3, boss_plus_1, boss_plus_2, hyper_candidate) in enumerate(rows):
+        # Same order as parse_complete_game_state: reset check, beams, bosses
+        reason = reset_reason(MBInputs(area_id=area, room_id=room, missiles=missiles,
+                                       max_missiles=max_missiles, health=health),
+                              fsm.mb1_detected, fsm.mb2_detected)
+        if reason:
+            fsm.reset(reason)
+        hyper = hyper_candidate and fsm.mb2_detected
+        if hyper:
+            hyper_column[i] = True
+            plasma_column[i] = False
+
+        result = fsm.evaluate(MBInputs(area_id=area, room_id=room, boss_hp_1=hp1, boss_hp_2=hp2, boss_hp_3=hp3,
+                                       boss_plus_1=boss_plus_1, boss_plus_2=boss_plus_2, hyper_beam=hyper,
+                                       missiles=missiles, max_missiles=max_missiles, health=health,
+                                       max_health=max_health))
+        ship = False
+        if result.prior_mb1 or result.mb1:
+            location = {'area_id': area, 'room_id': room, 'player_x': player_x, 'player_y': player_y}
+            ship = parser.decoder.detect_samus_ship({}, location, result.prior_mb1, result.mb1, result.mb2)
+        fsm.apply(result, ship)
+
+        mb1_column[i], mb2_column[i], ship_column[i] = result.mb1, result.mb2, ship
+        phase_column[i] = phase_index[fsm.phase]
+
+    columns['bosses'].update(mother_brain_1=mb1_column, mother_brain_2=mb2_column, samus_ship=ship_column)
+    columns['mb_phase'] = phase_column
+    return columns
+
+
+def game_state_at(columns: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """One row of decoded columns as a parse_complete_game_state-style dict"""
+    game_state: Dict[str, Any] = {name: int(columns[name][index]) for name in LOCATION_FIELDS + STATS_BLOCK.names}
+    game_state['area_name'] = AREA_NAMES.get(game_state['area_id'], "")
+    for section in ('items', 'beams', 'bosses'):
+        game_state[section] = {name: bool(column[index]) for name, column in columns[section].items()}
+    return game_state
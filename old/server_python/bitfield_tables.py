@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Item / Beam Bitfield Decode Tables
+
+The items word (0x7E09A4) and beams word (0x7E09A8) decode through tables
+indexed by the raw 16-bit value, built once at import. Every entry is a
+shared FrozenDict, and words that differ only in untracked bits map to the
+same object, so an unchanged word yields the identical mapping poll after
+poll (callers can compare with `is` before diffing or serializing).
+
+Size: three 65536-entry tuples of references (~0.5 MB each) plus one
+mapping per distinct combination of tracked bits (2048 item, 32 beam).
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from memory_layout import BEAM_BITS, ITEM_BITS
+
+logger = logging.getLogger(__name__)
+
+TABLE_SIZE = 0x10000
+
+
+class FrozenDict(dict):
+    """A dict that cannot be changed after construction (still a dict for json and isinstance)"""
+
+    __slots__ = ('_hash',)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _immutable
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def __copy__(self) -> 'FrozenDict':
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> 'FrozenDict':
+        return self
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __repr__(self) -> str:
+        return f"FrozenDict({dict.__repr__(self)})"
+
+
+def build_table(bits: Sequence[Tuple[str, int]],
+                extra: Iterable[Tuple[str, bool]] = ()) -> Tuple[FrozenDict, ...]:
+    """Word -> FrozenDict of name -> bool (plus the constant extra entries), one object per distinct bit set"""
+    extra = tuple(extra)
+    mask = 0
+    for _, bit in bits:
+        mask |= bit
+    mappings: Dict[int, FrozenDict] = {}
+    table = []
+    for word in range(TABLE_SIZE):
+        tracked = word & mask
+        mapping = mappings.get(tracked)
+        if mapping is None:
+            mapping = FrozenDict([(name, bool(tracked & bit)) for name, bit in bits] + list(extra))
+            mappings[tracked] = mapping
+        table.append(mapping)
+    return tuple(table)
+
+
+# Legacy tracker shape: tracked bits only
+ITEM_TABLE = build_table(ITEM_BITS)
+BEAM_TABLE = build_table(BEAM_BITS)
+# Parser shape: beams carry the derived 'hyper' flag
+TRACKED_BEAM_TABLE = build_table(BEAM_BITS, [('hyper', False)])
+
+NO_ITEMS = ITEM_TABLE[0]
+NO_BEAMS = TRACKED_BEAM_TABLE[0]
+# Escape sequence after MB2: Hyper Beam replaces plasma
+HYPER_BEAMS = FrozenDict([(name, name != 'plasma') for name, _ in BEAM_BITS] + [('hyper', True)])
+
+
+def decode_items(word: Optional[int]) -> Dict[str, bool]:
+    """Items mapping for a raw items word ({} if unread)"""
+    return ITEM_TABLE[word & 0xFFFF] if word is not None else {}
+
+
+def decode_beams(word: Optional[int]) -> Dict[str, bool]:
+    """Beams mapping (no 'hyper') for a raw beams word ({} if unread)"""
+    return BEAM_TABLE[word & 0xFFFF] if word is not None else {}
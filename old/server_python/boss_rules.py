@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Boss Detection Rules
+
+The boss defeat checks from parse_bosses expressed as data. A boss is
+detected when any of its clauses matches; a clause matches when all of its
+terms do. A term tests one decoded 16-bit word:
+
+  ('boss_plus_2', 'mask', 0x04)      word & 0x04 != 0
+  ('boss_plus_2', 'clear', 0x01)     word & 0x01 == 0
+  ('boss_plus_3', 'eq', 0x0301)      word == 0x0301
+  ('crocomire', 'ge', 0x0202)        word >= 0x0202   (also 'gt')
+  ('boss_plus_4', 'not_in', [3, 7])  word not in (3, 7)
+
+BossRuleEngine compiles the whole table into one generated function over
+the word tuple (no per-rule interpretation at poll time) and caches results
+in a bounded LRU keyed on that tuple. Rules can be replaced without code
+edits via a JSON file (BOSS_RULES_FILE) with the same shape:
+  [{"name": "phantoon", "clauses": [[["boss_plus_3", "mask", 1]]]}, ...]
+"""
+
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from memory_layout import WORD
+
+logger = logging.getLogger(__name__)
+
+# Decoded word order; missing/short fields decode to None
+BOSS_WORDS: Tuple[str, ...] = ('main_bosses', 'crocomire', 'boss_plus_1', 'boss_plus_2',
+                               'boss_plus_3', 'boss_plus_4', 'boss_plus_5')
+
+DEFAULT_CACHE_SIZE = 256
+
+Term = Tuple[str, str, Any]
+
+
+class BossRule(NamedTuple):
+    """name is detected if any clause (all terms true) matches; omitted entirely if `requires` is missing"""
+    name: str
+    clauses: Tuple[Tuple[Term, ...], ...]
+    requires: Optional[str] = None
+
+
+BOSS_RULES: Tuple[BossRule, ...] = (
+    # Basic boss flags (only reported when main_bosses was read)
+    BossRule('bomb_torizo', ((('main_bosses', 'mask', 0x04),),), requires='main_bosses'),
+    BossRule('kraid', ((('main_bosses', 'mask', 0x100),),), requires='main_bosses'),
+    BossRule('spore_spawn', ((('main_bosses', 'mask', 0x200),),), requires='main_bosses'),
+    # 'draygon': uses the boss_plus_3 pattern below, not main_bosses
+    BossRule('mother_brain', ((('main_bosses', 'mask', 0x01),),), requires='main_bosses'),
+
+    BossRule('crocomire', ((('crocomire', 'mask', 0x02), ('crocomire', 'ge', 0x0202)),)),
+    BossRule('phantoon', ((('boss_plus_3', 'mask', 0x01),),)),
+    BossRule('botwoon', (
+        (('boss_plus_2', 'mask', 0x04), ('boss_plus_2', 'gt', 0x0100)),
+        (('boss_plus_4', 'mask', 0x02), ('boss_plus_4', 'gt', 0x0001)),
+    )),
+    # Only the specific Draygon pattern
+    BossRule('draygon', ((('boss_plus_3', 'eq', 0x0301),),)),
+    # boss_plus_2 first (excluding the Draygon false positive 0x0203); boss_plus_4
+    # only as a fallback, excluding Botwoon patterns
+    BossRule('ridley', (
+        (('boss_plus_2', 'mask', 0x0001), ('boss_plus_2', 'ge', 0x0100), ('boss_plus_2', 'not_in', (0x0203,))),
+        (('boss_plus_2', 'clear', 0x0001), ('boss_plus_4', 'mask', 0x0001), ('boss_plus_4', 'ge', 0x0011),
+         ('boss_plus_4', 'not_in', (0x0003, 0x0007))),
+    )),
+    BossRule('golden_torizo', (
+        (('boss_plus_1', 'mask', 0x0700), ('boss_plus_1', 'mask', 0x0003)),
+        (('boss_plus_2', 'mask', 0x0100), ('boss_plus_2', 'ge', 0x0400)),
+        (('boss_plus_1', 'ge', 0x0603),),
+        (('boss_plus_3', 'mask', 0x0100),),
+    )),
+)
+
+_OPERATORS = {
+    'mask': '({v} & {x}) != 0',
+    'clear': '({v} & {x}) == 0',
+    'eq': '{v} == {x}',
+    'ge': '{v} >= {x}',
+    'gt': '{v} > {x}',
+    'not_in': '{v} not in {x}',
+}
+
+
+def decode_boss_words(boss_memory_data: Mapping[str, Any]) -> Tuple[Optional[int], ...]:
+    """The BOSS_WORDS tuple from raw memory fields (None where a field is missing or short)"""
+    words = []
+    for name in BOSS_WORDS:
+        data = boss_memory_data.get(name)
+        words.append(WORD.unpack_from(data)[0] if data and len(data) >= 2 else None)
+    return tuple(words)
+
+
+def rules_from_json(entries: Iterable[Mapping[str, Any]]) -> Tuple[BossRule, ...]:
+    """BossRules from their JSON form"""
+    rules = []
+    for entry in entries:
+        clauses = tuple(tuple((word, op, tuple(value) if isinstance(value, list) else value)
+                              for word, op, value in clause)
+                        for clause in entry['clauses'])
+        rules.append(BossRule(entry['name'], clauses, entry.get('requires')))
+    return tuple(rules)
+
+
+def load_rules(path: Optional[str] = None) -> Tuple[BossRule, ...]:
+    """Rules from BOSS_RULES_FILE (or path); the built-in table if unset or unreadable"""
+    path = path or os.environ.get('BOSS_RULES_FILE')
+    if not path:
+        return BOSS_RULES
+    try:
+        with open(path, 'r') as f:
+            rules = rules_from_json(json.load(f))
+        # Compile once here so a bad term falls back instead of failing the engine
+        compile_rules(rules)
+        logger.info(f"📜 Loaded {len(rules)} boss rules from {path}")
+        return rules
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"Failed to load boss rules from {path}: {e} - using built-in rules")
+        return BOSS_RULES
+
+
+def compile_rules(rules: Sequence[BossRule]) -> Any:
+    """Generate one function evaluating every rule over the word tuple"""
+    index = {name: i for i, name in enumerate(BOSS_WORDS)}
+    lines = ['def evaluate(w):']
+    lines += [f'    v{i} = w[{i}] or 0' for i in range(len(BOSS_WORDS))]
+    lines.append('    r = []')
+    for rule in rules:
+        clauses = []
+        for clause in rule.clauses:
+            terms = []
+            for word, op, value in clause:
+                if word not in index or op not in _OPERATORS:
+                    raise ValueError(f"rule {rule.name}: unknown term {(word, op, value)!r}")
+                if op == 'not_in':
+                    value = tuple(int(x) for x in value)
+                else:
+                    value = int(value)
+                terms.append(_OPERATORS[op].format(v=f'v{index[word]}', x=repr(value)))
+            clauses.append('(' + ' and '.join(terms) + ')')
+        expression = ' or '.join(clauses) or 'False'
+        append = f'r.append(({rule.name!r}, {expression}))'
+        if rule.requires:
+            if rule.requires not in index:
+                raise ValueError(f"rule {rule.name}: unknown word {rule.requires!r}")
+            lines.append(f'    if w[{index[rule.requires]}] is not None: {append}')
+        else:
+            lines.append(f'    {append}')
+    lines.append('    return tuple(r)')
+
+    namespace: Dict[str, Any] = {}
+    exec(compile('\n'.join(lines), '<boss_rules>', 'exec'), namespace)
+    return namespace['evaluate']
+
+
+class BossRuleEngine:
+    """Compiled boss rules with a bounded LRU on the decoded word tuple"""
+
+    def __init__(self, rules: Optional[Sequence[BossRule]] = None, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.rules = tuple(rules) if rules is not None else load_rules()
+        self._evaluate = lru_cache(maxsize=cache_size)(compile_rules(self.rules))
+
+    def evaluate(self, words: Tuple[Optional[int], ...]) -> Dict[str, bool]:
+        """Boss name -> detected, in rule order (a fresh dict the caller may extend)"""
+        return dict(self._evaluate(words))
+
+    def evaluate_memory(self, boss_memory_data: Mapping[str, Any]) -> Dict[str, bool]:
+        return self.evaluate(decode_boss_words(boss_memory_data))
+
+    def stats(self) -> Dict[str, Any]:
+        info = self._evaluate.cache_info()
+        return {'rules': len(self.rules), 'cache_hits': info.hits, 'cache_misses': info.misses,
+                'cache_size': info.currsize, 'cache_max': info.maxsize}
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Emulator Backend Interface
+
+Python counterpart of src/server/emulatorBackend.ts. The poller talks to any
+emulator through EmulatorBackend, so RetroArch (UDP network commands),
+QUsb2Snes (WebSocket), Mesen (HTTP) and file/replay sources are
+interchangeable - and can be benchmarked against each other.
+
+Backends expose a batched read_ranges() so each one can use its native bulk
+read (pipelined UDP, multi-operand GetAddress, one mmap, ...). They also
+provide read_memory_range/read_many, the reader interface ReadPlan and
+WramMirror consume.
+"""
+
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKEND_TYPES = ('retroarch', 'qusb2snes', 'mesen', 'file', 'mmap', 'replay')
+
+DEFAULT_BACKEND_CONFIG: Dict[str, Any] = {
+    'type': 'retroarch',
+    'retroarch': {'host': 'localhost', 'port': 55355},
+    'qusb2snes': {'url': 'ws://localhost:23074', 'device': None},
+    'mesen': {'host': 'localhost', 'http_port': 9876},
+    'file': {'path': 'wram.bin'},
+    'mmap': {'path': 'wram.bin'},
+    'replay': {'path': 'session.jsonl', 'speed': 1.0, 'loop': True},
+}
+
+
+class EmulatorBackend(ABC):
+    """Common interface that all emulator backends implement"""
+
+    backend_type = 'unknown'
+    # True when reads are views into local memory: the poller parses them
+    # directly instead of copying them into its WRAM mirror first
+    zero_copy = False
+
+    @abstractmethod
+    def connect(self) -> bool:
+        """Connect to the emulator (if needed); True on success"""
+
+    @abstractmethod
+    def read_ranges(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """Read every (address, size) range in one batch; results in request order, None on failure"""
+
+    @abstractmethod
+    def health(self) -> Dict[str, Any]:
+        """Liveness: at least {'backend', 'connected', 'game_loaded'}"""
+
+    @abstractmethod
+    def identity(self) -> Dict[str, Any]:
+        """What is on the other end: {'backend', 'emulator', 'game'}"""
+
+    def close(self):
+        """Release sockets / files"""
+
+    def read_memory_range(self, start_address: int, size: int) -> Optional[bytes]:
+        """Read a single range"""
+        return self.read_ranges([(start_address, size)])[0]
+
+    def read_many(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """Reader interface used by ReadPlan.execute and WramMirror.refresh"""
+        return self.read_ranges(ranges)
+
+    def connection_info(self) -> Dict[str, Any]:
+        """Connection info in the poller's cache shape"""
+        health = self.health()
+        identity = self.identity()
+        return {
+            'connected': health.get('connected', False),
+            'retroarch_version': identity.get('emulator'),
+            'game_info': identity.get('game'),
+            'game_loaded': health.get('game_loaded', False),
+        }
+
+    def invalidate_info(self, reason: str = ""):
+        """Forget any cached connection state (read failure, ROM change)"""
+
+
+def create_backend(config: Optional[Mapping[str, Any]] = None) -> EmulatorBackend:
+    """Build the configured backend; unknown types fall back to RetroArch"""
+    config = config or DEFAULT_BACKEND_CONFIG
+    backend_type = config.get('type', 'retroarch')
+    options = {**DEFAULT_BACKEND_CONFIG.get(backend_type, {}), **config.get(backend_type, {})}
+    logger.info(f"🏭 Backend Factory: Creating {backend_type} backend")
+
+    # Imported lazily so optional dependencies (websocket-client) are only
+    # needed by the backend that uses them
+    if backend_type == 'qusb2snes':
+        from qusb2snes_backend import QUsb2SnesBackend
+        return QUsb2SnesBackend(options['url'], device=options.get('device'))
+    if backend_type == 'mesen':
+        from mesen_backend import MesenHTTPBackend
+        return MesenHTTPBackend(options['host'], int(options['http_port']))
+    if backend_type == 'file':
+        from file_backends import WramFileBackend
+        return WramFileBackend(options['path'])
+    if backend_type == 'mmap':
+        from file_backends import MmapWramBackend
+        return MmapWramBackend(options['path'])
+    if backend_type == 'replay':
+        from file_backends import ReplayBackend
+        return ReplayBackend(options['path'], speed=float(options['speed']), loop=bool(options['loop']))
+
+    if backend_type != 'retroarch':
+        logger.warning(f"❌ Backend Factory: Unknown backend type '{backend_type}', falling back to RetroArch")
+    from retroarch_backend import RetroArchUDPBackend
+    options = {**DEFAULT_BACKEND_CONFIG['retroarch'], **config.get('retroarch', {})}
+    return RetroArchUDPBackend(options['host'], int(options['port']))
+
+
+def parse_backend_config(args: Sequence[str] = (), environ: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """
+    Backend configuration from command line arguments and environment
+    variables (same names as the TypeScript server), precedence CLI > env > defaults.
+
+    --backend=retroarch|qusb2snes|mesen|file|mmap|replay   EMULATOR_BACKEND
+    --retroarch-host= / --retroarch-port=             RETROARCH_HOST / RETROARCH_PORT
+    --qusb2snes-url= / --qusb2snes-device=            QUSB2SNES_URL / QUSB2SNES_DEVICE
+    --mesen-host= / --mesen-port=                     MESEN_HOST / MESEN_HTTP_PORT
+    --wram-file=                                      WRAM_FILE (file and mmap)
+    --replay-file= / --replay-speed=                  REPLAY_FILE / REPLAY_SPEED
+    """
+    environ = os.environ if environ is None else environ
+
+    def option(flag: str, env: str, default: Any) -> Any:
+        for arg in args:
+            if arg.startswith(f"--{flag}="):
+                return arg.split('=', 1)[1]
+        return environ.get(env, default)
+
+    defaults = DEFAULT_BACKEND_CONFIG
+    config = {
+        'type': option('backend', 'EMULATOR_BACKEND', defaults['type']),
+        'retroarch': {
+            'host': option('retroarch-host', 'RETROARCH_HOST', defaults['retroarch']['host']),
+            'port': int(option('retroarch-port', 'RETROARCH_PORT', defaults['retroarch']['port'])),
+        },
+        'qusb2snes': {
+            'url': option('qusb2snes-url', 'QUSB2SNES_URL', defaults['qusb2snes']['url']),
+            'device': option('qusb2snes-device', 'QUSB2SNES_DEVICE', defaults['qusb2snes']['device']),
+        },
+        'mesen': {
+            'host': option('mesen-host', 'MESEN_HOST', defaults['mesen']['host']),
+            'http_port': int(option('mesen-port', 'MESEN_HTTP_PORT', defaults['mesen']['http_port'])),
+        },
+        'file': {
+            'path': option('wram-file', 'WRAM_FILE', defaults['file']['path']),
+        },
+        'mmap': {
+            'path': option('wram-file', 'WRAM_FILE', defaults['mmap']['path']),
+        },
+        'replay': {
+            'path': option('replay-file', 'REPLAY_FILE', defaults['replay']['path']),
+            'speed': float(option('replay-speed', 'REPLAY_SPEED', defaults['replay']['speed'])),
+            'loop': defaults['replay']['loop'],
+        },
+    }
+
+    logger.info(f"🔧 Backend Config: Using {config['type']} backend")
+    return config
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Fake RetroArch Network Command Server
+
+Stand-in for RetroArch's UDP command interface so the poller, the unified
+tracker and the client engines can be load-tested and benchmarked without an
+emulator. Serves VERSION, GET_STATUS and READ_CORE_MEMORY from a WRAM image,
+a WRAM dump file or a recorded session (see file_backends.py), with
+configurable latency, jitter, packet loss, duplication and reordering.
+
+Usage:
+  python fake_retroarch_server.py --wram=wram.bin [--port=55355]
+  python fake_retroarch_server.py --replay=session.jsonl --latency-ms=2 --jitter-ms=1 --loss=0.02
+"""
+
+import argparse
+import heapq
+import logging
+import random
+import select
+import socket
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from file_backends import ReplayBackend, WramFileBackend
+from logging_setup import setup_logging
+from wram_mirror import WRAM_BASE, WRAM_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_VERSION = "1.19.1"
+DEFAULT_STATUS = "GET_STATUS PLAYING super_nes,Super Metroid,crc32=d63ed5f8"
+
+
+class FaultProfile(NamedTuple):
+    """Network impairments applied to every reply"""
+    latency: float = 0.0      # seconds before a reply is sent
+    jitter: float = 0.0       # extra uniform random delay, 0..jitter seconds
+    loss: float = 0.0         # probability a reply is dropped
+    duplicate: float = 0.0    # probability a reply is sent twice
+    reorder: float = 0.0      # probability a reply is held back behind later ones
+    reorder_delay: float = 0.005  # how long a reordered reply is held back
+    seed: Optional[int] = None
+
+
+class WramImageSource:
+    """Minimal memory source over an in-memory WRAM image"""
+
+    def __init__(self, image: bytes):
+        self.image = image
+
+    def read_memory_range(self, start_address: int, size: int) -> Optional[bytes]:
+        offset = start_address - WRAM_BASE
+        if offset < 0 or offset + size > len(self.image):
+            return None
+        return bytes(self.image[offset:offset + size])
+
+
+class FakeRetroArchServer:
+    """Threaded UDP server speaking RetroArch's network command protocol"""
+
+    def __init__(self, source: Any, host: str = "127.0.0.1", port: int = 0,
+                 faults: FaultProfile = FaultProfile(), version: str = DEFAULT_VERSION,
+                 status: str = DEFAULT_STATUS, max_read: Optional[int] = None):
+        self.source = source
+        self.faults = faults
+        self.version = version
+        self.status = status
+        self.max_read = max_read  # truncate larger reads like a size-limited core would
+        self.random = random.Random(faults.seed)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self._outbox: List[Tuple[float, int, bytes, Any]] = []   # (send time, seq, datagram, addr)
+        self._seq = 0
+        self.stats: Dict[str, int] = {
+            'received': 0, 'sent': 0, 'dropped': 0, 'duplicated': 0, 'reordered': 0, 'errors': 0,
+        }
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.sock.getsockname()
+
+    @property
+    def port(self) -> int:
+        return self.address[1]
+
+    def start(self) -> 'FakeRetroArchServer':
+        """Serve in a background thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+        self.sock.close()
+
+    def __enter__(self) -> 'FakeRetroArchServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def reply_for(self, command: str) -> Optional[str]:
+        """The reply RetroArch would send for a command (None = no reply)"""
+        parts = command.strip().split(' ')
+        name = parts[0]
+        if name == "VERSION":
+            return self.version
+        if name == "GET_STATUS":
+            return self.status
+        if name == "READ_CORE_MEMORY" and len(parts) >= 3:
+            try:
+                address, size = int(parts[1], 16), int(parts[2])
+            except ValueError:
+                return None
+            if self.max_read is not None:
+                size = min(size, self.max_read)
+            data = self.source.read_memory_range(address, size)
+            if data is None:
+                return f"READ_CORE_MEMORY {address:x} -1 no memory map defined"
+            return f"READ_CORE_MEMORY {address:x} " + data.hex(' ')
+        return None
+
+    def _schedule(self, reply: bytes, addr):
+        faults = self.faults
+        if self.random.random() < faults.loss:
+            self.stats['dropped'] += 1
+            return
+
+        delay = faults.latency + (self.random.uniform(0, faults.jitter) if faults.jitter else 0.0)
+        if self.random.random() < faults.reorder:
+            delay += faults.reorder_delay
+            self.stats['reordered'] += 1
+
+        copies = [delay]
+        if self.random.random() < faults.duplicate:
+            copies.append(delay + faults.reorder_delay / 2)
+            self.stats['duplicated'] += 1
+
+        now = time.monotonic()
+        for copy_delay in copies:
+            self._seq += 1
+            heapq.heappush(self._outbox, (now + copy_delay, self._seq, reply, addr))
+
+    def _flush(self):
+        now = time.monotonic()
+        while self._outbox and self._outbox[0][0] <= now:
+            _, _, reply, addr = heapq.heappop(self._outbox)
+            try:
+                self.sock.sendto(reply, addr)
+                self.stats['sent'] += 1
+            except OSError as e:
+                logger.debug(f"Fake RetroArch send failed: {e}")
+                self.stats['errors'] += 1
+
+    def serve_forever(self):
+        """Receive commands and send (impaired) replies until stop()"""
+        while self.running:
+            timeout = 0.05
+            if self._outbox:
+                timeout = max(0.0, min(timeout, self._outbox[0][0] - time.monotonic()))
+            try:
+                readable = select.select([self.sock], [], [], timeout)[0]
+            except (OSError, ValueError):
+                break
+
+            if readable:
+                while True:
+                    try:
+                        data, addr = self.sock.recvfrom(4096)
+                    except (BlockingIOError, OSError):
+                        break
+                    self.stats['received'] += 1
+                    reply = self.reply_for(data.decode(errors='replace'))
+                    if reply is not None:
+                        self._schedule(reply.encode(), addr)
+
+            self._flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake RetroArch UDP command server for benchmarking")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--wram', help="128 KiB WRAM dump to serve (reloaded when it changes)")
+    source.add_argument('--replay', help="Recorded session (JSONL) to play back, looped")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=55355)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--loss', type=float, default=0.0, help="Reply drop probability (0-1)")
+    parser.add_argument('--duplicate', type=float, default=0.0, help="Reply duplication probability (0-1)")
+    parser.add_argument('--reorder', type=float, default=0.0, help="Reply reordering probability (0-1)")
+    parser.add_argument('--max-read', type=int, default=None, help="Truncate READ_CORE_MEMORY to this many bytes")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    setup_logging()
+
+    if args.wram:
+        memory = WramFileBackend(args.wram)
+    elif args.replay:
+        memory = ReplayBackend(args.replay, loop=True)
+    else:
+        memory = WramImageSource(bytes(WRAM_SIZE))
+    if hasattr(memory, 'connect') and not memory.connect():
+        logger.error("❌ Failed to load memory source")
+        return
+
+    faults = FaultProfile(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, loss=args.loss,
+                          duplicate=args.duplicate, reorder=args.reorder, seed=args.seed)
+    server = FakeRetroArchServer(memory, args.host, args.port, faults, max_read=args.max_read)
+    logger.info(f"🎮 Fake RetroArch listening on {args.host}:{server.port} ({faults})")
+    try:
+        server.running = True
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Shutdown requested")
+    finally:
+        server.running = False
+        server.sock.close()
+        logger.info(f"📊 {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
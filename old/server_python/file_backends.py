@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+File and Replay Backends
+
+Emulator-free EmulatorBackend implementations for development, tests and
+benchmarks:
+
+- WramFileBackend serves reads from a 128 KiB WRAM dump (0x7E0000-0x7FFFFF),
+  reloading it whenever the file changes on disk.
+- MmapWramBackend memory-maps a WRAM file that something else keeps updated
+  (an emulator script, a test fixture) and hands out memoryview slices of
+  the mapping: no sockets, no hex decoding, no copies.
+- ReplayBackend plays back a recorded session (JSONL, see SessionRecorder)
+  against a local WRAM image in real time, faster, or looped.
+- SessionRecorder wraps any live backend and records every successful read
+  in the replay format.
+
+Replay format - one JSON object per line:
+  {"type": "header", "version": 1, "backend": "retroarch", "game": "..."}
+  {"t": 0.512, "address": "0x7E0900", "data": "23 00 e7 03 ..."}
+"""
+
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from emulator_backend import EmulatorBackend
+from wram_mirror import WRAM_BASE, WRAM_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+REPLAY_FORMAT_VERSION = 1
+
+
+def _slice_wram(image, address: int, size: int) -> Optional[bytes]:
+    offset = address - WRAM_BASE
+    if offset < 0 or size <= 0 or offset + size > len(image):
+        return None
+    return bytes(image[offset:offset + size])
+
+
+class WramFileBackend(EmulatorBackend):
+    """Serves reads from a WRAM dump file (reloaded when it changes)"""
+
+    backend_type = 'file'
+
+    def __init__(self, path: str):
+        self.path = path
+        self.image = b''
+        self._mtime = None
+
+    def connect(self) -> bool:
+        """Load the dump; False if the file is missing"""
+        return self._reload()
+
+    def _reload(self) -> bool:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            self.image = b''
+            self._mtime = None
+            return False
+        if mtime != self._mtime:
+            with open(self.path, 'rb') as f:
+                self.image = f.read(WRAM_SIZE)
+            self._mtime = mtime
+            logger.debug(f"📂 Loaded WRAM dump {self.path} ({len(self.image)} bytes)")
+        return True
+
+    def read_ranges(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """Slice every range out of the dump"""
+        if not self._reload():
+            return [None] * len(ranges)
+        return [_slice_wram(self.image, address, size) for address, size in ranges]
+
+    def health(self) -> Dict[str, Any]:
+        loaded = self._reload()
+        return {'backend': self.backend_type, 'connected': loaded, 'game_loaded': loaded}
+
+    def identity(self) -> Dict[str, Any]:
+        return {'backend': self.backend_type, 'emulator': 'WRAM dump', 'game': os.path.basename(self.path)}
+
+
+class MmapWramBackend(EmulatorBackend):
+    """
+    Zero-copy reads from a memory-mapped WRAM file.
+
+    Writers that update the file in place are seen immediately; a file that
+    is replaced (new inode) or resized is re-mapped on the next read. Slices
+    are live views: they reflect writes made after they were handed out, so
+    callers that keep data across polls must copy it.
+    """
+
+    backend_type = 'mmap'
+    zero_copy = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._identity = None   # (st_ino, st_size) of the mapped file
+        self.remaps = 0
+
+    def connect(self) -> bool:
+        """Map the file; False if it is missing or empty"""
+        return self._remap_if_changed()
+
+    def _remap_if_changed(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._unmap()
+            return False
+        identity = (st.st_ino, st.st_size)
+        if identity == self._identity:
+            return True
+
+        self._unmap()
+        if st.st_size == 0:
+            return False
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)[:WRAM_SIZE]
+        self._identity = identity
+        self.remaps += 1
+        logger.debug(f"🗺️ Mapped WRAM file {self.path} ({len(self._view)} bytes)")
+        return True
+
+    def _unmap(self):
+        if self._view is not None:
+            self._view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Slices handed to callers are still alive; the mapping is
+                # released when the last of them is garbage collected
+                pass
+        self._map = None
+        self._view = None
+        self._identity = None
+
+    def close(self):
+        self._unmap()
+
+    def read_ranges(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[memoryview]]:
+        """memoryview slices of the mapping (one stat per batch to catch replaced files)"""
+        if not self._remap_if_changed():
+            return [None] * len(ranges)
+        view = self._view
+        limit = len(view)
+        results: List[Optional[memoryview]] = []
+        for address, size in ranges:
+            offset = address - WRAM_BASE
+            if offset < 0 or size <= 0 or offset + size > limit:
+                results.append(None)
+            else:
+                results.append(view[offset:offset + size])
+        return results
+
+    def health(self) -> Dict[str, Any]:
+        mapped = self._remap_if_changed()
+        return {'backend': self.backend_type, 'connected': mapped, 'game_loaded': mapped, 'remaps': self.remaps}
+
+    def identity(self) -> Dict[str, Any]:
+        return {'backend': self.backend_type, 'emulator': 'Memory-mapped WRAM file',
+                'game': os.path.basename(self.path)}
+
+
+class ReplayBackend(EmulatorBackend):
+    """Plays a recorded session back into a local WRAM image"""
+
+    backend_type = 'replay'
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.clock = clock
+        self.header: Dict[str, Any] = {}
+        self.records: List[Tuple[float, int, bytes]] = []
+        self.image = bytearray(WRAM_SIZE)
+        self._position = 0
+        self._start = None
+        self._lock = threading.Lock()
+
+    def connect(self) -> bool:
+        """Load the recording and start playback from t=0"""
+        try:
+            with open(self.path, 'r') as f:
+                self.header, self.records = load_session(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load replay {self.path}: {e}")
+            return False
+        self.rewind()
+        logger.info(f"▶️ Replaying {self.path}: {len(self.records)} records, {self.duration:.1f}s")
+        return True
+
+    @property
+    def duration(self) -> float:
+        return self.records[-1][0] if self.records else 0.0
+
+    def rewind(self):
+        """Restart playback from the beginning with a blank image"""
+        with self._lock:
+            self.image[:] = bytes(WRAM_SIZE)
+            self._position = 0
+            self._start = self.clock()
+
+    def advance_to(self, t: float):
+        """Apply every record up to session time t (seconds)"""
+        with self._lock:
+            while self._position < len(self.records) and self.records[self._position][0] <= t:
+                _, address, data = self.records[self._position]
+                offset = address - WRAM_BASE
+                self.image[offset:offset + len(data)] = data
+                self._position += 1
+
+    def _advance(self):
+        if self._start is None and not self.connect():
+            return
+        elapsed = (self.clock() - self._start) * self.speed
+        if self.loop and self.records and elapsed > self.duration and self._position >= len(self.records):
+            self.rewind()
+            elapsed = 0.0
+        self.advance_to(elapsed)
+
+    def read_ranges(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """Advance playback to now, then slice from the replayed image"""
+        self._advance()
+        if self._start is None:
+            return [None] * len(ranges)
+        with self._lock:
+            return [_slice_wram(self.image, address, size) for address, size in ranges]
+
+    def health(self) -> Dict[str, Any]:
+        loaded = self._start is not None or self.connect()
+        return {'backend': self.backend_type, 'connected': loaded, 'game_loaded': loaded,
+                'position': self._position, 'records': len(self.records)}
+
+    def identity(self) -> Dict[str, Any]:
+        return {'backend': self.backend_type,
+                'emulator': f"Replay of {self.header.get('backend', 'unknown')}",
+                'game': self.header.get('game')}
+
+
+def load_session(lines) -> Tuple[Dict[str, Any], List[Tuple[float, int, bytes]]]:
+    """Parse replay JSONL into (header, [(t, address, data), ...]) sorted by time"""
+    header: Dict[str, Any] = {}
+    records: List[Tuple[float, int, bytes]] = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        entry = json.loads(line)
+        if entry.get('type') == 'header':
+            header = entry
+            continue
+        address = int(entry['address'], 16)
+        data = bytes.fromhex(entry['data'])
+        if address < WRAM_BASE or address + len(data) > WRAM_BASE + WRAM_SIZE:
+            raise ValueError(f"record outside WRAM: {entry['address']}")
+        records.append((float(entry['t']), address, data))
+    records.sort(key=lambda record: record[0])
+    return header, records
+
+
+class SessionRecorder(EmulatorBackend):
+    """Wraps a live backend and records its successful reads as a replay session"""
+
+    def __init__(self, backend: EmulatorBackend, path: str,
+                 clock: Callable[[], float] = time.monotonic):
+        self.backend = backend
+        self.backend_type = backend.backend_type
+        self.path = path
+        self.clock = clock
+        self._file = None
+        self._start = None
+
+    def connect(self) -> bool:
+        if not self.backend.connect():
+            return False
+        self._open()
+        return True
+
+    def _open(self):
+        if self._file is not None:
+            return
+        self._file = open(self.path, 'w')
+        self._start = self.clock()
+        header = {'type': 'header', 'version': REPLAY_FORMAT_VERSION,
+                  'backend': self.backend.backend_type, 'game': self.backend.identity().get('game')}
+        self._file.write(json.dumps(header) + '\n')
+
+    def read_ranges(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        results = self.backend.read_ranges(ranges)
+        self._open()
+        t = round(self.clock() - self._start, 3)
+        for (address, _), data in zip(ranges, results):
+            if data is not None:
+                self._file.write(json.dumps({'t': t, 'address': f"0x{address:06X}", 'data': data.hex(' ')}) + '\n')
+        self._file.flush()
+        return results
+
+    def health(self) -> Dict[str, Any]:
+        return self.backend.health()
+
+    def identity(self) -> Dict[str, Any]:
+        return self.backend.identity()
+
+    def connection_info(self) -> Dict[str, Any]:
+        return self.backend.connection_info()
+
+    def invalidate_info(self, reason: str = ""):
+        self.backend.invalidate_info(reason)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.backend.close()
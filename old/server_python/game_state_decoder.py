@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Super Metroid Game State Decoder
+
+The stateless half of SuperMetroidGameStateParser: raw memory fields in,
+decoded stats, location, items, beams and boss rule flags out. Nothing here
+depends on earlier polls - what does (Mother Brain phases, Hyper Beam's MB2
+condition, Samus's ship) is tracked by ProgressTracker (progress_tracker.py),
+and the few tracker facts a decode needs are passed in as arguments.
+
+Decoding has no side effects beyond trace records and log lines, so a
+GameStateDecoder can run anywhere, e.g. one per worker process for batch
+decoding of recorded sessions.
+"""
+
+import logging
+from typing import Any, Dict, Mapping, Optional
+
+from memory_layout import BYTE, STATS_BLOCK, WORD
+from trace_log import TraceBuffer
+from bitfield_tables import HYPER_BEAMS, ITEM_TABLE, NO_BEAMS, NO_ITEMS, TRACKED_BEAM_TABLE
+from boss_rules import BossRuleEngine, decode_boss_words
+
+logger = logging.getLogger(__name__)
+
+AREA_NAMES = {
+    0: "Crateria", 1: "Brinstar", 2: "Norfair",
+    3: "Wrecked Ship", 4: "Maridia", 5: "Tourian"
+}
+# Common intro rooms (Crateria) where items shouldn't show as activated
+INTRO_ROOMS = (26652, 26740, 27262, 27250, 26718, 33266)
+LOCATION_FIELDS = ('room_id', 'area_id', 'game_state', 'player_x', 'player_y')
+
+class GameStateDecoder:
+    """Decodes raw Super Metroid memory fields; every method is a function of its arguments"""
+    
+    def __init__(self, boss_rules: Optional[BossRuleEngine] = None, trace: Optional[TraceBuffer] = None):
+        self.boss_rules = boss_rules or BossRuleEngine()
+        # Diagnostics sink only - decoding never reads it back
+        self.trace = trace if trace is not None else TraceBuffer()
+        self.areas = AREA_NAMES
+    
+    def _is_intro_scene(self, location_data: Optional[Dict[str, Any]] = None, health: int = 0) -> bool:
+        """
+        Detect if we're in the intro scene where items shouldn't show as activated.
+        Conservative detection to avoid false positives.
+        """
+        if not location_data:
+            return False
+            
+        area_id = location_data.get('area_id', 0)
+        room_id = location_data.get('room_id', 0)
+        
+        # Early game areas (Crateria) for intro detection
+        in_starting_area = (area_id == 0)  # Crateria
+        in_intro_rooms = (room_id in INTRO_ROOMS)
+        
+        # Health range for intro scene (99-150 HP typically)
+        has_starting_health = (99 <= health <= 150)
+        
+        # Only consider it intro if ALL conditions suggest early game
+        is_intro = (in_starting_area and has_starting_health and in_intro_rooms)
+        
+        if is_intro:
+            logger.info(f"🎬 INTRO SCENE DETECTED: Area={area_id}, Room={room_id}, Health={health} - filtering items")
+        
+        return is_intro
+
+    def parse_basic_stats(self, stats_data: bytes, location_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Parse basic stats from 22-byte health block"""
+        if not stats_data or len(stats_data) < STATS_BLOCK.size:
+            return {}
+        
+        # One precompiled unpack_from for the whole block
+        stats = STATS_BLOCK.unpack(stats_data)
+        health = stats['health']
+        
+        # Check if we're in intro scene - if so, filter non-energy items
+        is_intro = self._is_intro_scene(location_data, health)
+        
+        if is_intro:
+            # During intro: preserve health/energy, zero out missiles/supers/power bombs
+            for name in ('missiles', 'max_missiles', 'supers', 'max_supers', 'power_bombs', 'max_power_bombs'):
+                stats[name] = 0
+        
+        return stats
+    
+    def parse_location_data(self, room_id_data: bytes, area_id_data: bytes, 
+                           game_state_data: bytes, player_x_data: bytes, 
+                           player_y_data: bytes) -> Dict[str, Any]:
+        """Parse location and position data"""
+        location = {}
+        
+        if room_id_data and len(room_id_data) >= 2:
+            location['room_id'] = WORD.unpack_from(room_id_data)[0]
+        else:
+            location['room_id'] = 0
+            
+        if area_id_data and len(area_id_data) >= 1:
+            area_id = area_id_data[0]
+            location['area_id'] = area_id
+            location['area_name'] = self.areas.get(area_id, "")
+        else:
+            location['area_id'] = 0
+            location['area_name'] = ""
+            
+        if game_state_data and len(game_state_data) >= 2:
+            location['game_state'] = WORD.unpack_from(game_state_data)[0]
+        else:
+            location['game_state'] = 0
+            
+        if player_x_data and len(player_x_data) >= 2:
+            location['player_x'] = WORD.unpack_from(player_x_data)[0]
+        else:
+            location['player_x'] = 0
+            
+        if player_y_data and len(player_y_data) >= 2:
+            location['player_y'] = WORD.unpack_from(player_y_data)[0]
+        else:
+            location['player_y'] = 0
+            
+        return location
+    
+    def _should_reset_item_state(self, location_data: Optional[Dict[str, Any]] = None, health: int = 0, 
+                                missiles: int = 0, max_missiles: int = 0) -> bool:
+        """
+        Detect if item state should be reset due to new game, save state load, or game restart.
+        This prevents old item states from persisting when they shouldn't.
+        CONSERVATIVE: Only reset in very specific scenarios to avoid interfering with active gameplay.
+        """
+        if not location_data:
+            return False
+            
+        area_id = location_data.get('area_id', 0)
+        room_id = location_data.get('room_id', 0)
+        
+        # Reset scenarios - MUCH MORE CONSERVATIVE:
+        
+        # 1. Intro scene (very specific early game indicators)
+        in_starting_area = (area_id == 0)  # Crateria
+        has_starting_health = (health <= 99)  # Starting health or lower
+        in_intro_rooms = (room_id < 1000 or room_id == 0)  # Very early room IDs or invalid data
+        intro_scene = (in_starting_area and has_starting_health and in_intro_rooms)
+        
+        # 2. Save state contradiction: In boss rooms with impossible states
+        # Mother Brain room with depleted resources (likely save state to beginning after completing game)
+        in_mb_room = (area_id == 5 and room_id == 56664)
+        depleted_resources = (missiles == 0 and max_missiles > 100)  # No missiles but high capacity
+        low_health_post_fight = (health < 200 and health > 0)  # Low health suggesting post-fight
+        mb_room_contradiction = in_mb_room and depleted_resources and low_health_post_fight
+        
+        # 3. EXTREMELY CONSERVATIVE new game detection - only if we're SURE it's a new game
+        absolutely_new_game = (
+            health <= 99 and         # Starting health
+            max_missiles == 0 and    # NO missile capacity at all (true new game)
+            missiles == 0 and        # No missiles
+            area_id == 0 and         # In Crateria
+            room_id < 40000          # Early room (not end-game ship area)
+        )
+        
+        # 4. Zero progress indicator (health=0 means disconnected/invalid state)
+        zero_progress = (health == 0 and missiles == 0 and max_missiles == 0)
+        
+        # REMOVED: early_area_reset - too aggressive for active gameplay
+        
+        should_reset = intro_scene or mb_room_contradiction or absolutely_new_game or zero_progress
+        
+        if should_reset:
+            reset_reason = ("intro scene" if intro_scene else
+                          "MB room contradiction" if mb_room_contradiction else
+                          "absolutely new game" if absolutely_new_game else
+                          "zero progress" if zero_progress else
+                          "unknown")
+            logger.info(f"🔄 ITEM STATE RESET: {reset_reason} detected - Area:{area_id}, Room:{room_id}, Health:{health}, Missiles:{missiles}/{max_missiles}")
+        
+        return should_reset
+
+    def parse_items(self, items_data: bytes, location_data: Optional[Dict[str, Any]] = None, health: int = 0) -> Dict[str, bool]:
+        """Parse item collection status"""
+        if not items_data or len(items_data) < 2:
+            return {}
+            
+        items_value = WORD.unpack_from(items_data)[0]
+        
+        # Get additional context for reset detection
+        missiles = location_data.get('missiles', 0) if location_data else 0
+        max_missiles = location_data.get('max_missiles', 0) if location_data else 0
+        
+        # Check if we should reset item state
+        should_reset = self._should_reset_item_state(location_data, health, missiles, max_missiles)
+        
+        if should_reset:
+            # Reset all items to False (not collected)
+            return NO_ITEMS
+        
+        # Normal parsing when no reset needed (shared mapping per word, see bitfield_tables.py)
+        return ITEM_TABLE[items_value]
+    
+    def parse_beams(self, beams_data: bytes, location_data: Optional[Dict[str, Any]] = None, health: int = 0,
+                    mb2_detected: bool = False) -> Dict[str, bool]:
+        """Parse beam weapon status (Hyper Beam needs MB2, which the tracker knows)"""
+        if not beams_data or len(beams_data) < 2:
+            return {}
+            
+        beams_value = WORD.unpack_from(beams_data)[0]
+        
+        # Always log raw beam value for debugging
+        self.trace.record('beams', "🔍 Raw beam value: 0x%04X (%s)", beams_value, beams_value)
+        
+        # Get additional context for reset detection
+        missiles = location_data.get('missiles', 0) if location_data else 0
+        max_missiles = location_data.get('max_missiles', 0) if location_data else 0
+        
+        # Check if we should reset beam state (same logic as items)
+        should_reset = self._should_reset_item_state(location_data, health, missiles, max_missiles)
+        
+        if should_reset:
+            # Reset all beams to starting state (NO beams - everything must be collected)
+            self.trace.record('beams', "🔄 BEAM STATE RESET: Resetting to starting state (no beams)")
+            return NO_BEAMS
+        
+        # HYPER BEAM DETECTION FIRST - Check for context clues that indicate hyper beam state
+        has_hyper_beam = False
+        has_plasma_beam = bool(beams_value & 0x0008)
+        
+        # Hyper beam detection - only detect when truly in post-game escape sequence
+        # Be much more conservative about hyper beam detection
+        area_id = location_data.get('area_id', 0) if location_data else 0
+        room_id = location_data.get('room_id', 0) if location_data else 0
+        
+        # Hyper beam should ONLY be detected in very specific escape sequence contexts
+        # Current logic is too aggressive and conflicts with normal plasma beam gameplay
+        in_escape_sequence = (area_id == 5 and room_id in [56867]) # Very specific escape rooms only
+        has_all_beams = bool(beams_value & 0x1000) and bool(beams_value & 0x0002) and bool(beams_value & 0x0001) and bool(beams_value & 0x0004) and has_plasma_beam
+        
+        # Only detect hyper beam in the actual escape sequence, not normal gameplay
+        if in_escape_sequence and has_all_beams and mb2_detected:
+            self.trace.record('beams', "🌟 HYPER BEAM detected in escape sequence: area=%s, room=%s", area_id, room_id)
+            has_hyper_beam = True
+            has_plasma_beam = False  # Hyper replaces plasma only in escape
+        else:
+            # Normal gameplay - user has plasma beam normally
+            self.trace.record('beams', "🔫 PLASMA BEAM detected in normal gameplay: area=%s, room=%s", area_id, room_id)
+        
+        beams = HYPER_BEAMS if has_hyper_beam else TRACKED_BEAM_TABLE[beams_value]
+        
+        self.trace.record('beams', "🔍 Beam analysis: charge=%s, ice=%s, wave=%s, spazer=%s, plasma=%s, hyper=%s", beams['charge'], beams['ice'], beams['wave'], beams['spazer'], beams['plasma'], beams['hyper'])
+        
+        return beams
+    
+    def detect_samus_ship(self, boss_memory_data: Dict[str, bytes], location_data: Dict[str, Any], 
+                          main_mb_complete: bool, mb1_complete: bool, mb2_complete: bool) -> bool:
+        """Detect when Samus has reached her ship (end-game completion) - hybrid approach"""
+        if not location_data:
+            logger.debug("Ship detection: No location data")
+            return False
+            
+        area_id = location_data.get('area_id', 0)
+        room_id = location_data.get('room_id', 0)
+        player_x = location_data.get('player_x', 0)
+        player_y = location_data.get('player_y', 0)
+        
+        # ❗️2. FORCE SHIP DETECTION - Early return if MB2 complete and position valid
+        # DISABLED: This was too aggressive and triggered when near ship, not on ship
+        # if mb2_complete and player_x > 900 and player_x < 1200 and player_y > 1100 and player_y < 1300:
+        #     logger.info(f"🚢 FORCE SHIP DETECTION: MB2 complete and ON SHIP position ({player_x}, {player_y})")
+        #     return True
+        
+        # Debug current state
+        self.trace.record('ship', "🚢 Ship Debug - Area: %s, Room: %s, Pos: (%s,%s)", area_id, room_id, player_x, player_y)
+        self.trace.record('ship', "🚢 Ship Debug - MB Status: main=%s, MB1=%s, MB2=%s", main_mb_complete, mb1_complete, mb2_complete)
+        
+        # Check if Mother Brain sequence is complete
+        mother_brain_complete = main_mb_complete or (mb1_complete and mb2_complete)
+        partial_mb_complete = mb1_complete  # MB1 completion indicates significant progress
+        
+        if not mother_brain_complete and not partial_mb_complete:
+            self.trace.record('ship', "🚢 Ship Debug - No Mother Brain progress")
+            return False
+        
+        # METHOD 1: OFFICIAL AUTOSPLITTER DETECTION (high priority)
+        ship_ai_val = 0
+        event_flags_val = 0
+        
+        if boss_memory_data.get('ship_ai') and len(boss_memory_data['ship_ai']) >= 2:
+            ship_ai_val = WORD.unpack_from(boss_memory_data['ship_ai'])[0]
+        if boss_memory_data.get('event_flags') and len(boss_memory_data['event_flags']) >= 1:
+            event_flags_val = BYTE.unpack_from(boss_memory_data['event_flags'])[0]
+            
+        zebes_ablaze = (event_flags_val & 0x40) > 0
+        ship_ai_reached = (ship_ai_val == 0xaa4f)
+        official_ship_detection = zebes_ablaze and ship_ai_reached
+        
+        self.trace.record('ship', "🚢 OFFICIAL DETECTION - shipAI: 0x%04X, eventFlags: 0x%02X", ship_ai_val, event_flags_val)
+        self.trace.record('ship', "🚢 zebesAblaze: %s, shipAI_reached: %s", zebes_ablaze, ship_ai_reached)
+        
+        if official_ship_detection:
+            self.trace.record('ship', "🚢 ✅ OFFICIAL SHIP DETECTION: Zebes ablaze + shipAI 0xaa4f = SHIP REACHED!")
+            return True
+        
+        # METHOD 2: RELAXED AREA DETECTION
+        # Try both traditional Crateria (area 0) AND escape sequence areas
+        in_crateria = (area_id == 0)
+        in_possible_escape_area = (area_id in [0, 1, 2, 3, 4, 5])  # Be more permissive with areas
+        
+        self.trace.record('ship', "🚢 AREA CHECK - inCrateria: %s, inPossibleEscape: %s", in_crateria, in_possible_escape_area)
+        
+        # METHOD 3: EMERGENCY SHIP DETECTION - If MB2 complete + reasonable position data
+        # DISABLED: Too aggressive - triggers anywhere in Crateria after MB2
+        # This catches cases where area detection fails but user is clearly at ship
+        emergency_conditions = (
+            mb2_complete and  # MB2 must be complete
+            (area_id == 0 or area_id == 5) and  # Common areas during escape/ship sequence  
+            (player_x > 1200 and player_y > 1300)  # Must be in very specific ship coordinates
+        )
+        
+        if emergency_conditions:
+            self.trace.record('ship', "🚢 🚨 EMERGENCY SHIP DETECTION: MB2 complete + valid area/position!")
+            return True
+        
+        # If we have MB2 complete, be VERY permissive with area detection
+        # (the area memory might be wrong or the escape sequence uses different areas)
+        if mb2_complete:
+            self.trace.record('ship', "🚢 MB2 COMPLETE - Using relaxed area detection")
+            area_check_passed = in_possible_escape_area
+        else:
+            area_check_passed = in_crateria
+            
+        if not area_check_passed:
+            self.trace.record('ship', "🚢 Ship Debug - Area check failed (area=%s), ship detection blocked", area_id)
+            return False
+        
+        # METHOD 3: POSITION-BASED DETECTION (backup - was working before)
+        precise_landing_site_rooms = [31224, 37368]  # Known working rooms
+        reasonable_ship_room_ranges = [(31220, 31230), (37360, 37375), (0, 100)]  # Added room 0 range for escape
+        
+        in_exact_ship_room = room_id in precise_landing_site_rooms
+        in_ship_room_range = any(start <= room_id <= end for start, end in reasonable_ship_room_ranges)
+        
+        # Position-based criteria (RELAXED for escape sequence) 
+        ship_exact_x_range = (1150 <= player_x <= 1350)  # Precise ship coordinates
+        ship_exact_y_range = (1080 <= player_y <= 1380)  # Extended downward for ship entry
+        precise_ship_position = ship_exact_x_range and ship_exact_y_range
+        ship_escape_x_range = (1100 <= player_x <= 1400)  # Much more restrictive X range for ship area
+        ship_escape_y_range = (1050 <= player_y <= 1400)  # Extended downward for ship area
+        broad_ship_position = ship_escape_x_range and ship_escape_y_range
+        
+        self.trace.record('ship', "🚢 POSITION DETECTION - Room: %s, ExactRoom: %s, RangeRoom: %s", room_id, in_exact_ship_room, in_ship_room_range)
+        self.trace.record('ship', "🚢 POSITION DETECTION - Pos: (%s,%s), PrecisePos: %s, BroadPos: %s", player_x, player_y, precise_ship_position, broad_ship_position)
+        
+        # Position-based ship criteria
+        exact_position_detection = in_exact_ship_room and precise_ship_position
+        escape_sequence_detection = in_ship_room_range and broad_ship_position  # RELAXED: Any reasonable room + broad position
+        position_ship_detection = exact_position_detection or escape_sequence_detection
+        
+        # METHOD 4: EMERGENCY SHIP DETECTION FOR MB2 COMPLETE
+        # DISABLED: Extremely aggressive - triggers anywhere after MB2 completion
+        # If MB2 is complete and we're in ANY reasonable area/room, assume ship reached
+        # if mb2_complete and (room_id > 0 or player_x > 0 or player_y > 0):  # Basic sanity check for valid data
+        #     logger.info(f"🚢 🚨 EMERGENCY SHIP DETECTION: MB2 complete + valid position data = SHIP REACHED!")
+        #     logger.info(f"🚢 🚨 ACTUAL VALUES - Area:{area_id}, Room:{room_id}, X:{player_x}, Y:{player_y}")
+        #     logger.info(f"🚢 🚨 PLEASE RECORD THESE VALUES FOR FUTURE SHIP DETECTION!")
+        #     return True
+        
+        if position_ship_detection:
+            detection_type = "precise" if exact_position_detection else "escape_sequence"
+            self.trace.record('ship', "🚢 ✅ POSITION SHIP DETECTION (%s): MB complete + area OK + correct room + ship position!", detection_type)
+            return True
+        
+        self.trace.record('ship', "🚢 ❌ Ship not detected by any method")
+        return False
+
+    def boss_flags(self, boss_memory_data: Mapping[str, Any]) -> Dict[str, bool]:
+        """Boss defeat flags from the compiled rule table (see boss_rules.py), without the MB phases"""
+        if not boss_memory_data:
+            return {}
+        boss_words = decode_boss_words(boss_memory_data)
+        bosses = self.boss_rules.evaluate(boss_words)
+        self.trace.record('bosses', "🏆 Boss words: %s → %s", boss_words, bosses)
+        return bosses
+    
+    def decode(self, memory_data: Mapping[str, Any], mb2_detected: bool = False) -> Dict[str, Any]:
+        """
+        Decode one poll's memory fields into a game_state dict without the
+        tracked flags (mother_brain_1/2, samus_ship). Hyper Beam is only
+        reported if the caller says MB2 is done.
+        """
+        game_state = self.parse_location_data(*(memory_data.get(name) for name in LOCATION_FIELDS))
+        location_data = {name: game_state[name] for name in LOCATION_FIELDS}
+        stats = self.parse_basic_stats(memory_data.get('basic_stats'), location_data)
+        game_state.update(stats)
+        location_data['missiles'] = stats.get('missiles', 0)
+        location_data['max_missiles'] = stats.get('max_missiles', 0)
+        health = game_state.get('health', 0)
+        game_state['items'] = self.parse_items(memory_data.get('items'), location_data, health)
+        game_state['beams'] = self.parse_beams(memory_data.get('beams'), location_data, health, mb2_detected)
+        game_state['bosses'] = self.boss_flags({k: v for k, v in memory_data.items()
+                                                if k.startswith('boss') or k == 'main_bosses' or k == 'crocomire'})
+        return game_state
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Pre-serialized JSON Views
+
+The poller's state changes at most once per poll, but every /api/status,
+/game_state and /api/stats request used to rebuild and json.dumps it.
+A ViewStore holds each view as compact JSON bytes, serialized once by the
+poll thread when the view is published. HTTP handlers just write the
+stored buffer.
+
+Every distinct body gets a new version, and its ETag is
+"<store epoch>-<version>". The epoch is per process, so a restarted server
+never matches a stale ETag. Republishing an identical body keeps the old
+version, so a client sending If-None-Match gets 304 Not Modified until
+the content really changes.
+
+A view can be versioned on part of its payload instead (version_key), e.g.
+the status view without its per-poll counters. Its body is still replaced
+every publish, but the version only moves when the key changes, and the
+ETag is weak (W/"...") because equal tags no longer mean equal bytes.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JsonView(NamedTuple):
+    """One serialized view: its ETag, version and UTF-8 JSON body"""
+    etag: str
+    version: int
+    body: bytes
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value covers etag (weak comparison, '*' matches anything)"""
+    if not if_none_match:
+        return False
+    etag = etag.removeprefix('W/')
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+class ViewStore:
+    """Named JSON views, republished by one writer and read by any thread"""
+
+    def __init__(self):
+        self.epoch = f"{int(time.time() * 1000):x}"
+        self.version = 0
+        self._views: Dict[str, JsonView] = {}
+        self._keys: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self.publishes = 0
+        self.unchanged = 0
+
+    def publish(self, name: str, payload: Any, version_key: Any = None) -> JsonView:
+        """
+        Serialize payload as view `name`. The version and ETag change only
+        when version_key (the payload itself by default) serializes
+        differently; an unchanged key keeps them.
+        """
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        key = body if version_key is None else json.dumps(version_key, separators=(',', ':')).encode()
+        with self._lock:
+            self.publishes += 1
+            current = self._views.get(name)
+            if current is not None and self._keys[name] == key:
+                self.unchanged += 1
+                if current.body != body:
+                    current = self._views[name] = current._replace(body=body)
+                return current
+            self.version += 1
+            etag = f'"{self.epoch}-{self.version}"'
+            view = JsonView(etag if version_key is None else 'W/' + etag, self.version, body)
+            self._views[name] = view
+            self._keys[name] = key
+            return view
+
+    def get(self, name: str) -> Optional[JsonView]:
+        return self._views.get(name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'epoch': self.epoch,
+                'version': self.version,
+                'publishes': self.publishes,
+                'unchanged': self.unchanged,
+                'views': {name: {'version': view.version, 'bytes': len(view.body)}
+                          for name, view in self._views.items()},
+            }
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Non-blocking Logging Pipeline
+
+Shared logging setup for the server scripts. The root logger only gets a
+QueueHandler, so a log call on the poll thread is a non-blocking queue put.
+A background QueueListener does the file and terminal I/O. The log file
+rotates by size (or by time with rotate_when='midnight', ...) so marathon
+sessions don't grow it without bound. If the listener falls behind (a
+stalled disk or terminal) and the queue fills, records are dropped and
+counted instead of blocking the caller.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_QUEUE_SIZE = 10000
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full instead of blocking"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() waits for room in a full queue instead of raising queue.Full"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class LoggingPipeline:
+    """Root QueueHandler plus the QueueListener that owns the real handlers"""
+
+    def __init__(self, queue_handler: DroppingQueueHandler, listener: DrainingQueueListener,
+                 log_file: Optional[str]):
+        self.queue_handler = queue_handler
+        self.listener = listener
+        self.log_file = log_file
+        self.running = True
+
+    def stop(self):
+        """Flush queued records and stop the listener thread"""
+        if self.running:
+            self.running = False
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'log_file': self.log_file,
+            'queued': self.queue_handler.queue.qsize(),
+            'queue_size': self.queue_handler.queue.maxsize,
+            'dropped': self.queue_handler.dropped,
+            'running': self.running,
+        }
+
+
+_pipeline: Optional[LoggingPipeline] = None
+
+
+def setup_logging(log_file: Optional[str] = None, level: int = logging.INFO,
+                  max_bytes: int = DEFAULT_MAX_BYTES, backup_count: int = DEFAULT_BACKUP_COUNT,
+                  rotate_when: Optional[str] = None, console: bool = True,
+                  queue_size: int = DEFAULT_QUEUE_SIZE) -> LoggingPipeline:
+    """
+    Route the root logger through a bounded queue to a rotating file and stdout.
+
+    Rotation is by size (max_bytes) unless rotate_when is given, e.g.
+    'midnight' or 'H' for TimedRotatingFileHandler. Calling it again replaces
+    the previous pipeline.
+    """
+    global _pipeline
+    if _pipeline is not None:
+        _pipeline.stop()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_file:
+        if rotate_when:
+            file_handler = logging.handlers.TimedRotatingFileHandler(log_file, when=rotate_when,
+                                                                     backupCount=backup_count, encoding='utf-8')
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes,
+                                                                backupCount=backup_count, encoding='utf-8')
+        handlers.append(file_handler)
+    if console:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = DrainingQueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener.start()
+    _pipeline = LoggingPipeline(queue_handler, listener, log_file)
+    return _pipeline
+
+
+def logging_stats() -> Dict[str, Any]:
+    """Stats of the active pipeline ({} before setup_logging)"""
+    return _pipeline.stats() if _pipeline else {}
+
+
+def shutdown_logging():
+    """Stop the active pipeline, flushing whatever is still queued"""
+    global _pipeline
+    if _pipeline is not None:
+        _pipeline.stop()
+        logging.getLogger().removeHandler(_pipeline.queue_handler)
+        _pipeline = None
+
+
+atexit.register(shutdown_logging)
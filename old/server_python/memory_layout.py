@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Super Metroid Memory Layout
+
+Single declarative table of every memory-mapped field the trackers decode:
+name, SNES address and struct type code. The parser and both legacy trackers
+build their memory_map from it, and contiguous blocks (the 22-byte stats
+block) are compiled once into a precompiled struct.Struct, so decoding a
+block is a single unpack_from call instead of one struct.unpack per field.
+"""
+
+import struct
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+# Shared precompiled unpackers for single fields
+WORD = struct.Struct('<H')
+BYTE = struct.Struct('<B')
+
+
+class LayoutField(NamedTuple):
+    """A memory-mapped value: struct type code 'H' (16-bit little-endian word) or 'B' (byte)"""
+    name: str
+    address: int
+    type: str = 'H'
+
+    @property
+    def size(self) -> int:
+        return struct.calcsize('<' + self.type)
+
+
+MEMORY_LAYOUT: Tuple[LayoutField, ...] = (
+    # Samus stats (the 22-byte block at 0x7E09C2)
+    LayoutField('health', 0x7E09C2),
+    LayoutField('max_health', 0x7E09C4),
+    LayoutField('missiles', 0x7E09C6),
+    LayoutField('max_missiles', 0x7E09C8),
+    LayoutField('supers', 0x7E09CA),
+    LayoutField('max_supers', 0x7E09CC),
+    LayoutField('power_bombs', 0x7E09CE),
+    LayoutField('max_power_bombs', 0x7E09D0),
+    LayoutField('max_reserve_energy', 0x7E09D4),
+    LayoutField('reserve_energy', 0x7E09D6),
+
+    # Location
+    LayoutField('game_state', 0x7E0998),
+    LayoutField('room_id', 0x7E079B),
+    LayoutField('area_id', 0x7E079F, 'B'),
+    LayoutField('player_x', 0x7E0AF6),
+    LayoutField('player_y', 0x7E0AFA),
+
+    # Progress bitfields
+    LayoutField('items', 0x7E09A4),
+    LayoutField('beams', 0x7E09A8),
+    LayoutField('bosses', 0x7ED828),
+    LayoutField('crocomire', 0x7ED829),
+    LayoutField('events_flags', 0x7ED870),
+)
+
+LAYOUT_BY_NAME: Dict[str, LayoutField] = {field.name: field for field in MEMORY_LAYOUT}
+
+# memory_map keys used by the legacy trackers for the same fields
+TRACKER_ALIASES: Dict[str, str] = {
+    'items_collected': 'items',
+    'beams_collected': 'beams',
+    'bosses_defeated': 'bosses',
+    'crocomire_defeated': 'crocomire',
+}
+
+
+def memory_map(names: Optional[Sequence[str]] = None,
+               aliases: Optional[Mapping[str, str]] = None) -> Dict[str, int]:
+    """name -> address for the given layout fields (all by default), optionally renamed via aliases"""
+    renamed = {field: alias for alias, field in (aliases or {}).items()}
+    fields = MEMORY_LAYOUT if names is None else [LAYOUT_BY_NAME[name] for name in names]
+    return {renamed.get(field.name, field.name): field.address for field in fields}
+
+
+class BlockLayout:
+    """A contiguous memory block decoded by one precompiled struct.Struct"""
+
+    def __init__(self, name: str, address: int, fields: Sequence[LayoutField], size: Optional[int] = None):
+        fields = sorted(fields, key=lambda field: field.address)
+        fmt = '<'
+        offset = 0
+        for field in fields:
+            gap = field.address - address - offset
+            if gap < 0:
+                raise ValueError(f"{field.name} overlaps the previous field in block {name}")
+            fmt += 'x' * gap + field.type
+            offset += gap + field.size
+        if size is not None:
+            if size < offset:
+                raise ValueError(f"block {name} is {size} bytes but its fields need {offset}")
+            fmt += 'x' * (size - offset)
+
+        self.name = name
+        self.address = address
+        self.names: Tuple[str, ...] = tuple(field.name for field in fields)
+        self.struct = struct.Struct(fmt)
+
+    @property
+    def size(self) -> int:
+        return self.struct.size
+
+    def unpack(self, data: Any) -> Dict[str, int]:
+        """Decode the block (bytes, bytearray or memoryview of at least self.size bytes)"""
+        return dict(zip(self.names, self.struct.unpack_from(data)))
+
+
+STATS_FIELDS = ('health', 'max_health', 'missiles', 'max_missiles', 'supers', 'max_supers',
+                'power_bombs', 'max_power_bombs', 'max_reserve_energy', 'reserve_energy')
+
+# Samus stats block - one read, one unpack_from (bytes 16-17 are not tracked)
+STATS_BLOCK = BlockLayout('basic_stats', LAYOUT_BY_NAME['health'].address,
+                          [LAYOUT_BY_NAME[name] for name in STATS_FIELDS], size=22)
+
+# Equipment bitfields (items word at 0x7E09A4, beams word at 0x7E09A8)
+ITEM_BITS: Tuple[Tuple[str, int], ...] = (
+    ('morph', 0x0004), ('bombs', 0x1000), ('varia', 0x0001), ('gravity', 0x0020),
+    ('hijump', 0x0100), ('speed', 0x2000), ('space', 0x0200), ('screw', 0x0008),
+    ('spring', 0x0002), ('xray', 0x8000), ('grapple', 0x4000),
+)
+BEAM_BITS: Tuple[Tuple[str, int], ...] = (
+    ('charge', 0x1000), ('ice', 0x0002), ('wave', 0x0001), ('spazer', 0x0004), ('plasma', 0x0008),
+)
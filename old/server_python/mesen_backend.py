@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Mesen HTTP Backend
+
+EmulatorBackend over Mesen 2's HTTP API (see src/server/mesenBackend.ts):
+  GET /api/state                                   emulator state
+  GET /api/game                                    loaded game
+  GET /api/memory/read?address=0x7e09a2&length=N   memory bytes
+
+Mesen has no multi-range read, so read_ranges issues one request per range
+over a single keep-alive connection instead of a new TCP handshake each time.
+The /api/state + /api/game probe behind health() / identity() is TTL-cached
+like the RetroArch backend's VERSION / GET_STATUS probe.
+"""
+
+import http.client
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from emulator_backend import EmulatorBackend
+
+logger = logging.getLogger(__name__)
+
+
+def decode_memory_payload(data: Any) -> Optional[bytes]:
+    """Accept the response shapes Mesen builds return: {bytes: [...]}, {data: [...]}, [...] or a hex string"""
+    if isinstance(data, dict):
+        data = data.get('bytes', data.get('data'))
+    if isinstance(data, list):
+        try:
+            return bytes(data)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(data, str):
+        try:
+            return bytes.fromhex(data.replace('0x', '').replace(' ', ''))
+        except ValueError:
+            return None
+    return None
+
+
+class MesenHTTPBackend(EmulatorBackend):
+    """Mesen 2 HTTP API backend with a persistent connection"""
+
+    backend_type = 'mesen'
+
+    def __init__(self, host: str = "localhost", http_port: int = 9876, timeout: float = 5.0,
+                 info_ttl: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self.host = host
+        self.http_port = http_port
+        self.timeout = timeout
+        self.info_ttl = info_ttl  # seconds a positive connection/game-loaded probe stays valid
+        self.clock = clock
+        self.conn: Optional[http.client.HTTPConnection] = None
+        self._info_cache: Optional[Dict[str, Any]] = None
+        self._info_cached_at = 0.0
+        self.info_cache_hits = 0
+        self.info_cache_misses = 0
+
+    def connect(self) -> bool:
+        """Open the keep-alive connection and check the API answers"""
+        self.close()
+        self.conn = http.client.HTTPConnection(self.host, self.http_port, timeout=self.timeout)
+        return self._get_json('/api/state') is not None
+
+    def close(self):
+        """Close the HTTP connection"""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def _get_json(self, path: str) -> Optional[Any]:
+        # One retry on a fresh connection - the server may have closed an idle keep-alive
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.http_port, timeout=self.timeout)
+            try:
+                self.conn.request('GET', path, headers={'Accept': 'application/json'})
+                response = self.conn.getresponse()
+                body = response.read()
+                if response.status != 200:
+                    logger.debug(f"Mesen HTTP {response.status} for {path}")
+                    return None
+                return json.loads(body)
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                logger.debug(f"Mesen request {path} failed (attempt {attempt + 1}): {e}")
+                self.close()
+        return None
+
+    def read_ranges(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """One /api/memory/read per range over the shared connection"""
+        results: List[Optional[bytes]] = []
+        for address, size in ranges:
+            data = decode_memory_payload(self._get_json(f"/api/memory/read?address=0x{address:x}&length={size}"))
+            results.append(data if data is not None and len(data) == size else None)
+        if results and all(data is None for data in results):
+            self.invalidate_info("memory read failed")
+        return results
+
+    def invalidate_info(self, reason: str = ""):
+        """Drop the cached probe so the next health() asks Mesen again"""
+        if self._info_cache is not None:
+            logger.debug(f"Mesen probe cache invalidated{': ' + reason if reason else ''}")
+        self._info_cache = None
+
+    def _probe(self) -> Dict[str, Any]:
+        """
+        One /api/state and one /api/game request. A positive result
+        (connected, game loaded) is cached for info_ttl seconds; negative
+        results are never cached.
+        """
+        now = self.clock()
+        if self._info_cache is not None and now - self._info_cached_at < self.info_ttl:
+            self.info_cache_hits += 1
+            return self._info_cache
+
+        self.info_cache_misses += 1
+        state = self._get_json('/api/state')
+        game = self._get_json('/api/game') if state is not None else None
+        if not isinstance(game, dict):
+            game = {}
+        game_loaded = bool(game.get('loaded') or game.get('running') or game.get('name') or game.get('title')
+                           or (isinstance(state, dict) and (state.get('running') or state.get('loaded'))))
+        info = {'connected': state is not None, 'game_loaded': game_loaded,
+                'game': game.get('name') or game.get('title')}
+        if info['connected'] and info['game_loaded']:
+            self._info_cache = info
+            self._info_cached_at = now
+        else:
+            self._info_cache = None
+        return info
+
+    def health(self) -> Dict[str, Any]:
+        """Connected if /api/state answers; game loaded per /api/game (or state flags)"""
+        info = self._probe()
+        return {'backend': self.backend_type, 'connected': info['connected'], 'game_loaded': info['game_loaded']}
+
+    def identity(self) -> Dict[str, Any]:
+        """Mesen HTTP API and the loaded game's name"""
+        return {
+            'backend': self.backend_type,
+            'emulator': 'Mesen (HTTP API)',
+            'game': self._probe()['game'],
+        }
+
+    def connection_info(self) -> Dict[str, Any]:
+        """Connection info in the poller's cache shape, from a single probe"""
+        info = self._probe()
+        return {
+            'connected': info['connected'],
+            'retroarch_version': 'Mesen (HTTP API)',
+            'game_info': info['game'],
+            'game_loaded': info['game_loaded'],
+        }
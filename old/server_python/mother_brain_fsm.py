@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Mother Brain Phase State Machine
+
+Explicit state machine for the Mother Brain fight, replacing the
+mb1_detected/mb2_detected cache flags and the reset/validation passes that
+re-derived them every poll. Phases, in order of progress:
+
+  pre_fight   MB1 not beaten, outside the MB room
+  mb1         MB1 not beaten, in the MB room
+  mb2_active  MB1 beaten, MB2 not yet
+  mb2_done    MB2 beaten
+  escape      MB2 beaten, escape timer running
+  ship        MB2 beaten, Samus reached her ship
+
+Each poll the parser decodes a small input vector (MBInputs) and
+transition() maps (state, inputs) to the next state plus the reported
+MB1/MB2 flags in constant time. The detection rules are the ones
+parse_bosses used (official HP transitions, Hyper Beam, escape timers,
+boss HP, memory signatures, save state contradictions); only the
+bookkeeping is new. Phase changes are kept in a bounded history, and
+snapshot()/restore() make a run replayable from recorded inputs.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from memory_layout import WORD
+
+logger = logging.getLogger(__name__)
+
+PRE_FIGHT = 'pre_fight'
+MB1 = 'mb1'
+MB2_ACTIVE = 'mb2_active'
+MB2_DONE = 'mb2_done'
+ESCAPE = 'escape'
+SHIP = 'ship'
+PHASES = (PRE_FIGHT, MB1, MB2_ACTIVE, MB2_DONE, ESCAPE, SHIP)
+
+# phase -> (mb1_detected, mb2_detected)
+PHASE_FLAGS: Dict[str, Tuple[bool, bool]] = {
+    PRE_FIGHT: (False, False),
+    MB1: (False, False),
+    MB2_ACTIVE: (True, False),
+    MB2_DONE: (True, True),
+    ESCAPE: (True, True),
+    SHIP: (True, True),
+}
+
+# Official phase thresholds (from the autosplitter community)
+PHASE_2_HP = 18000   # 0x4650
+PHASE_3_HP = 36000   # 0x8CA0
+
+MB_ROOM_ID = 56664
+ESCAPE_TIMER_FIELDS = tuple(f'escape_timer_{i}' for i in range(1, 13))
+SCAN_FIELDS = (('scan_090x', 0x7E0900), ('scan_094x', 0x7E0940), ('scan_09Ex', 0x7E09E0))
+DEFAULT_HISTORY_SIZE = 100
+GOLDEN_TORIZO = 'golden torizo false positive'
+
+
+class MBInputs(NamedTuple):
+    """Per-poll inputs to the MB state machine"""
+    area_id: int = 0
+    room_id: int = 0
+    official_hp: int = 0
+    boss_hp_1: int = 0
+    boss_hp_2: int = 0
+    boss_hp_3: int = 0
+    boss_plus_1: int = 0
+    boss_plus_2: int = 0
+    escape_timer: bool = False           # any escape timer or a timer-like value in the memory scans
+    escape_timer_primary: bool = False   # escape_timer_1..6 only
+    hyper_beam: bool = False             # from the parsed beams
+    hyper_beam_memory: bool = False      # hyper bit of a raw 'beams' word passed with the boss memory
+    missiles: int = 0
+    max_missiles: int = 0
+    health: int = 0
+    max_health: int = 0
+
+    @property
+    def in_mb_room(self) -> bool:
+        """Mother Brain room (area 5 or 10)"""
+        return self.area_id in (5, 10) and self.room_id == MB_ROOM_ID
+
+    @property
+    def no_boss_hp(self) -> bool:
+        return not (self.boss_hp_1 or self.boss_hp_2 or self.boss_hp_3)
+
+
+class MBSnapshot(NamedTuple):
+    """Everything transition() depends on besides the inputs"""
+    phase: str = PRE_FIGHT
+    previous_hp: int = 0
+
+
+class MBResult(NamedTuple):
+    """transition() output: next state plus the MB flags to report for this poll"""
+    state: MBSnapshot
+    mb1: bool
+    mb2: bool
+    prior_mb1: bool      # MB1 flag after the save state checks, before detection
+    method: str
+    reason: str
+
+
+class MBTransition(NamedTuple):
+    time: float
+    poll: int
+    source: str
+    target: str
+    reason: str
+
+
+def _word(data: Any) -> int:
+    return WORD.unpack_from(data)[0] if data and len(data) >= 2 else 0
+
+
+def mb_inputs(boss_memory_data: Mapping[str, Any], location_data: Optional[Mapping[str, Any]] = None) -> MBInputs:
+    """Decode the MB input vector from the boss memory fields and the parsed location/stats"""
+    location_data = location_data or {}
+    timers = [_word(boss_memory_data.get(name)) for name in ESCAPE_TIMER_FIELDS]
+    escape_timer = any(timers)
+    if not escape_timer:
+        # A timer-like value anywhere in the scanned blocks also counts
+        for name, _ in SCAN_FIELDS:
+            scan_data = boss_memory_data.get(name)
+            if scan_data and any(100 <= value[0] for value in WORD.iter_unpack(scan_data[:len(scan_data) & ~1])):
+                escape_timer = True
+                break
+    beams = location_data.get('beams', {})
+    return MBInputs(
+        area_id=location_data.get('area_id', 0),
+        room_id=location_data.get('room_id', 0),
+        official_hp=_word(boss_memory_data.get('mother_brain_official_hp')),
+        boss_hp_1=_word(boss_memory_data.get('boss_hp_1')),
+        boss_hp_2=_word(boss_memory_data.get('boss_hp_2')),
+        boss_hp_3=_word(boss_memory_data.get('boss_hp_3')),
+        boss_plus_1=_word(boss_memory_data.get('boss_plus_1')),
+        boss_plus_2=_word(boss_memory_data.get('boss_plus_2')),
+        escape_timer=escape_timer,
+        escape_timer_primary=any(timers[:6]),
+        hyper_beam=bool(beams.get('hyper', False)) if isinstance(beams, dict) else False,
+        hyper_beam_memory=bool(_word(boss_memory_data.get('beams')) & 0x1000),
+        missiles=location_data.get('missiles', 0),
+        max_missiles=location_data.get('max_missiles', 0),
+        health=location_data.get('health', 0),
+        max_health=location_data.get('max_health', 0),
+    )
+
+
+def phase_for(mb1: bool, mb2: bool, in_mb_room: bool = False, escape: bool = False) -> str:
+    """The phase for a pair of MB flags (MB2 implies MB1)"""
+    if mb2:
+        return ESCAPE if escape else MB2_DONE
+    if mb1:
+        return MB2_ACTIVE
+    return MB1 if in_mb_room else PRE_FIGHT
+
+
+def _detect(x: MBInputs, previous_hp: int, mb1: bool) -> Tuple[bool, bool, str, Optional[bool], str]:
+    """
+    Fresh detection while MB2 is not yet known: (mb1, mb2, method, cache override, note).
+
+    cache override is False when the evidence says the flags must be cleared
+    (pre-fight HP in the MB room).
+    """
+    if x.in_mb_room and x.official_hp > 0 and previous_hp == 0 and x.official_hp in (PHASE_2_HP, PHASE_3_HP):
+        return True, x.official_hp == PHASE_3_HP, 'official_transitions', None, ''
+    if x.hyper_beam:
+        return True, True, 'hyper_beam', None, ''
+    if x.escape_timer:
+        return True, True, 'escape_timer', None, ''
+    if x.in_mb_room and 15000 <= x.boss_hp_3 <= 40000:
+        return True, True, 'emergency_mb2', None, ''
+    if x.in_mb_room and x.no_boss_hp:
+        return True, True, 'post_completion', None, ''
+
+    if x.in_mb_room:
+        # Live boss HP, checked against the memory signatures first
+        has_mb1_signature = x.boss_plus_1 in (0x0703, 0x0107) or x.boss_plus_2 >= 0x0100
+        has_mb2_signature = x.boss_plus_1 == 0x0003 and x.boss_plus_2 == 0x0000
+        current_hp = x.boss_hp_3 or max(x.boss_hp_1, x.boss_hp_2, x.boss_hp_3)
+        if 40000 <= current_hp <= 42000 and not has_mb1_signature:
+            return False, False, 'live_hp_analysis', False, 'pre-fight HP'
+        if has_mb2_signature:
+            return True, True, 'live_hp_analysis', None, ''
+        if has_mb1_signature:
+            # Still fighting MB2 while HP2/HP3 are up
+            return True, False, 'live_hp_analysis', None, ''
+        if current_hp <= 15000:
+            return True, current_hp < 5000, 'live_hp_analysis', None, ''
+        return False, False, 'live_hp_analysis', None, ''
+
+    # Outside the MB room: memory signatures, otherwise keep what we have
+    if x.boss_plus_1 == 0x0703:
+        # 0x0703 outside the MB room is Golden Torizo, not MB1: report no MB this poll
+        return mb1, False, 'smart_fallback', None, GOLDEN_TORIZO
+    if x.boss_plus_1 == 0x0003:
+        # 0x0003 means MB1 is done, but only trust it late game with no boss HP
+        strong_evidence = x.area_id in (2, 4, 5, 10) and x.no_boss_hp
+    else:
+        strong_evidence = x.boss_plus_1 >= 0x0704
+    if strong_evidence:
+        # MB2 only with no boss HP outside Tourian (the escape timer case is handled above)
+        return True, x.area_id not in (5, 10) and x.no_boss_hp, 'smart_fallback', None, ''
+    return mb1, False, 'smart_fallback', None, ''
+
+
+def transition(state: MBSnapshot, x: MBInputs) -> MBResult:
+    """One poll: next state and the MB1/MB2 flags to report"""
+    mb1, mb2 = PHASE_FLAGS[state.phase]
+    notes = []
+
+    # Back in the MB room with most missiles left: MB2 can't be done (and
+    # with near-full missiles and health it's a save state from before MB1)
+    if x.in_mb_room and x.max_missiles > 0 and x.missiles > x.max_missiles * 0.7:
+        if mb2:
+            notes.append('MB room with missiles')
+        mb2 = False
+        if x.missiles >= x.max_missiles * 0.9 and x.max_health > 0 and x.health >= x.max_health * 0.85:
+            if mb1:
+                notes.append('save state reload')
+            mb1 = False
+    prior_mb1, prior_mb2 = mb1, mb2
+
+    detected_mb1 = detected_mb2 = False
+    method = 'none'
+    golden_torizo = False
+    if not prior_mb2:
+        detected_mb1, detected_mb2, method, override, note = _detect(x, state.previous_hp, prior_mb1)
+        golden_torizo = note == GOLDEN_TORIZO
+        if override is False:
+            mb1 = mb2 = False
+            notes.append(note)
+        elif detected_mb1 or detected_mb2:
+            notes.append(method)
+    mb1 = mb1 or detected_mb1
+    mb2 = mb2 or detected_mb2
+
+    if mb2:
+        # A remembered MB2 needs some supporting evidence
+        if x.in_mb_room and not x.no_boss_hp:
+            still_valid = False
+        else:
+            in_post_mb_location = (x.area_id == 0 or
+                                   (x.area_id in (1, 2, 3, 4) and x.room_id != MB_ROOM_ID) or
+                                   (x.area_id == 5 and x.room_id != MB_ROOM_ID and x.room_id > 0))
+            still_valid = (x.hyper_beam_memory or x.escape_timer_primary or in_post_mb_location or
+                           not seems_like_new_game(x))
+        if still_valid:
+            report_mb1 = report_mb2 = True
+        else:
+            notes.append('stale MB2')
+            report_mb2 = detected_mb2
+            report_mb1 = detected_mb1 if seems_like_new_game(x) else detected_mb1 or mb1
+            mb1 = mb2 = False
+    else:
+        report_mb1, report_mb2 = mb1, False
+
+    if not x.in_mb_room and report_mb1 and not report_mb2 and not golden_torizo:
+        # Outside the MB room with MB1 done means the escape, unless 0x0003 says MB2 is being fought
+        active_fight = method in ('live_hp_analysis', 'smart_fallback') and x.boss_plus_1 == 0x0003
+        escape_indicators = x.area_id in (0, 5) or x.room_id != MB_ROOM_ID or x.no_boss_hp
+        if not active_fight and escape_indicators:
+            report_mb2 = mb2 = True
+            notes.append('escape inference')
+    elif golden_torizo:
+        report_mb1 = report_mb2 = False
+
+    phase = phase_for(mb1, mb2, x.in_mb_room, x.escape_timer)
+    return MBResult(MBSnapshot(phase, x.official_hp), report_mb1, report_mb2, prior_mb1, method,
+                    ', '.join(notes) or method)
+
+
+def seems_like_new_game(x: MBInputs) -> bool:
+    """Early game room with almost no missiles"""
+    return x.area_id in (0, 1) and x.room_id < 10000 and x.missiles <= 10
+
+
+def reset_reason(x: MBInputs, mb1: bool, mb2: bool) -> Optional[str]:
+    """Why the MB state should be reset on this poll (new game, save load...), or None"""
+    # Once MB2 is done, never reset while the game is likely being finished
+    if mb2 and x.area_id in (0, 1, 2, 3, 4, 5) and x.health > 50 and x.missiles >= 0:
+        return None
+    if x.area_id == 0 and x.room_id < 32000 and x.health <= 99:
+        return 'new game'
+    high_missiles = x.missiles > 0 and x.max_missiles > 0
+    if ((mb1 or mb2) and x.area_id == 0 and x.room_id < 35000 and high_missiles and
+            x.missiles >= x.max_missiles * 0.9 and x.health > 400):
+        return 'save state load (early Crateria)'
+    if (mb1 or mb2) and x.area_id in (0, 1) and x.room_id < 30000 and x.health > 400 and x.missiles > 150:
+        return 'game reset (early area)'
+    if (x.area_id == 5 and x.room_id == MB_ROOM_ID and high_missiles and
+            x.missiles >= x.max_missiles * 0.95 and x.health > 600):
+        return 'impossible MB room state'
+    return None
+
+
+class MotherBrainFSM:
+    """Current MB phase, the HP seen last poll, and the history of phase changes"""
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE):
+        self.state = MBSnapshot()
+        self.history: deque = deque(maxlen=history_size)
+        self.polls = 0
+
+    @property
+    def phase(self) -> str:
+        return self.state.phase
+
+    @property
+    def mb1_detected(self) -> bool:
+        return PHASE_FLAGS[self.state.phase][0]
+
+    @property
+    def mb2_detected(self) -> bool:
+        return PHASE_FLAGS[self.state.phase][1]
+
+    def evaluate(self, inputs: MBInputs) -> MBResult:
+        """transition() from the current state (no side effects)"""
+        return transition(self.state, inputs)
+
+    def apply(self, result: MBResult, ship: bool = False) -> MBResult:
+        """Move to result.state (ship once MB2 is done and the ship was reached)"""
+        self.polls += 1
+        state = result.state
+        if ship and PHASE_FLAGS[state.phase][1]:
+            state = state._replace(phase=SHIP)
+        self._move(state, result.reason if state.phase != SHIP else 'ship reached')
+        return result
+
+    def step(self, inputs: MBInputs, ship: bool = False) -> MBResult:
+        return self.apply(self.evaluate(inputs), ship)
+
+    def set_flags(self, mb1: bool, mb2: bool, reason: str):
+        """Jump to the phase for the given flags (manual override, bootstrap)"""
+        if PHASE_FLAGS[self.state.phase] != (mb1 or mb2, mb2):
+            self._move(self.state._replace(phase=phase_for(mb1 or mb2, mb2)), reason)
+
+    def reset(self, reason: str = 'reset'):
+        self.set_flags(False, False, reason)
+
+    def snapshot(self) -> MBSnapshot:
+        return self.state
+
+    def restore(self, snapshot: Union[MBSnapshot, Mapping[str, Any]]):
+        """Restore a snapshot() (or its _asdict() form); history is kept"""
+        if not isinstance(snapshot, MBSnapshot):
+            snapshot = MBSnapshot(**snapshot)
+        if snapshot.phase not in PHASE_FLAGS:
+            raise ValueError(f"unknown MB phase {snapshot.phase!r}")
+        self._move(snapshot, 'restore')
+
+    def _move(self, state: MBSnapshot, reason: str):
+        if state.phase != self.state.phase:
+            self.history.append(MBTransition(time.time(), self.polls, self.state.phase, state.phase, reason))
+            logger.info(f"🧠 Mother Brain: {self.state.phase} → {state.phase} ({reason})")
+        self.state = state
+
+    def to_dict(self, history: Optional[int] = None) -> Dict[str, Any]:
+        """JSON-friendly view of the state and the last `history` transitions (all by default)"""
+        transitions: List[MBTransition] = list(self.history)
+        if history is not None:
+            transitions = transitions[-history:] if history > 0 else []
+        return {
+            'phase': self.state.phase,
+            'mb1_detected': self.mb1_detected,
+            'mb2_detected': self.mb2_detected,
+            'previous_hp': self.state.previous_hp,
+            'polls': self.polls,
+            'history': [t._asdict() for t in transitions],
+        }
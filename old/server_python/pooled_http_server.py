@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP Server
+
+http.server.HTTPServer handles one connection at a time, so a single slow
+or stalled client (an OBS browser source on a bad connection) blocks every
+other overlay and dashboard. PooledHTTPServer serves requests on a bounded
+worker pool instead. With HTTP/1.1 handlers (protocol_version = 'HTTP/1.1')
+a connection stays open between an overlay's polls, so it pays for TCP
+setup once rather than every second.
+
+A worker is only held while a request is being read and answered. Between
+requests a keep-alive connection is parked on a selector thread, which
+hands it back to the pool when its next request arrives and closes it once
+it has been idle for the handler's `timeout`. So 16 workers serve any
+number of 1 Hz overlays. Handlers get this by subclassing
+PooledRequestHandler; any other handler keeps its worker for the whole
+connection, as under ThreadingHTTPServer.
+
+When every worker is busy and max_pending more requests are already
+queued (or max_connections are open), a new connection gets 503 right
+away instead of queueing without bound.
+"""
+
+import logging
+import queue
+import selectors
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 16
+DEFAULT_MAX_PENDING = 64
+DEFAULT_MAX_CONNECTIONS = 256
+# Idle seconds before a keep-alive connection is closed (handler `timeout`)
+KEEP_ALIVE_TIMEOUT = 15.0
+# How long a new connection may hold a worker before sending its request
+# (longer, e.g. a browser preconnect, and it is parked like an idle one)
+FIRST_REQUEST_WAIT = 0.25
+# Selector wake-up interval for closing idle connections
+IDLE_SWEEP_INTERVAL = 1.0
+
+_BUSY_RESPONSE = (b"HTTP/1.1 503 Service Unavailable\r\n"
+                  b"Content-Type: text/plain\r\nContent-Length: 12\r\nRetry-After: 1\r\n"
+                  b"Connection: close\r\n\r\nServer busy\n")
+
+
+class PooledRequestHandler(BaseHTTPRequestHandler):
+    """
+    BaseHTTPRequestHandler that gives its worker back between requests.
+
+    Under PooledHTTPServer, handle() answers the requests the connection has
+    waiting and returns with the connection still open; the server runs
+    handle() again when the next request arrives. Under any other server
+    it behaves like BaseHTTPRequestHandler.
+    """
+
+    def handle(self):
+        if not isinstance(self.server, PooledHTTPServer):
+            super().handle()
+            return
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and self.request_waiting():
+            self.handle_one_request()
+
+    def request_waiting(self) -> bool:
+        """True if the next request is already buffered or readable (never blocks)"""
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def finish(self):
+        # An open keep-alive connection keeps its files (and read buffer) while parked
+        if self.close_connection or not isinstance(self.server, PooledHTTPServer):
+            super().finish()
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that serves requests concurrently on a bounded thread pool"""
+
+    def __init__(self, server_address: Tuple[str, int], handler_class: Any,
+                 max_workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS, keep_alive_timeout: float = KEEP_ALIVE_TIMEOUT):
+        super().__init__(server_address, handler_class)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_connections = max_connections
+        self.keep_alive_timeout = keep_alive_timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='http-worker')
+        self._lock = threading.Lock()
+        self._connections = set()
+        self.connections_open = 0
+        self.connections_idle = 0
+        self.connections_served = 0
+        self.connections_rejected = 0
+        self.requests_active = 0  # connections being served by a worker or queued for one
+
+        # Idle connections are parked on the selector thread; other threads
+        # only queue them and wake it, so the selector has a single user
+        self._closing = False
+        self._parking: queue.SimpleQueue = queue.SimpleQueue()
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        self._selector_thread = threading.Thread(target=self._select_loop, name='http-selector', daemon=True)
+        self._selector_thread.start()
+
+    def process_request(self, request: Any, client_address: Any):
+        """Runs on the accept thread: hand the connection to a worker, or turn it away"""
+        with self._lock:
+            rejected = (self.requests_active >= self.max_workers + self.max_pending
+                        or self.connections_open >= self.max_connections)
+            if rejected:
+                self.connections_rejected += 1
+            else:
+                self.connections_open += 1
+                self._connections.add(request)
+        if rejected:
+            logger.warning(f"⚠️ HTTP pool full ({self.requests_active} active, {self.connections_open} open) "
+                           f"- rejecting {client_address[0]}")
+            try:
+                request.sendall(_BUSY_RESPONSE)
+                # Drain what the client already sent, so closing doesn't reset the connection
+                request.setblocking(False)
+                request.recv(65536)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._dispatch(request, client_address, None)
+
+    def finish_request(self, request: Any, client_address: Any) -> Any:
+        """Construct the handler (which serves the first requests) and return it"""
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def _dispatch(self, request: Any, client_address: Any, handler: Any):
+        with self._lock:
+            self.requests_active += 1
+        try:
+            self.pool.submit(self._serve, request, client_address, handler)
+        except RuntimeError:  # pool shut down by server_close
+            with self._lock:
+                self.requests_active -= 1
+            self._close(request, handler)
+
+    def _serve(self, request: Any, client_address: Any, handler: Any):
+        """Worker: serve what the connection has ready, then park it or close it"""
+        keep_open = False
+        try:
+            if handler is None:
+                request.settimeout(FIRST_REQUEST_WAIT)
+                try:
+                    ready = bool(request.recv(1, socket.MSG_PEEK))
+                except socket.timeout:
+                    # Connected but silent - wait on the selector, not on a worker
+                    keep_open = True
+                    return
+                if not ready:
+                    return  # closed without sending anything
+                request.settimeout(None)  # the handler's setup() applies its own timeout
+                handler = self.finish_request(request, client_address)
+            else:
+                handler.handle()
+            keep_open = not getattr(handler, 'close_connection', True)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._lock:
+                self.requests_active -= 1
+            if keep_open and not self._closing:
+                self._park(request, client_address, handler)
+            else:
+                self._close(request, handler)
+
+    def _park(self, request: Any, client_address: Any, handler: Any):
+        timeout = getattr(handler, 'timeout', None) or self.keep_alive_timeout
+        self._parking.put((request, client_address, handler, time.monotonic() + timeout))
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wakeup_send.send(b'\0')
+        except OSError:
+            pass  # already has a pending wake-up (or is closed)
+
+    def _close(self, request: Any, handler: Any):
+        if handler is not None:
+            handler.close_connection = True
+            try:
+                handler.finish()
+            except Exception:
+                pass
+        self.shutdown_request(request)
+        with self._lock:
+            if request in self._connections:
+                self._connections.discard(request)
+                self.connections_open -= 1
+                self.connections_served += 1
+
+    def _select_loop(self):
+        """Selector thread: wait on idle connections, dispatch readable ones, expire idle ones"""
+        parked: Dict[Any, Tuple[Any, Any, float]] = {}
+        while True:
+            while True:
+                try:
+                    request, client_address, handler, deadline = self._parking.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self._selector.register(request, selectors.EVENT_READ)
+                    parked[request] = (client_address, handler, deadline)
+                except (ValueError, OSError):  # closed meanwhile
+                    self._close(request, handler)
+            if self._closing:
+                break
+            self.connections_idle = len(parked)
+
+            for key, _ in self._selector.select(IDLE_SWEEP_INTERVAL):
+                if key.fileobj is self._wakeup_recv:
+                    try:
+                        self._wakeup_recv.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                self._selector.unregister(key.fileobj)
+                client_address, handler, _ = parked.pop(key.fileobj)
+                self._dispatch(key.fileobj, client_address, handler)
+
+            now = time.monotonic()
+            for request, (client_address, handler, deadline) in list(parked.items()):
+                if deadline <= now:
+                    self._selector.unregister(request)
+                    del parked[request]
+                    self._close(request, handler)
+
+        for request, (client_address, handler, deadline) in parked.items():
+            self._close(request, handler)
+        self.connections_idle = 0
+        self._selector.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+
+    def server_close(self):
+        super().server_close()
+        self._closing = True
+        self._wake()
+        self._selector_thread.join(timeout=5)
+        while True:
+            try:
+                request, client_address, handler, deadline = self._parking.get_nowait()
+            except queue.Empty:
+                break
+            self._close(request, handler)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        # Wake workers blocked reading from a client so they exit now,
+        # not at their handler timeout
+        with self._lock:
+            connections = list(self._connections)
+        for request in connections:
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'max_connections': self.max_connections,
+                'requests_active': self.requests_active,
+                'connections_open': self.connections_open,
+                'connections_idle': self.connections_idle,
+                'connections_served': self.connections_served,
+                'connections_rejected': self.connections_rejected,
+            }
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Progress Tracker
+
+The stateful half of SuperMetroidGameStateParser: everything that carries
+over between polls. That is the Mother Brain phase machine (which also
+drives Samus's ship and Hyper Beam) and the last reported beam/boss flags
+used to log transitions. Decoding itself lives in GameStateDecoder
+(game_state_decoder.py).
+
+A tracker belongs to one thread, the poll thread. Other threads (HTTP
+handlers) never change it directly; they submit() commands that the owner
+runs at its next apply_pending(). The whole state is one TrackerState
+value, so state() / restore() need no locks.
+"""
+
+import logging
+import queue
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from memory_layout import WORD
+from game_state_decoder import GameStateDecoder
+from mother_brain_fsm import MBInputs, MBSnapshot, MotherBrainFSM, mb_inputs, reset_reason
+
+logger = logging.getLogger(__name__)
+
+TrackerCommand = Callable[['ProgressTracker'], Any]
+
+
+class TrackerState(NamedTuple):
+    """Everything a tracker carries between polls"""
+    mb: MBSnapshot
+    reported_flags: Dict[str, Dict[str, bool]]
+
+
+class ProgressTracker:
+    """Cross-poll progress state, changed only by its owning thread"""
+
+    def __init__(self, decoder: Optional[GameStateDecoder] = None, log: Optional[logging.Logger] = None):
+        self.decoder = decoder or GameStateDecoder()
+        self.trace = self.decoder.trace
+        # Transition log lines go to the owner's logger if given
+        self.log = log or logger
+        # Mother Brain phase state machine (see mother_brain_fsm.py)
+        self.mb_fsm = MotherBrainFSM()
+        self.reported_flags: Dict[str, Dict[str, bool]] = {}
+        self.commands: queue.SimpleQueue = queue.SimpleQueue()
+
+    def submit(self, description: str, command: TrackerCommand):
+        """Queue command(tracker) to run on the owning thread (safe from any thread)"""
+        self.commands.put((description, command))
+
+    def apply_pending(self) -> int:
+        """Run queued commands in submission order; call from the owning thread"""
+        applied = 0
+        while True:
+            try:
+                description, command = self.commands.get_nowait()
+            except queue.Empty:
+                return applied
+            try:
+                command(self)
+                self.log.info(f"🔧 Applied tracker command: {description}")
+            except Exception as e:
+                self.log.error(f"Tracker command '{description}' failed: {e}")
+            applied += 1
+
+    def state(self) -> TrackerState:
+        return TrackerState(self.mb_fsm.snapshot(), {kind: dict(flags) for kind, flags in self.reported_flags.items()})
+
+    def restore(self, state: TrackerState):
+        """Restore a state(); MB phase history is kept"""
+        self.mb_fsm.restore(state.mb)
+        self.reported_flags = {kind: dict(flags) for kind, flags in state.reported_flags.items()}
+
+    def log_transitions(self, kind: str, flags: Dict[str, bool]):
+        """Log flags (beams, bosses) that changed since the last poll"""
+        previous = self.reported_flags.get(kind)
+        if previous == flags:
+            return
+        for name, value in flags.items():
+            if previous is None:
+                if value:
+                    self.log.info(f"📋 {kind}: {name} already set")
+            elif previous.get(name) != value:
+                self.log.info(f"{'✅' if value else '↩️'} {kind}: {name} {'set' if value else 'cleared'}")
+        self.reported_flags[kind] = dict(flags)
+
+    def maybe_reset(self, location_data: Dict[str, Any], stats_data: Optional[bytes]):
+        """Reset MB phase tracking on game start, save load, or contradiction detection"""
+        if not location_data:
+            return
+
+        # Get health to detect new games (low health = likely new save)
+        health = 0
+        if stats_data and len(stats_data) >= 2:
+            health = WORD.unpack_from(stats_data[0:2])[0]
+
+        reset_input = MBInputs(area_id=location_data.get('area_id', -1), room_id=location_data.get('room_id', -1),
+                               missiles=location_data.get('missiles', 0),
+                               max_missiles=location_data.get('max_missiles', 0), health=health)
+        reason = reset_reason(reset_input, self.mb_fsm.mb1_detected, self.mb_fsm.mb2_detected)
+        if reason:
+            self.mb_fsm.reset(reason)
+        elif self.mb_fsm.mb1_detected:
+            self.trace.record('mb', "🔒 Preserving MB phase %s: %s", self.mb_fsm.phase, reset_input)
+
+    def track_bosses(self, boss_memory_data: Dict[str, bytes], location_data: Optional[Dict[str, Any]],
+                     bosses: Dict[str, bool]) -> Dict[str, bool]:
+        """Add the Mother Brain phases and Samus's ship to decoded boss flags, advancing the MB state"""
+        mb_input = mb_inputs(boss_memory_data, location_data)
+        mb_result = self.mb_fsm.evaluate(mb_input)
+        self.trace.record('bosses', "🧠 MB inputs: %s", mb_input)
+        self.trace.record('bosses', "🎯 MB %s → %s: MB1=%s, MB2=%s (method: %s, %s)", self.mb_fsm.phase,
+                          mb_result.state.phase, mb_result.mb1, mb_result.mb2, mb_result.method, mb_result.reason)
+        bosses['mother_brain_1'] = mb_result.mb1
+        bosses['mother_brain_2'] = mb_result.mb2
+
+        # End-game detection (Samus reaching her ship)
+        samus_ship_detected = self.decoder.detect_samus_ship(boss_memory_data, location_data, mb_result.prior_mb1,
+                                                             mb_result.mb1, mb_result.mb2)
+        bosses['samus_ship'] = samus_ship_detected
+        self.mb_fsm.apply(mb_result, samus_ship_detected)
+        self.log_transitions('bosses', bosses)
+        return bosses
+
+    def set_mb_flags(self, mb1: bool, mb2: bool, reason: str):
+        self.mb_fsm.set_flags(mb1, mb2, reason)
+
+    def reset_mb(self, reason: str = 'manual reset'):
+        self.mb_fsm.reset(reason)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+QUsb2Snes WebSocket Backend
+
+EmulatorBackend over the usb2snes protocol spoken by QUsb2Snes / SNI
+(ws://localhost:23074), building on the old/test_client.py prototype.
+Requests are JSON text frames; GetAddress replies arrive as binary frames.
+
+usb2snes addresses its own memory map: WRAM 0x7E0000-0x7FFFFF lives at
+0xF50000-0xF6FFFF, so SNES addresses are translated before every request.
+
+A whole poll is one round trip: every range is packed into multi-operand
+GetAddress requests (at most 8 address/size pairs of up to 255 bytes each -
+the SD2SNES VGET limits, which emulator bridges accept too), all requests
+are sent before any reply is read, and the binary reply frames are copied
+into one preallocated buffer in request order.
+
+Requires: pip install websocket-client
+"""
+
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import websocket
+except ImportError:  # optional - only needed when this backend is selected
+    websocket = None
+
+from emulator_backend import EmulatorBackend
+from wram_mirror import WRAM_BASE, WRAM_SIZE
+
+logger = logging.getLogger(__name__)
+
+USB2SNES_WRAM_BASE = 0xF50000
+
+MAX_OPERAND_PAIRS = 8
+MAX_OPERAND_SIZE = 255
+
+
+def snes_to_usb2snes(address: int) -> int:
+    """Translate a SNES WRAM address (0x7E0000-0x7FFFFF) to the usb2snes address space"""
+    if not WRAM_BASE <= address < WRAM_BASE + WRAM_SIZE:
+        raise ValueError(f"0x{address:06X} is not a WRAM address")
+    return USB2SNES_WRAM_BASE + (address - WRAM_BASE)
+
+
+def pack_get_address(ranges: Sequence[Tuple[int, int]],
+                     max_pairs: int = MAX_OPERAND_PAIRS,
+                     max_size: int = MAX_OPERAND_SIZE) -> List[List[str]]:
+    """
+    Split (SNES address, size) ranges into GetAddress operand lists.
+
+    Ranges larger than max_size become several pairs; pairs are grouped
+    max_pairs per request. Reply bytes arrive in exactly this order.
+    """
+    pairs: List[Tuple[int, int]] = []
+    for address, size in ranges:
+        for offset in range(0, size, max_size):
+            pairs.append((snes_to_usb2snes(address + offset), min(max_size, size - offset)))
+    return [[operand for address, size in pairs[i:i + max_pairs] for operand in (f"{address:X}", f"{size:X}")]
+            for i in range(0, len(pairs), max_pairs)]
+
+
+class QUsb2SnesBackend(EmulatorBackend):
+    """usb2snes WebSocket backend (QUsb2Snes, SNI)"""
+
+    backend_type = 'qusb2snes'
+
+    def __init__(self, url: str = "ws://localhost:23074", device: Optional[str] = None,
+                 timeout: float = 2.0, connection_factory: Optional[Callable[..., Any]] = None,
+                 reconnect_delay: float = 2.0, info_ttl: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.url = url
+        self.device = device            # None = first device QUsb2Snes lists
+        self.timeout = timeout
+        self.connection_factory = connection_factory
+        self.reconnect_delay = reconnect_delay
+        self.info_ttl = info_ttl        # seconds the device Info reply stays valid
+        self.clock = clock
+        self.ws = None
+        self.attached_device: Optional[str] = None
+        self.last_device: Optional[str] = None
+        self.device_info: List[str] = []
+        self._info_at: Optional[float] = None
+        self.last_connect_attempt = 0.0
+        self.reconnects = 0
+        self.rom_changes = 0
+        # Reply buffer reused across polls; grows to the largest batch seen
+        self.buffer = bytearray(4096)
+        self.view = memoryview(self.buffer)
+
+    def connect(self) -> bool:
+        """Open the WebSocket, name the client and attach to a device"""
+        factory = self.connection_factory
+        if factory is None:
+            if websocket is None:
+                logger.error("❌ QUsb2Snes backend needs websocket-client (pip install websocket-client)")
+                return False
+            factory = websocket.create_connection
+
+        self.close()
+        self.last_connect_attempt = self.clock()
+        try:
+            self.ws = factory(self.url, timeout=self.timeout)
+            self._send("Name", ["SuperMetroidTracker"])
+            devices = self._request("DeviceList")
+            if not devices:
+                logger.warning("⚠️ QUsb2Snes: no devices")
+                self.close()
+                return False
+            # Re-attach to the configured (or previously used) device if it is still listed
+            preferred = self.device or self.last_device
+            device = preferred if preferred in devices else devices[0]
+            self._send("Attach", [device])
+            self.attached_device = self.last_device = device
+            self._query_info()
+            logger.info(f"🔗 QUsb2Snes attached to {device}")
+            return True
+        except Exception as e:
+            logger.error(f"QUsb2Snes connection failed: {e}")
+            self.close()
+            return False
+
+    def close(self):
+        """Close the WebSocket"""
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+        self.ws = None
+        self.attached_device = None
+
+    def _send(self, opcode: str, operands: Optional[List[str]] = None, space: str = "SNES"):
+        command: Dict[str, Any] = {"Opcode": opcode, "Space": space}
+        if operands:
+            command["Operands"] = operands
+        self.ws.send(json.dumps(command))
+
+    def _request(self, opcode: str, operands: Optional[List[str]] = None) -> Optional[List[str]]:
+        """Send a command that answers with a JSON {"Results": [...]} text frame"""
+        self._send(opcode, operands)
+        reply = json.loads(self.ws.recv())
+        return reply.get("Results")
+
+    def _ensure_connected(self) -> bool:
+        """Reconnect and re-attach after a failure, at most once per reconnect_delay"""
+        if self.ws is not None:
+            return True
+        if self.clock() - self.last_connect_attempt < self.reconnect_delay:
+            return False
+        if self.last_connect_attempt:
+            self.reconnects += 1
+            logger.info(f"🔄 QUsb2Snes reconnecting (attempt {self.reconnects})")
+        return self.connect()
+
+    def _query_info(self):
+        """Ask the attached device for its Info (firmware, version, ROM) and note ROM changes"""
+        info = self._request("Info") or []
+        rom = info[2] if len(info) > 2 else None
+        previous = self.device_info[2] if len(self.device_info) > 2 else None
+        if rom and previous and rom != previous:
+            logger.info(f"🔄 ROM change detected: {previous} -> {rom}")
+            self.rom_changes += 1
+        self.device_info = info
+        self._info_at = self.clock()
+
+    def _refresh_info(self):
+        """
+        Re-query Info once it is info_ttl seconds old (or invalidated), like
+        the RetroArch backend's GET_STATUS probe, so a ROM or device change
+        while connected is picked up.
+        """
+        if self.ws is None:
+            return
+        if self._info_at is not None and self.clock() - self._info_at < self.info_ttl:
+            return
+        try:
+            self._query_info()
+        except Exception as e:
+            logger.debug(f"QUsb2Snes Info failed: {e}")
+            self.close()
+
+    def invalidate_info(self, reason: str = ""):
+        """Re-query device Info on the next health check"""
+        if self._info_at is not None:
+            logger.debug(f"QUsb2Snes device info invalidated{': ' + reason if reason else ''}")
+        self._info_at = None
+
+    def _receive_into(self, total: int) -> memoryview:
+        """Copy binary reply frames into the preallocated buffer until total bytes arrived"""
+        if total > len(self.buffer):
+            self.buffer = bytearray(total)
+            self.view = memoryview(self.buffer)
+        received = 0
+        while received < total:
+            frame = self.ws.recv()
+            if isinstance(frame, str):
+                raise ConnectionError(f"unexpected text frame during GetAddress: {frame[:40]}")
+            end = min(total, received + len(frame))
+            self.view[received:end] = frame[:end - received]
+            received = end
+        return self.view[:total]
+
+    def read_ranges(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """All ranges in one pipelined burst of multi-operand GetAddress requests"""
+        if not ranges:
+            return []
+        valid = [WRAM_BASE <= address and address + size <= WRAM_BASE + WRAM_SIZE and size > 0
+                 for address, size in ranges]
+        wanted = [r for r, ok in zip(ranges, valid) if ok]
+        if not wanted or not self._ensure_connected():
+            return [None] * len(ranges)
+
+        try:
+            for operands in pack_get_address(wanted):
+                self._send("GetAddress", operands)
+            data = self._receive_into(sum(size for _, size in wanted))
+        except Exception as e:
+            # The stream position is lost - drop the socket and reconnect next poll
+            logger.debug(f"QUsb2Snes connection error: {e}")
+            self.close()
+            return [None] * len(ranges)
+
+        results: List[Optional[bytes]] = []
+        offset = 0
+        for (address, size), ok in zip(ranges, valid):
+            if not ok:
+                results.append(None)
+                continue
+            results.append(bytes(data[offset:offset + size]))
+            offset += size
+        return results
+
+    def health(self) -> Dict[str, Any]:
+        """Connected when attached; game loaded when the device reports a ROM"""
+        self._ensure_connected()
+        self._refresh_info()
+        rom = self.device_info[2] if len(self.device_info) > 2 else None
+        return {
+            'backend': self.backend_type,
+            'connected': self.ws is not None,
+            'game_loaded': bool(self.ws is not None and rom and rom != "No Info"),
+            'device': self.attached_device,
+        }
+
+    def identity(self) -> Dict[str, Any]:
+        """Device firmware/version and ROM name from the Info command"""
+        info = self.device_info
+        return {
+            'backend': self.backend_type,
+            'emulator': f"{info[1]} {info[0]} via QUsb2Snes" if len(info) > 1 else None,
+            'game': info[2] if len(info) > 2 else None,
+        }
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Super Metroid Memory Read Plan
+
+Declarative description of every (address, size) field the parser needs.
+Fields are merged into the fewest contiguous block reads (within a gap
+tolerance) and the block results are sliced back into the memory_data dict
+that SuperMetroidGameStateParser.parse_complete_game_state expects.
+"""
+
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from memory_layout import STATS_BLOCK
+
+logger = logging.getLogger(__name__)
+
+# Readers split anything larger than one reply into pipelined chunks (see
+# udp_command_engine.MAX_READ_CHUNK), so the block cap only bounds how much
+# unused memory a merged block may carry - one chunk's worth is plenty.
+DEFAULT_MAX_BLOCK_SIZE = 512
+DEFAULT_GAP_TOLERANCE = 64
+
+
+class ReadField(NamedTuple):
+    """A single named memory field: memory_data[name] = read(address, size)"""
+    name: str
+    address: int
+    size: int
+
+    @property
+    def end(self) -> int:
+        return self.address + self.size
+
+
+class ReadBlock(NamedTuple):
+    """One contiguous read covering one or more fields"""
+    address: int
+    size: int
+    fields: Tuple[ReadField, ...]
+
+
+# Every field read by BackgroundGamePoller each poll (memory_data key -> address/size)
+GAME_STATE_FIELDS: Tuple[ReadField, ...] = (
+    # Basic stats: health, missiles, supers, power bombs, reserves (22-byte block)
+    ReadField('basic_stats', STATS_BLOCK.address, STATS_BLOCK.size),
+
+    # Location and position
+    ReadField('room_id', 0x7E079B, 2),
+    ReadField('area_id', 0x7E079F, 1),  # FIXED: Use standard area address (0x7E079F)
+    ReadField('game_state', 0x7E0998, 2),
+    ReadField('player_x', 0x7E0AF6, 2),
+    ReadField('player_y', 0x7E0AFA, 2),
+
+    # Equipment
+    ReadField('items', 0x7E09A4, 2),
+    ReadField('beams', 0x7E09A8, 2),
+
+    # Boss memory (multiple addresses for advanced detection)
+    ReadField('main_bosses', 0x7ED828, 2),
+    ReadField('crocomire', 0x7ED829, 2),
+    ReadField('boss_plus_1', 0x7ED829, 2),  # Fixed: was 0x7ED82A
+    ReadField('boss_plus_2', 0x7ED82A, 2),  # Fixed: was 0x7ED82B
+    ReadField('boss_plus_3', 0x7ED82B, 2),  # Fixed: was 0x7ED82C
+    ReadField('boss_plus_4', 0x7ED82C, 2),  # Added
+    ReadField('boss_plus_5', 0x7ED82D, 2),
+
+    # Escape timer for MB2 detection (multiple addresses to try)
+    ReadField('escape_timer_1', 0x7E0943, 2),   # Common escape timer location
+    ReadField('escape_timer_2', 0x7E0945, 2),   # Alternative location
+    ReadField('escape_timer_3', 0x7E09E2, 2),   # Another possible location
+    ReadField('escape_timer_4', 0x7E09E0, 2),   # Another possible location
+    ReadField('escape_timer_5', 0x7E0947, 2),   # Sequential check
+    ReadField('escape_timer_6', 0x7E0949, 2),   # Sequential check
+    ReadField('escape_timer_7', 0x7E0911, 2),   # Known timer location
+    ReadField('escape_timer_8', 0x7E0913, 2),   # Alternative timer
+    ReadField('escape_timer_9', 0x7E0915, 2),   # Sequential
+    ReadField('escape_timer_10', 0x7E0917, 2),  # Sequential
+    ReadField('escape_timer_11', 0x7E0919, 2),  # Sequential
+    ReadField('escape_timer_12', 0x7E0921, 2),  # Different block
+
+    # Memory scan - look for any non-zero timers in common areas
+    ReadField('scan_090x', 0x7E0900, 32),  # Scan 0x900-0x91F
+    ReadField('scan_094x', 0x7E0940, 32),  # Scan 0x940-0x95F
+    ReadField('scan_09Ex', 0x7E09E0, 32),  # Scan 0x9E0-0x9FF
+
+    # Boss HP for direct detection (MB room boss HP)
+    ReadField('boss_hp_1', 0x7E0F8C, 2),  # Common boss HP location
+    ReadField('boss_hp_2', 0x7E0F8E, 2),  # Alternative boss HP
+    ReadField('boss_hp_3', 0x7E1000, 2),  # Another potential location
+
+    # OFFICIAL AUTOSPLITTER ADDRESS: Mother Brain HP for phase detection
+    ReadField('mother_brain_official_hp', 0x7E0FCC, 2),
+
+    # OFFICIAL AUTOSPLITTER ADDRESSES: Ship detection
+    ReadField('ship_ai', 0x7E0FB2, 2),      # Ship AI state
+    ReadField('event_flags', 0x7ED821, 1),  # Event flags (zebesAblaze)
+
+    # Game state (escape sequence often changes game state)
+    ReadField('game_state_extended', 0x7E0998, 2),
+)
+
+# Boss fields re-read when bootstrapping the Mother Brain cache
+BOSS_FIELD_NAMES = (
+    'main_bosses', 'crocomire', 'boss_plus_1', 'boss_plus_2',
+    'boss_plus_3', 'boss_plus_4', 'boss_plus_5',
+)
+
+
+def coalesce_fields(fields: Iterable[ReadField], gap_tolerance: int = DEFAULT_GAP_TOLERANCE,
+                    max_block_size: int = DEFAULT_MAX_BLOCK_SIZE) -> List[ReadBlock]:
+    """
+    Merge fields into contiguous blocks.
+
+    Fields that overlap, touch, or sit within gap_tolerance bytes of the
+    current block are folded into it, as long as the block stays within
+    max_block_size. A single field larger than max_block_size gets its own block.
+    """
+    blocks: List[ReadBlock] = []
+    current: List[ReadField] = []
+    block_start = block_end = 0
+
+    for field in sorted(fields, key=lambda f: (f.address, -f.size)):
+        if current:
+            new_end = max(block_end, field.end)
+            if field.address <= block_end + gap_tolerance and new_end - block_start <= max_block_size:
+                current.append(field)
+                block_end = new_end
+                continue
+            blocks.append(ReadBlock(block_start, block_end - block_start, tuple(current)))
+
+        current = [field]
+        block_start, block_end = field.address, field.end
+
+    if current:
+        blocks.append(ReadBlock(block_start, block_end - block_start, tuple(current)))
+
+    return blocks
+
+
+class ReadPlan:
+    """Coalesced set of block reads that produces a memory_data dict"""
+
+    def __init__(self, fields: Iterable[ReadField] = GAME_STATE_FIELDS,
+                 gap_tolerance: int = DEFAULT_GAP_TOLERANCE,
+                 max_block_size: int = DEFAULT_MAX_BLOCK_SIZE):
+        self.fields = tuple(fields)
+        self.gap_tolerance = gap_tolerance
+        self.max_block_size = max_block_size
+        self.blocks = coalesce_fields(self.fields, gap_tolerance, max_block_size)
+
+        logger.debug(f"📦 Read plan: {len(self.fields)} fields → {len(self.blocks)} block reads")
+
+    def subset(self, names: Iterable[str]) -> 'ReadPlan':
+        """Build a plan for a subset of this plan's fields (same tolerances)"""
+        wanted = set(names)
+        return ReadPlan([f for f in self.fields if f.name in wanted],
+                        self.gap_tolerance, self.max_block_size)
+
+    def slice_blocks(self, block_data: List[Optional[bytes]]) -> Dict[str, Optional[bytes]]:
+        """Slice raw block reads (same order as self.blocks) back into named fields"""
+        memory_data: Dict[str, Optional[bytes]] = {}
+
+        for block, data in zip(self.blocks, block_data):
+            for field in block.fields:
+                offset = field.address - block.address
+                if data is None or len(data) < offset + field.size:
+                    memory_data[field.name] = None
+                else:
+                    memory_data[field.name] = data[offset:offset + field.size]
+
+        return memory_data
+
+    def execute(self, reader) -> Dict[str, Optional[bytes]]:
+        """
+        Run every block read through the reader and slice the results.
+
+        Readers with a batched read_many (pipelined UDP) get all blocks in one
+        call; otherwise blocks are read one at a time via read_memory_range.
+        """
+        ranges = [(block.address, block.size) for block in self.blocks]
+        if hasattr(reader, 'read_many'):
+            block_data = reader.read_many(ranges)
+        else:
+            block_data = [reader.read_memory_range(address, size) for address, size in ranges]
+        return self.slice_blocks(block_data)
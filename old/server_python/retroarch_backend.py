@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+RetroArch UDP Backend
+
+EmulatorBackend over RetroArch's network command interface (UDP 55355):
+pipelined, address-matched READ_CORE_MEMORY batches with adaptive RTT
+timeouts, replies decoded straight from a preallocated receive buffer, and a
+TTL-cached VERSION / GET_STATUS connection probe.
+"""
+
+import logging
+import socket
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from emulator_backend import EmulatorBackend
+from udp_command_engine import PipelinedUDPEngine, MAX_READ_CHUNK, drain_socket, reply_buffer_size, reply_matches_command
+from response_decoder import ReadReplyDecoder
+from rtt_estimator import RTTEstimator, command_type
+
+logger = logging.getLogger(__name__)
+
+
+class RetroArchUDPBackend(EmulatorBackend):
+    """Handles UDP communication with RetroArch - separated from parsing logic"""
+    
+    backend_type = 'retroarch'
+    
+    def __init__(self, host="localhost", port=55355, info_ttl=5.0):
+        self.host = host
+        self.port = port
+        self.sock = None
+        self.info_ttl = info_ttl  # seconds a positive connection/game-loaded probe stays valid
+        self._info_cache = None
+        self._info_cached_at = 0.0
+        self._last_content = None
+        self.info_cache_hits = 0
+        self.info_cache_misses = 0
+        self.rom_changes = 0
+        self.last_connection_attempt = 0
+        self.connection_retry_delay = 5  # seconds
+        self.max_retries = 2
+        self.rtt = RTTEstimator()
+        self.engine = PipelinedUDPEngine(host, port, rtt=self.rtt)
+        self.decoder = ReadReplyDecoder(reply_buffer_size(MAX_READ_CHUNK))
+        
+    def connect(self) -> bool:
+        """Connect to RetroArch UDP interface"""
+        try:
+            if self.sock:
+                self.sock.close()
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.settimeout(1.0)  # Fast timeout for background polling
+            return True
+        except Exception as e:
+            logger.error(f"UDP connection failed: {e}")
+            return False
+    
+    def _exchange(self, command: str, accept: Callable[[int], Tuple[bool, Any]]) -> Any:
+        """
+        Send command and return the value accept() produces for its reply.
+        
+        accept(nbytes) inspects the reply sitting in the decoder buffer and
+        returns (matched, value); unmatched (stale) replies are skipped. Each
+        attempt waits for the adaptive RTO of the command type, so a lost
+        datagram costs a few RTTs rather than a fixed second.
+        """
+        if not self.sock:
+            if not self.connect():
+                return None
+                
+        kind = command_type(command)
+        try:
+            # Clear any pending data - zero-timeout drain, never blocks
+            drain_socket(self.sock)
+            
+            for attempt in range(self.max_retries + 1):
+                self.sock.sendto(command.encode(), (self.host, self.port))
+                sent_at = time.monotonic()
+                deadline = sent_at + self.rtt.timeout(kind)
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.sock.settimeout(remaining)
+                    try:
+                        nbytes = self.decoder.recv_into(self.sock)
+                    except socket.timeout:
+                        break
+                    matched, value = accept(nbytes)
+                    if matched:
+                        # Karn's algorithm - only unambiguous first attempts are sampled
+                        if attempt == 0:
+                            self.rtt.observe(kind, time.monotonic() - sent_at)
+                        return value
+                    logger.debug(f"Discarding stale UDP reply for {command}")
+                    
+                self.rtt.backoff(kind)
+                logger.debug(f"UDP timeout for command: {command} (attempt {attempt + 1})")
+            return None
+            
+        except Exception as e:
+            logger.debug(f"UDP error for command {command}: {e}")
+            return None
+    
+    def send_command(self, command: str) -> Optional[str]:
+        """Send single command to RetroArch"""
+        def accept(nbytes):
+            response = bytes(self.decoder.view[:nbytes]).decode().strip()
+            return reply_matches_command(command, response), response
+        return self._exchange(command, accept)
+    
+    def read_memory_range(self, start_address: int, size: int) -> Optional[bytes]:
+        """Read memory range from RetroArch"""
+        if size > MAX_READ_CHUNK:
+            # Too big for one reply - pipelined chunks, reassembled in order
+            return self.read_many([(start_address, size)])[0]
+            
+        # Decode the hex payload straight from the receive buffer; replies
+        # echoing another address are stale and skipped
+        def accept(nbytes):
+            if self.decoder.address(nbytes) != start_address:
+                return False, None
+            return True, self.decoder.decode(nbytes, start_address)
+        return self._exchange(f"READ_CORE_MEMORY 0x{start_address:X} {size}", accept)
+    
+    def read_many(self, ranges: List[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """Read several memory ranges with pipelined commands (results in request order)"""
+        if not self.sock:
+            if not self.connect():
+                return [None] * len(ranges)
+                
+        try:
+            results = self.engine.read_many(self.sock, ranges)
+        except Exception as e:
+            logger.debug(f"UDP error for pipelined read: {e}")
+            results = [None] * len(ranges)
+        # Only a read where nothing came back means the connection is gone; a
+        # single failing range (say bank 0x7F on some cores) leaves the probe cached
+        if results and all(data is None for data in results):
+            self.invalidate_info("memory read failed")
+        return results
+    
+    @staticmethod
+    def status_has_super_metroid(response: Optional[str]) -> bool:
+        """Check a GET_STATUS reply for Super Metroid (or a ROM hack) being played"""
+        if response and "PLAYING" in response:
+            response_lower = response.lower()
+            if "super metroid" in response_lower:
+                return True
+            # Check for ROM hacks and randomizers
+            rom_hack_keywords = [
+                "metroid", "samus", "zebes", "crateria", "norfair", "maridia",
+                "map rando", "rando", "randomizer", "random", "sm ", "super_metroid"
+            ]
+            return any(keyword in response_lower for keyword in rom_hack_keywords)
+        return False
+    
+    def is_game_loaded(self) -> bool:
+        """Check if Super Metroid is loaded"""
+        return self.status_has_super_metroid(self.send_command("GET_STATUS"))
+    
+    def invalidate_info(self, reason: str = ""):
+        """Drop the cached connection probe so the next get_retroarch_info() asks RetroArch again"""
+        if self._info_cache is not None:
+            logger.debug(f"Connection info cache invalidated{': ' + reason if reason else ''}")
+        self._info_cache = None
+    
+    def get_retroarch_info(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Get RetroArch connection info.
+        
+        A positive probe (connected, game loaded) is cached for info_ttl
+        seconds, so steady-state polls spend no round trips on VERSION /
+        GET_STATUS; negative results are never cached. A batch read where
+        every range fails invalidates it at once, and so does the poller
+        when a read parses as an invalid game state (what a reset or ROM
+        swap usually looks like). Any other ROM change shows up in the
+        next probe, within info_ttl, where it is logged and counted in
+        rom_changes.
+        """
+        now = time.monotonic()
+        if not force and self._info_cache is not None and now - self._info_cached_at < self.info_ttl:
+            self.info_cache_hits += 1
+            return dict(self._info_cache)
+        
+        self.info_cache_misses += 1
+        version = self.send_command("VERSION")
+        status = self.send_command("GET_STATUS")
+        
+        info = {
+            'connected': version is not None,
+            'retroarch_version': version,
+            'game_info': status,
+            'game_loaded': self.status_has_super_metroid(status)
+        }
+        
+        # "GET_STATUS PLAYING super_nes,<title>,crc32=<crc>" - the content part identifies the ROM
+        content = status.split(' ', 2)[2] if status and status.count(' ') >= 2 else None
+        if content and self._last_content and content != self._last_content:
+            logger.info(f"🔄 ROM change detected: {self._last_content} -> {content}")
+            self.rom_changes += 1
+        if content:
+            self._last_content = content
+        
+        if info['connected'] and info['game_loaded']:
+            self._info_cache = info
+            self._info_cached_at = now
+        else:
+            self._info_cache = None
+        return dict(info)
+    
+    def connection_info(self) -> Dict[str, Any]:
+        """Connection info in the poller's cache shape (TTL-cached probe)"""
+        return self.get_retroarch_info()
+    
+    def read_ranges(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """Batched reads - pipelined READ_CORE_MEMORY commands"""
+        return self.read_many(ranges)
+    
+    def health(self) -> Dict[str, Any]:
+        """Liveness from the (cached) connection probe plus UDP timing"""
+        info = self.get_retroarch_info()
+        return {
+            'backend': self.backend_type,
+            'connected': info['connected'],
+            'game_loaded': info['game_loaded'],
+            'udp_timing': self.rtt.stats(),
+        }
+    
+    def identity(self) -> Dict[str, Any]:
+        """RetroArch version and the GET_STATUS content line"""
+        info = self.get_retroarch_info()
+        return {
+            'backend': self.backend_type,
+            'emulator': f"RetroArch {info['retroarch_version']}" if info['retroarch_version'] else None,
+            'game': info['game_info'],
+        }
+    
+    def close(self):
+        """Close the UDP socket"""
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+
+
+# Historical name - background_poller_server and older scripts import this
+RetroArchUDPReader = RetroArchUDPBackend
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Adaptive RetroArch Command Timeouts
+
+TCP-style retransmission timeout (RFC 6298) estimation per command type.
+Each reply updates a smoothed round-trip time (SRTT) and its mean deviation
+(RTTVAR); the timeout is SRTT + 4 * RTTVAR, clamped to [min_rto, max_rto].
+Timeouts back off exponentially, and only replies to first attempts are
+sampled (Karn's algorithm) since a retried request's reply is ambiguous.
+
+On localhost RetroArch answers in a few milliseconds (at most one frame),
+so once a handful of samples are in, a lost datagram costs tens of
+milliseconds instead of a fixed one-second timeout.
+"""
+
+import threading
+from typing import Any, Dict
+
+# RFC 6298 gains
+ALPHA = 1 / 8
+BETA = 1 / 4
+K = 4
+
+DEFAULT_INITIAL_RTO = 1.0
+DEFAULT_MIN_RTO = 0.02
+DEFAULT_MAX_RTO = 2.0
+
+
+def command_type(command: str) -> str:
+    """Estimator key for a command - its name, e.g. READ_CORE_MEMORY"""
+    return command.split(' ', 1)[0]
+
+
+class _CommandTiming:
+    __slots__ = ('srtt', 'rttvar', 'rto', 'samples', 'timeouts', 'last_rtt')
+
+    def __init__(self, initial_rto: float):
+        self.srtt = None
+        self.rttvar = None
+        self.rto = initial_rto
+        self.samples = 0
+        self.timeouts = 0
+        self.last_rtt = None
+
+
+class RTTEstimator:
+    """Per-command-type smoothed RTT and retransmission timeout (thread-safe)"""
+
+    def __init__(self, initial_rto: float = DEFAULT_INITIAL_RTO, min_rto: float = DEFAULT_MIN_RTO,
+                 max_rto: float = DEFAULT_MAX_RTO):
+        self.initial_rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self._timings: Dict[str, _CommandTiming] = {}
+        self._lock = threading.Lock()
+
+    def _timing(self, kind: str) -> _CommandTiming:
+        timing = self._timings.get(kind)
+        if timing is None:
+            timing = self._timings[kind] = _CommandTiming(self.initial_rto)
+        return timing
+
+    def _clamp(self, rto: float) -> float:
+        return min(self.max_rto, max(self.min_rto, rto))
+
+    def timeout(self, kind: str) -> float:
+        """Current retransmission timeout in seconds for this command type"""
+        with self._lock:
+            return self._timing(kind).rto
+
+    def observe(self, kind: str, rtt: float):
+        """Record a round trip measured on a first (non-retried) attempt"""
+        with self._lock:
+            timing = self._timing(kind)
+            if timing.srtt is None:
+                timing.srtt = rtt
+                timing.rttvar = rtt / 2
+            else:
+                timing.rttvar = (1 - BETA) * timing.rttvar + BETA * abs(timing.srtt - rtt)
+                timing.srtt = (1 - ALPHA) * timing.srtt + ALPHA * rtt
+            timing.rto = self._clamp(timing.srtt + K * timing.rttvar)
+            timing.samples += 1
+            timing.last_rtt = rtt
+
+    def backoff(self, kind: str):
+        """Double the timeout after an unanswered attempt"""
+        with self._lock:
+            timing = self._timing(kind)
+            timing.rto = self._clamp(timing.rto * 2)
+            timing.timeouts += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Estimator state per command type, in milliseconds, for monitoring endpoints"""
+        def ms(value):
+            return round(value * 1000, 3) if value is not None else None
+
+        with self._lock:
+            return {
+                kind: {
+                    'srtt_ms': ms(timing.srtt),
+                    'rttvar_ms': ms(timing.rttvar),
+                    'rto_ms': ms(timing.rto),
+                    'last_rtt_ms': ms(timing.last_rtt),
+                    'samples': timing.samples,
+                    'timeouts': timing.timeouts,
+                }
+                for kind, timing in self._timings.items()
+            }
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Compact Game State Snapshots
+
+parse_complete_game_state returns a nested dict of dicts. The poller keeps
+the latest state (and a short history of changes) as GameSnapshot instead:
+one array('H') of the decoded words plus three bitfield views for items,
+beams and bosses. A snapshot is a handful of small objects rather than four
+dicts with ~45 boxed entries, and identical polls share one snapshot.
+
+Snapshots turn back into the parser's dict shape only at the serving edge
+(to_dict / to_json).
+"""
+
+import json
+import logging
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from boss_rules import BOSS_RULES
+from game_state_decoder import AREA_NAMES, LOCATION_FIELDS
+from memory_layout import BEAM_BITS, ITEM_BITS, STATS_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Word order in GameSnapshot.words (area_id is a byte, stored widened)
+SNAPSHOT_WORDS: Tuple[str, ...] = LOCATION_FIELDS + STATS_FIELDS
+WORD_INDEX = {name: i for i, name in enumerate(SNAPSHOT_WORDS)}
+
+
+class FlagTable:
+    """Bit positions of the names in one bitfield section; unknown names get the next free bit"""
+    __slots__ = ('names', 'index')
+
+    def __init__(self, names=()):
+        self.names: Tuple[str, ...] = ()
+        self.index: Dict[str, int] = {}
+        for name in names:
+            self.bit(name)
+
+    def bit(self, name: str) -> int:
+        position = self.index.get(name)
+        if position is None:
+            position = len(self.names)
+            self.index[name] = position
+            # Replace, never mutate: readers iterate names without a lock
+            self.names = self.names + (name,)
+        return 1 << position
+
+    def pack(self, flags: Mapping) -> 'FlagView':
+        bits = present = 0
+        for name, value in flags.items():
+            bit = self.bit(name)
+            present |= bit
+            if value:
+                bits |= bit
+        return FlagView(self, bits, present)
+
+
+ITEM_FLAGS = FlagTable(name for name, _ in ITEM_BITS)
+BEAM_FLAGS = FlagTable([name for name, _ in BEAM_BITS] + ['hyper'])
+BOSS_FLAGS = FlagTable([rule.name for rule in BOSS_RULES] + ['mother_brain_1', 'mother_brain_2', 'samus_ship'])
+
+
+class FlagView(Mapping):
+    """Read-only name -> bool view of a packed bitfield section"""
+    __slots__ = ('table', 'bits', 'present')
+
+    def __init__(self, table: FlagTable, bits: int, present: int):
+        self.table = table
+        self.bits = bits
+        self.present = present
+
+    def __getitem__(self, name: str) -> bool:
+        position = self.table.index.get(name)
+        if position is None or not self.present >> position & 1:
+            raise KeyError(name)
+        return bool(self.bits >> position & 1)
+
+    def __iter__(self) -> Iterator[str]:
+        present = self.present
+        return (name for i, name in enumerate(self.table.names) if present >> i & 1)
+
+    def __len__(self) -> int:
+        return bin(self.present).count('1')
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, FlagView) and other.table is self.table:
+            return self.bits == other.bits and self.present == other.present
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"FlagView({dict(self)!r})"
+
+
+class GameSnapshot:
+    """One parsed game state: decoded words plus item/beam/boss bitfield views"""
+    __slots__ = ('words', 'items', 'beams', 'bosses', 'timestamp', 'poll')
+
+    def __init__(self, words: array, items: FlagView, beams: FlagView, bosses: FlagView,
+                 timestamp: float = 0.0, poll: int = 0):
+        self.words = words
+        self.items = items
+        self.beams = beams
+        self.bosses = bosses
+        self.timestamp = timestamp
+        self.poll = poll
+
+    @classmethod
+    def from_game_state(cls, game_state: Mapping[str, Any], timestamp: float = 0.0,
+                        poll: int = 0) -> 'GameSnapshot':
+        """Pack a parse_complete_game_state dict (which must have location and stats)"""
+        words = array('H', [game_state[name] for name in SNAPSHOT_WORDS])
+        return cls(words, ITEM_FLAGS.pack(game_state.get('items', {})),
+                   BEAM_FLAGS.pack(game_state.get('beams', {})),
+                   BOSS_FLAGS.pack(game_state.get('bosses', {})), timestamp, poll)
+
+    def __getattr__(self, name: str) -> int:
+        # Word fields by name: snapshot.health, snapshot.room_id, ...
+        index = WORD_INDEX.get(name)
+        if index is None:
+            raise AttributeError(name)
+        return self.words[index]
+
+    @property
+    def area_name(self) -> str:
+        return AREA_NAMES.get(self.words[WORD_INDEX['area_id']], "")
+
+    def same_state(self, other: Optional['GameSnapshot']) -> bool:
+        """True if other decodes to the same game state (timestamps aside)"""
+        return (other is not None and self.words == other.words and self.items == other.items
+                and self.beams == other.beams and self.bosses == other.bosses)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The parser's game_state dict shape"""
+        words = self.words
+        # Same key order as parse_location_data
+        game_state: Dict[str, Any] = {'room_id': words[0], 'area_id': words[1], 'area_name': self.area_name,
+                                      'game_state': words[2], 'player_x': words[3], 'player_y': words[4]}
+        game_state.update(zip(STATS_FIELDS, words[len(LOCATION_FIELDS):]))
+        game_state['items'] = dict(self.items)
+        game_state['beams'] = dict(self.beams)
+        game_state['bosses'] = dict(self.bosses)
+        return game_state
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def __repr__(self) -> str:
+        return f"GameSnapshot(poll={self.poll}, room_id={self.room_id}, health={self.health})"
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Parser Trace Buffer
+
+In-memory ring buffer for the parser's per-poll diagnostics (raw beam
+values, escape timers, memory scans, ship detection debug...). Records keep
+the %-style message and its arguments and are only formatted when dumped,
+so a poll pays for a tuple append instead of string formatting and a log
+file write. The last max_polls polls are kept; /api/trace dumps them.
+
+Tracing can be switched off with TRACKER_TRACE=0. When the logger is at
+DEBUG, records are also passed to it (still lazily formatted).
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_POLLS = 20
+DEFAULT_MAX_RECORDS_PER_POLL = 256
+
+
+def _trace_enabled_from_env() -> bool:
+    return os.environ.get('TRACKER_TRACE', '1').lower() not in ('0', 'false', 'off', 'no')
+
+
+class TraceBuffer:
+    """Ring buffer of lazily formatted trace records, grouped by poll"""
+
+    def __init__(self, max_polls: int = DEFAULT_MAX_POLLS,
+                 max_records_per_poll: int = DEFAULT_MAX_RECORDS_PER_POLL,
+                 enabled: Optional[bool] = None, log: Optional[logging.Logger] = None):
+        self.enabled = _trace_enabled_from_env() if enabled is None else enabled
+        self.max_records_per_poll = max_records_per_poll
+        self.log = log or logger
+        self._polls: deque = deque(maxlen=max_polls)
+        self._records: List[Tuple[float, str, str, tuple]] = []
+        self._poll_start = time.time()
+        self._lock = threading.Lock()
+        self.poll_count = 0
+        self.records_dropped = 0
+
+    def begin_poll(self):
+        """Start a new poll's record group (the oldest poll falls off the ring)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.poll_count += 1
+            self._poll_start = time.time()
+            self._records = []
+            self._polls.append((self.poll_count, self._poll_start, self._records))
+
+    def record(self, channel: str, msg: str, *args: Any):
+        """Keep a trace record; msg % args is only evaluated when dumped (or logged at DEBUG)"""
+        if not self.enabled:
+            return
+        records = self._records
+        if len(records) >= self.max_records_per_poll:
+            self.records_dropped += 1
+            return
+        records.append((time.time(), channel, msg, args))
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(msg, *args)
+
+    @staticmethod
+    def _format(msg: str, args: tuple) -> str:
+        try:
+            return msg % args if args else msg
+        except (TypeError, ValueError) as e:
+            return f"{msg} {args!r} (format error: {e})"
+
+    def dump(self, polls: Optional[int] = None, channel: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Formatted records of the last `polls` polls (all kept polls by default), oldest first"""
+        with self._lock:
+            kept = list(self._polls)
+        if polls is not None:
+            kept = kept[-polls:] if polls > 0 else []
+        return [{
+            'poll': number,
+            'time': started,
+            'records': [{'t': round(t - started, 6), 'channel': record_channel, 'message': self._format(msg, args)}
+                        for t, record_channel, msg, args in list(records)
+                        if channel is None or record_channel == channel],
+        } for number, started, records in kept]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'polls': self.poll_count,
+            'polls_kept': len(self._polls),
+            'max_polls': self._polls.maxlen,
+            'records_dropped': self.records_dropped,
+        }
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Pipelined RetroArch UDP Command Engine
+
+Keeps several READ_CORE_MEMORY commands in flight at once on a single UDP
+socket. Replies are matched back to their request by the address RetroArch
+echoes in the response line ("READ_CORE_MEMORY 7e09c2 23 00 ..."), and each
+request is retried or timed out on its own - so a batch of reads costs
+roughly the slowest single reply instead of the sum of all round trips.
+Per-request timeouts come from an RTTEstimator shared with the caller.
+
+Ranges of any size are split into MAX_READ_CHUNK-byte chunks that are
+pipelined like any other read and decoded straight into one reassembly
+buffer per range; the receive buffer is sized to fit a full chunk reply.
+"""
+
+import logging
+import select
+import socket
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from response_decoder import ReadReplyDecoder
+from rtt_estimator import RTTEstimator
+
+logger = logging.getLogger(__name__)
+
+READ_CORE_MEMORY = "READ_CORE_MEMORY"
+
+# Largest single READ_CORE_MEMORY request. Replies are hex text (3 characters
+# per byte), so a 512-byte chunk is a ~1.6 KB datagram - well within what
+# RetroArch sends in one reply.
+MAX_READ_CHUNK = 512
+
+
+def reply_buffer_size(chunk_size: int = MAX_READ_CHUNK) -> int:
+    """Receive buffer size that fits a full reply for chunk_size bytes"""
+    # "READ_CORE_MEMORY " + address (up to 8 hex digits) + " xx" per byte + newline
+    return len(READ_CORE_MEMORY) + 10 + 3 * chunk_size + 1
+
+
+def split_range(address: int, size: int, chunk_size: int = MAX_READ_CHUNK) -> List[Tuple[int, int]]:
+    """Split one (address, size) read into consecutive chunks of at most chunk_size bytes"""
+    return [(offset, min(chunk_size, address + size - offset))
+            for offset in range(address, address + size, chunk_size)]
+
+
+def parse_read_reply(response: str) -> Tuple[Optional[int], Optional[bytes]]:
+    """
+    Split a READ_CORE_MEMORY reply into (echoed address, data).
+
+    Returns (None, None) for anything that isn't a READ_CORE_MEMORY reply and
+    (address, None) for error replies such as "READ_CORE_MEMORY 7e0000 -1 ...".
+    """
+    if not response or not response.startswith(READ_CORE_MEMORY):
+        return None, None
+
+    parts = response.split(' ', 2)
+    if len(parts) < 2:
+        return None, None
+
+    try:
+        address = int(parts[1], 16)
+    except ValueError:
+        return None, None
+
+    if len(parts) < 3 or parts[2].startswith('-1'):
+        return address, None
+
+    try:
+        return address, bytes.fromhex(parts[2].replace(' ', ''))
+    except ValueError:
+        return address, None
+
+
+# Commands whose replies start by echoing the command name
+ECHOED_COMMANDS = ("GET_STATUS", READ_CORE_MEMORY, "WRITE_CORE_MEMORY", "GET_CONFIG_PARAM")
+
+
+def reply_matches_command(command: str, response: str) -> bool:
+    """
+    Check that a reply belongs to the outstanding command.
+
+    Used to discard stale datagrams (late replies to an earlier, timed-out
+    command) instead of sleeping until the socket goes quiet. VERSION replies
+    carry no prefix, so they only have to not look like any other reply.
+    """
+    name = command.split(' ', 1)[0]
+    if name == READ_CORE_MEMORY:
+        expected_address = int(command.split(' ')[1], 16)
+        address, _ = parse_read_reply(response)
+        return address == expected_address
+    if name in ECHOED_COMMANDS:
+        return response.startswith(name)
+    return not response.startswith(ECHOED_COMMANDS)
+
+
+def drain_socket(sock: socket.socket, buffer_size: int = 1024) -> int:
+    """Discard every datagram already queued on the socket without blocking; returns the count"""
+    drained = 0
+    while select.select([sock], [], [], 0)[0]:
+        try:
+            sock.recvfrom(buffer_size)
+        except (BlockingIOError, socket.timeout):
+            break
+        drained += 1
+    return drained
+
+
+class PipelinedUDPEngine:
+    """Issues batches of READ_CORE_MEMORY commands with a bounded in-flight window"""
+
+    def __init__(self, host: str = "localhost", port: int = 55355, max_in_flight: int = 8,
+                 timeout: float = 1.0, max_retries: int = 1, max_chunk: int = MAX_READ_CHUNK,
+                 rtt: Optional[RTTEstimator] = None):
+        self.host = host
+        self.port = port
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        # timeout is only the initial RTO - it adapts to measured round trips
+        self.rtt = rtt if rtt is not None else RTTEstimator(initial_rto=timeout)
+        self.max_chunk = max_chunk
+        self.recv_buffer_size = reply_buffer_size(max_chunk)
+        self.decoder = ReadReplyDecoder(self.recv_buffer_size)
+
+    def read_many(self, sock: socket.socket, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """Read every (address, size) range, chunking large ones; results are returned in request order"""
+        if not ranges:
+            return []
+
+        # Each chunk decodes into its slice of the range's reassembly buffer
+        buffers = [bytearray(size) for _, size in ranges]
+        chunks: List[Tuple[int, int]] = []
+        targets: List[Tuple[int, memoryview]] = []   # chunk index -> (range index, destination)
+        for range_index, (address, size) in enumerate(ranges):
+            view = memoryview(buffers[range_index])
+            for chunk_address, chunk_size in split_range(address, size, self.max_chunk):
+                offset = chunk_address - address
+                chunks.append((chunk_address, chunk_size))
+                targets.append((range_index, view[offset:offset + chunk_size]))
+
+        complete = self._read_chunks(sock, chunks, targets)
+
+        failed = {targets[i][0] for i, done in enumerate(complete) if not done}
+        return [None if i in failed else bytes(data) for i, data in enumerate(buffers)]
+
+    def _read_chunks(self, sock: socket.socket, chunks: Sequence[Tuple[int, int]],
+                     targets: Sequence[Tuple[int, memoryview]]) -> List[bool]:
+        """Pipeline every chunk read, decoding each reply into its target view"""
+        results = [False] * len(chunks)
+
+        # Late replies from an earlier batch would otherwise match by address
+        drain_socket(sock, self.recv_buffer_size)
+
+        pending = deque(range(len(chunks)))
+        in_flight: Dict[int, int] = {}       # echoed address -> request index
+        deadlines: Dict[int, float] = {}     # request index -> reply deadline
+        sent_at: Dict[int, float] = {}       # request index -> send time
+        attempts = [0] * len(chunks)
+        decoder = self.decoder
+
+        while pending or in_flight:
+            # Fill the window. Only one request per address may be in flight,
+            # otherwise the echoed address would be ambiguous.
+            deferred = []
+            while pending and len(in_flight) < self.max_in_flight:
+                index = pending.popleft()
+                address, size = chunks[index]
+                if address in in_flight:
+                    deferred.append(index)
+                    continue
+                command = f"{READ_CORE_MEMORY} 0x{address:X} {size}"
+                sock.sendto(command.encode(), (self.host, self.port))
+                attempts[index] += 1
+                in_flight[address] = index
+                sent_at[index] = time.monotonic()
+                deadlines[index] = sent_at[index] + self.rtt.timeout(READ_CORE_MEMORY)
+            pending.extendleft(reversed(deferred))
+
+            if not in_flight:
+                continue
+
+            # Wait for the next reply, at most until the earliest deadline
+            wait = min(deadlines[i] for i in in_flight.values()) - time.monotonic()
+            if select.select([sock], [], [], max(0.0, wait))[0]:
+                while True:
+                    try:
+                        nbytes = decoder.recv_into(sock)
+                    except (BlockingIOError, socket.timeout):
+                        break
+                    address = decoder.address(nbytes)
+                    index = in_flight.pop(address, None) if address is not None else None
+                    if index is None:
+                        logger.debug(f"Discarding unmatched UDP reply: {bytes(decoder.view[:min(nbytes, 40)])!r}")
+                    else:
+                        # One fromhex allocation, then one copy into the reassembly buffer
+                        data = decoder.decode(nbytes)
+                        dest = targets[index][1]
+                        results[index] = data is not None and len(data) == len(dest)
+                        if results[index]:
+                            dest[:] = data
+                        deadlines.pop(index, None)
+                        # Karn's algorithm - a retried request's reply is ambiguous
+                        if attempts[index] == 1:
+                            self.rtt.observe(READ_CORE_MEMORY, time.monotonic() - sent_at[index])
+                    if not select.select([sock], [], [], 0)[0]:
+                        break
+
+            # Expire requests individually - retry or give up
+            now = time.monotonic()
+            expired = False
+            for address, index in list(in_flight.items()):
+                if deadlines[index] > now:
+                    continue
+                del in_flight[address]
+                del deadlines[index]
+                expired = True
+                if attempts[index] <= self.max_retries:
+                    logger.debug(f"UDP timeout for read 0x{address:X}, retrying (attempt {attempts[index] + 1})")
+                    pending.appendleft(index)
+                else:
+                    logger.debug(f"UDP timeout for read 0x{address:X}, giving up after {attempts[index]} attempts")
+            if expired:
+                # One backoff per timer expiry, however many requests it covered
+                self.rtt.backoff(READ_CORE_MEMORY)
+
+        return results
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Super Metroid WRAM Mirror
+
+Local 128 KiB copy of WRAM (0x7E0000-0x7FFFFF) refreshed region by region on
+per-region schedules: the hot regions the tracker parses every poll, cold
+ones (event bits, map exploration, the full sweep) only every few seconds.
+
+The mirror implements the reader interface (read_memory_range / read_many),
+so ReadPlan.execute, new detectors and ad-hoc debug queries read from it
+without any extra emulator traffic. Each region tracks how often its
+contents actually change.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+WRAM_BASE = 0x7E0000
+WRAM_SIZE = 0x20000
+
+# Weight of the newest refresh in each region's smoothed change rate
+CHANGE_RATE_ALPHA = 0.2
+
+# A failing region is retried after 1, 2, 4, ... seconds, capped at its own
+# interval (hot regions keep retrying every call)
+FAILURE_BACKOFF_BASE = 1.0
+
+
+class MirrorRegion(NamedTuple):
+    """A WRAM range and how often to refresh it (interval 0 = every refresh call)"""
+    name: str
+    address: int
+    size: int
+    interval: float
+
+
+DEFAULT_REGIONS: Tuple[MirrorRegion, ...] = (
+    # Hot - everything the game state parser reads, refreshed every poll
+    MirrorRegion('room', 0x7E0780, 0x40, 0.0),       # room id / area id
+    MirrorRegion('samus', 0x7E0900, 0x200, 0.0),     # 0x0900-0x0B00: game state, stats, items, beams, timers, position
+    MirrorRegion('enemies', 0x7E0F80, 0x100, 0.0),   # boss HP, Mother Brain HP, ship AI
+    MirrorRegion('boss_flags', 0x7ED820, 0x10, 0.0), # event flags and boss defeat bits
+
+    # Cold - useful for debugging and future detectors, rarely changes
+    MirrorRegion('events_items', 0x7ED800, 0x100, 5.0),  # event / item collection / door bits
+    MirrorRegion('map_explored', 0x7ECD52, 0x700, 10.0), # map exploration tables
+    MirrorRegion('wram', WRAM_BASE, WRAM_SIZE, 60.0),    # full sweep of both banks
+)
+
+
+class _RegionState:
+    __slots__ = ('region', 'loaded', 'ok', 'last_refresh', 'refreshes', 'failures',
+                 'consecutive_failures', 'retry_at', 'changes', 'bytes_changed', 'change_rate')
+
+    def __init__(self, region: MirrorRegion):
+        self.region = region
+        self.loaded = False        # at least one successful refresh
+        self.ok = False            # last refresh attempt succeeded
+        self.last_refresh = None   # monotonic time of last successful refresh
+        self.refreshes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.retry_at = 0.0        # monotonic time a failed region is due again
+        self.changes = 0           # refreshes where the contents differed
+        self.bytes_changed = 0     # differing bytes in the most recent change
+        self.change_rate = 0.0     # smoothed fraction of refreshes that saw a change
+
+
+class WramMirror:
+    """Scheduled local copy of Super Metroid WRAM (thread-safe)"""
+
+    def __init__(self, regions: Iterable[MirrorRegion] = DEFAULT_REGIONS):
+        self.memory = bytearray(WRAM_SIZE)
+        self.view = memoryview(self.memory)
+        self._regions: List[_RegionState] = []
+        for region in regions:
+            if region.address < WRAM_BASE or region.address + region.size > WRAM_BASE + WRAM_SIZE:
+                raise ValueError(f"Region {region.name} 0x{region.address:X}+{region.size} is outside WRAM")
+            self._regions.append(_RegionState(region))
+        self._lock = threading.Lock()
+
+    def due_regions(self, now: Optional[float] = None) -> List[MirrorRegion]:
+        """Regions whose refresh interval has elapsed, or whose failure backoff has"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return [state.region for state in self._regions
+                    if (now - state.last_refresh >= state.region.interval if state.ok
+                        else now >= state.retry_at)]
+
+    def refresh(self, reader, force: bool = False) -> List[str]:
+        """
+        Re-read every due region through the reader (pipelined if it has
+        read_many); returns the names of the regions that were refreshed.
+
+        Only a failing hot region invalidates the reader's connection info;
+        a cold region or the full sweep failing (e.g. a core without bank
+        0x7F) just backs off.
+        """
+        now = time.monotonic()
+        due = [state.region for state in self._regions] if force else self.due_regions(now)
+        if not due:
+            return []
+
+        ranges = [(region.address, region.size) for region in due]
+        if hasattr(reader, 'read_many'):
+            results = reader.read_many(ranges)
+        else:
+            results = [reader.read_memory_range(address, size) for address, size in ranges]
+
+        refreshed = []
+        hot_failed = False
+        with self._lock:
+            states = {state.region: state for state in self._regions}
+            for region, data in zip(due, results):
+                state = states[region]
+                if data is None or len(data) != region.size:
+                    state.ok = False
+                    state.failures += 1
+                    state.consecutive_failures += 1
+                    backoff = FAILURE_BACKOFF_BASE * 2 ** min(state.consecutive_failures - 1, 16)
+                    state.retry_at = now + min(region.interval, backoff)
+                    hot_failed = hot_failed or region.interval == 0
+                    continue
+
+                offset = region.address - WRAM_BASE
+                current = self.view[offset:offset + region.size]
+                changed = state.loaded and current != data
+                if changed:
+                    state.changes += 1
+                    state.bytes_changed = sum(1 for old, new in zip(current, data) if old != new)
+                if state.loaded:
+                    state.change_rate += CHANGE_RATE_ALPHA * ((1.0 if changed else 0.0) - state.change_rate)
+                current[:] = data
+
+                state.loaded = True
+                state.ok = True
+                state.consecutive_failures = 0
+                state.last_refresh = now
+                state.refreshes += 1
+                refreshed.append(region.name)
+
+        if hot_failed and hasattr(reader, 'invalidate_info'):
+            reader.invalidate_info("hot WRAM region read failed")
+        logger.debug(f"🪞 WRAM mirror refreshed {len(refreshed)}/{len(due)} regions")
+        return refreshed
+
+    def _source(self, address: int, size: int) -> Optional[_RegionState]:
+        # The hottest region covering the range decides whether it is current
+        covering = [state for state in self._regions
+                    if state.region.address <= address and address + size <= state.region.address + state.region.size]
+        if not covering:
+            return None
+        return min(covering, key=lambda state: state.region.interval)
+
+    def read_memory_range(self, start_address: int, size: int) -> Optional[bytes]:
+        """
+        Read from the mirror. None if the range was never loaded or its
+        hottest covering region failed its last refresh (stale data).
+        """
+        with self._lock:
+            state = self._source(start_address, size)
+            if state is None or not state.ok:
+                return None
+            offset = start_address - WRAM_BASE
+            return bytes(self.view[offset:offset + size])
+
+    def read_many(self, ranges: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """Read several ranges from the mirror (results in request order)"""
+        return [self.read_memory_range(address, size) for address, size in ranges]
+
+    def age(self, start_address: int, size: int) -> Optional[float]:
+        """Seconds since the range's source region was last refreshed"""
+        with self._lock:
+            state = self._source(start_address, size)
+            if state is None or not state.loaded:
+                return None
+            return time.monotonic() - state.last_refresh
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-region refresh and change-rate statistics for monitoring endpoints"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                state.region.name: {
+                    'address': f"0x{state.region.address:06X}",
+                    'size': state.region.size,
+                    'interval': state.region.interval,
+                    'refreshes': state.refreshes,
+                    'failures': state.failures,
+                    'consecutive_failures': state.consecutive_failures,
+                    'retry_in': round(max(0.0, state.retry_at - now), 3) if not state.ok else None,
+                    'changes': state.changes,
+                    'bytes_changed_last': state.bytes_changed,
+                    'change_rate': round(state.change_rate, 3),
+                    'age': round(now - state.last_refresh, 3) if state.loaded else None,
+                    'ok': state.ok,
+                }
+                for state in self._regions
+            }
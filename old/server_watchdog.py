@@ -15,15 +15,10 @@ import sys
 import os
 from typing import Optional
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('watchdog.log'),
-        logging.StreamHandler()
-    ]
-)
+# Shared logging setup lives with the background poller server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server_python'))
+from logging_setup import setup_logging
+
 logger = logging.getLogger(__name__)
 
 class ServerWatchdog:
@@ -208,6 +203,8 @@ def signal_handler(signum, frame):
     sys.exit(0)
 
 if __name__ == "__main__":
+    setup_logging('watchdog.log')
+    
     # Handle shutdown signals
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
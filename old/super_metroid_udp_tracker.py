@@ -4,12 +4,18 @@ Super Metroid UDP Tracker
 Reads game stats directly from RetroArch via UDP
 """
 
+import os
 import socket
-import struct
+import sys
 import time
 import json
 from typing import Dict, Optional
 
+# Shared memory layout lives with the background poller server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server_python'))
+from memory_layout import STATS_BLOCK, TRACKER_ALIASES, WORD, memory_map
+from bitfield_tables import decode_beams, decode_items
+
 class SuperMetroidUDPTracker:
     def __init__(self, host="localhost", port=55355):
         self.host = host
@@ -17,29 +23,7 @@ class SuperMetroidUDPTracker:
         self.sock = None
         
         # Super Metroid memory addresses (SNES format)
-        self.memory_map = {
-            'health': 0x7E09C2,
-            'max_health': 0x7E09C4,
-            'missiles': 0x7E09C6,
-            'max_missiles': 0x7E09C8,
-            'supers': 0x7E09CA,
-            'max_supers': 0x7E09CC,
-            'power_bombs': 0x7E09CE,
-            'max_power_bombs': 0x7E09D0,
-            'reserve_energy': 0x7E09D6,  # FIXED: Correct address for current reserve energy  
-            'max_reserve_energy': 0x7E09D4,
-            'game_state': 0x7E0998,
-            'room_id': 0x7E079B,
-            'area_id': 0x7E079F,
-            'player_x': 0x7E0AF6,
-            'player_y': 0x7E0AFA,
-            # Item and boss tracking (correct Super Metroid addresses)
-            'items_collected': 0x7E09A4,    # Collected items bitfield
-            'beams_collected': 0x7E09A8,    # Beam weapons bitfield  
-            'bosses_defeated': 0x7ED828,    # Bosses defeated bitfield
-            'crocomire_defeated': 0x7ED829, # Crocomire special address
-            'events_flags': 0x7ED870,       # Event flags
-        }
+        self.memory_map = memory_map(aliases=TRACKER_ALIASES)
         
         # Area names
         self.areas = {
@@ -163,7 +147,7 @@ class SuperMetroidUDPTracker:
         """Read a 16-bit word (little-endian) from memory"""
         data = self.read_memory_range(address, 2)
         if data and len(data) >= 2:
-            return struct.unpack('<H', data[:2])[0]  # Little-endian 16-bit
+            return WORD.unpack_from(data)[0]  # Little-endian 16-bit
         return None
         
     def read_byte(self, address: int) -> Optional[int]:
@@ -177,24 +161,14 @@ class SuperMetroidUDPTracker:
         """Read all Super Metroid stats at once"""
         # Read a large chunk that contains all our stats
         base_address = self.memory_map['health']
-        data = self.read_memory_range(base_address, 22)  # Read 22 bytes to include reserve energy
+        data = self.read_memory_range(base_address, STATS_BLOCK.size)  # Read 22 bytes to include reserve energy
         
-        if not data or len(data) < 22:
+        if not data or len(data) < STATS_BLOCK.size:
             return {}
             
-        # Parse the data (all 16-bit little-endian values)
-        stats = {}
+        # Parse the data (all 16-bit little-endian values, one precompiled unpack)
         try:
-            stats['health'] = struct.unpack('<H', data[0:2])[0]
-            stats['max_health'] = struct.unpack('<H', data[2:4])[0]
-            stats['missiles'] = struct.unpack('<H', data[4:6])[0]
-            stats['max_missiles'] = struct.unpack('<H', data[6:8])[0]
-            stats['supers'] = struct.unpack('<H', data[8:10])[0]
-            stats['max_supers'] = struct.unpack('<H', data[10:12])[0]
-            stats['power_bombs'] = struct.unpack('<H', data[12:14])[0]
-            stats['max_power_bombs'] = struct.unpack('<H', data[14:16])[0]
-            stats['max_reserve_energy'] = struct.unpack('<H', data[18:20])[0]
-            stats['reserve_energy'] = struct.unpack('<H', data[20:22])[0]
+            stats = STATS_BLOCK.unpack(data)
             
             # Read additional memory for location and game state
             room_data = self.read_word(self.memory_map['room_id'])
@@ -216,29 +190,9 @@ class SuperMetroidUDPTracker:
             beams_data = self.read_word(self.memory_map['beams_collected']) 
             bosses_data = self.read_word(self.memory_map['bosses_defeated'])
             
-            # Parse item bitflags
-            stats['items'] = {}
-            if items_data is not None:
-                stats['items']['morph'] = bool(items_data & 0x04)
-                stats['items']['bombs'] = bool(items_data & 0x1000)
-                stats['items']['varia'] = bool(items_data & 0x01)
-                stats['items']['gravity'] = bool(items_data & 0x20)
-                stats['items']['hijump'] = bool(items_data & 0x100)
-                stats['items']['speed'] = bool(items_data & 0x2000)
-                stats['items']['space'] = bool(items_data & 0x200)
-                stats['items']['screw'] = bool(items_data & 0x08)
-                stats['items']['spring'] = bool(items_data & 0x02)  # Spring Ball - ADDED
-                stats['items']['xray'] = bool(items_data & 0x8000)
-                stats['items']['grapple'] = bool(items_data & 0x4000)
-                
-            # Parse beam bitflags  
-            stats['beams'] = {}
-            if beams_data is not None:
-                stats['beams']['charge'] = bool(beams_data & 0x1000)
-                stats['beams']['ice'] = bool(beams_data & 0x02)
-                stats['beams']['wave'] = bool(beams_data & 0x01)
-                stats['beams']['spazer'] = bool(beams_data & 0x04)
-                stats['beams']['plasma'] = bool(beams_data & 0x08)
+            # Parse item and beam bitflags (shared mappings from the decode tables)
+            stats['items'] = decode_items(items_data)
+            stats['beams'] = decode_beams(beams_data)
                 
             # Parse boss bitflags
             if bosses_data is not None:
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Shared raw-memory fixtures for the parser, snapshot, tracker and view tests
+
+make_memory() builds memory_data the way ReadPlan.execute returns it. Field
+sizes come from read_plan.GAME_STATE_FIELDS and the stats block is packed
+from memory_layout, so the fixtures follow layout changes.
+"""
+
+import sys
+import os
+import struct
+
+# Add server_python directory to path to import the memory layout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from memory_layout import LAYOUT_BY_NAME, STATS_BLOCK
+from read_plan import GAME_STATE_FIELDS
+
+FIELD_SIZES = {field.name: field.size for field in GAME_STATE_FIELDS}
+
+# Fields the fixtures fill in after basic_stats (everything else the parser reads is absent)
+WORD_FIELDS = ('room_id', 'area_id', 'game_state', 'player_x', 'player_y', 'items', 'beams',
+               'main_bosses', 'crocomire', 'boss_plus_1', 'boss_plus_2', 'boss_plus_3', 'boss_plus_4',
+               'boss_plus_5', 'boss_hp_1', 'boss_hp_2', 'boss_hp_3')
+
+
+def pack_stats(**stats: int) -> bytes:
+    """The basic_stats block with the given STATS_BLOCK fields set (the rest zero)"""
+    block = bytearray(STATS_BLOCK.size)
+    for name, value in stats.items():
+        field = LAYOUT_BY_NAME[name]
+        struct.pack_into('<' + field.type, block, field.address - STATS_BLOCK.address, value)
+    return bytes(block)
+
+
+def make_memory(health=300, max_health=399, missiles=0, max_missiles=0, items=0x1004, beams=0x1001,
+                bosses=0x0101, area=1, room=0x9F11, mb_hp=0, **fields: int):
+    """
+    memory_data for Samus in Crateria (room 0x9F11) with morph and bombs.
+    Any other field in WORD_FIELDS can be set by name, e.g. boss_plus_3=1.
+    """
+    unknown = set(fields) - set(WORD_FIELDS)
+    if unknown:
+        raise TypeError(f"make_memory() got unknown fields {sorted(unknown)}")
+    values = {'room_id': room, 'area_id': area, 'game_state': 0x0008, 'player_x': 0x0080, 'player_y': 0x0090,
+              'items': items, 'beams': beams, 'main_bosses': bosses, 'boss_hp_3': mb_hp, **fields}
+    memory = {'basic_stats': pack_stats(health=health, max_health=max_health,
+                                        missiles=missiles, max_missiles=max_missiles)}
+    for name in WORD_FIELDS:
+        memory[name] = values.get(name, 0).to_bytes(FIELD_SIZES[name], 'little')
+    return memory
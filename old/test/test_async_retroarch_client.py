@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio RetroArch client
+Runs a delayed local asyncio UDP responder to check concurrency and timeouts
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import time
+
+# Add server_python directory to path to import async_retroarch_client
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from async_retroarch_client import AsyncRetroArchClient
+
+
+WRAM = bytes((i * 31 + 7) & 0xFF for i in range(0x20000))
+
+
+class DelayedResponder(asyncio.DatagramProtocol):
+    """Answers each command after a fixed delay; ignores addresses in `silent`"""
+
+    def __init__(self, delay, silent=()):
+        self.delay = delay
+        self.silent = set(silent)
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        command = data.decode()
+        if command == "VERSION":
+            reply = "1.19.1"
+        elif command == "GET_STATUS":
+            reply = "GET_STATUS PLAYING super_nes,Super Metroid,crc32=d63ed5f8"
+        else:
+            _, address_text, size_text = command.split(' ')
+            address, size = int(address_text, 16), int(size_text)
+            if address in self.silent:
+                return
+            offset = address - 0x7E0000
+            reply = f"READ_CORE_MEMORY {address:x} " + ' '.join(f'{b:02x}' for b in WRAM[offset:offset + size])
+        asyncio.get_running_loop().call_later(self.delay, self.transport.sendto, reply.encode(), addr)
+
+
+class TestAsyncRetroArchClient(unittest.TestCase):
+
+    def run_with_responder(self, scenario, delay=0.0, silent=()):
+        async def runner():
+            loop = asyncio.get_running_loop()
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: DelayedResponder(delay, silent), local_addr=('127.0.0.1', 0))
+            port = transport.get_extra_info('sockname')[1]
+            try:
+                async with AsyncRetroArchClient('127.0.0.1', port, timeout=0.3) as client:
+                    return await scenario(client)
+            finally:
+                transport.close()
+        return asyncio.run(runner())
+
+    def test_version_and_status(self):
+        """VERSION and GET_STATUS are routed to the right futures"""
+        async def scenario(client):
+            return await asyncio.gather(client.version(), client.get_status())
+
+        version, status = self.run_with_responder(scenario)
+        self.assertEqual(version, "1.19.1")
+        self.assertTrue(status.startswith("GET_STATUS PLAYING"))
+
+    def test_read_many_runs_concurrently(self):
+        """Ten 50 ms reads complete in roughly one reply time, not ten"""
+        ranges = [(0x7E0900 + i * 0x20, 0x20) for i in range(10)]
+
+        async def scenario(client):
+            start = time.monotonic()
+            results = await client.read_many(ranges)
+            return results, time.monotonic() - start
+
+        results, elapsed = self.run_with_responder(scenario, delay=0.05)
+        for (address, size), data in zip(ranges, results):
+            offset = address - 0x7E0000
+            self.assertEqual(data, WRAM[offset:offset + size])
+        self.assertLess(elapsed, 0.3)
+        print(f"✅ 10 concurrent reads in {elapsed * 1000:.0f} ms")
+
+    def test_unanswered_read_times_out_alone(self):
+        """A read with no reply returns None without holding up the others"""
+        async def scenario(client):
+            return await client.read_many([(0x7E0900, 2), (0x7E0A00, 2)])
+
+        results = self.run_with_responder(scenario, silent=[0x7E0A00])
+        self.assertEqual(results[0], WRAM[0x900:0x902])
+        self.assertIsNone(results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the NumPy batch snapshot decoder
+"""
+
+import unittest
+import sys
+import os
+import logging
+
+# Add server_python directory to path to import batch_decoder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from batch_decoder import np, decode_batch, evaluate_rules, game_state_at, mother_brain_pass, plan_layout, region_layout
+from boss_rules import BOSS_RULES, BOSS_WORDS, BossRuleEngine
+from game_state_parser import SuperMetroidGameStateParser
+from read_plan import ReadPlan, GAME_STATE_FIELDS
+from wram_mirror import WRAM_BASE
+
+
+def random_frames(layout, row_size, count, seed):
+    """Random snapshot rows, biased toward the values the detection logic cares about"""
+    rng = np.random.default_rng(seed)
+    frames = rng.integers(0, 256, size=(count, row_size), dtype=np.uint8)
+
+    def put(offset, values, size=2):
+        chosen = rng.choice(values, size=count)
+        frames[:, offset] = chosen & 0xFF
+        if size == 2:
+            frames[:, offset + 1] = chosen >> 8
+
+    put(layout['room_id'], [56664, 56867, 31224, 500, 26652, 37368])
+    put(layout['area_id'], [0, 1, 2, 5, 10], size=1)
+    stats = layout['basic_stats']
+    for i, values in enumerate([[99, 120, 450, 0, 700], [99, 1499], [0, 5, 135, 200], [0, 135, 230]]):
+        put(stats + 2 * i, values)
+    put(layout['boss_plus_1'], [0, 3, 0x0703, 0x0107, 0x0704])
+    put(layout['boss_plus_2'], [0, 0x100, 0x203])
+    put(layout['boss_hp_3'], [0, 0, 4000, 16000, 41000, 12000])
+    put(layout['boss_hp_1'], [0, 0, 100])
+    put(layout['beams'], [0x100F, 0x1006, 0])
+    return frames
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestBatchDecoder(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.INFO)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_matches_sequential_parser(self):
+        """Batch columns + MB pass give the same game state as polling row by row"""
+        plan = ReadPlan(GAME_STATE_FIELDS)
+        layout = plan_layout(plan)
+        frames = random_frames(layout, sum(block.size for block in plan.blocks), 600, seed=3)
+        columns = mother_brain_pass(decode_batch(frames, layout))
+
+        parser = SuperMetroidGameStateParser()
+        for i, row in enumerate(frames):
+            data, blocks = row.tobytes(), []
+            for block in plan.blocks:
+                blocks.append(data[:block.size])
+                data = data[block.size:]
+            expected = parser.parse_complete_game_state(plan.slice_blocks(blocks))
+            self.assertEqual(game_state_at(columns, i), expected, f"snapshot {i}")
+
+    def test_region_layout(self):
+        """Raw WRAM rows decode with offsets relative to the region base"""
+        frames = np.zeros((2, 0x20000), dtype=np.uint8)
+        frames[1, 0x09C2:0x09C4] = (0x2C, 0x01)   # health 300
+        frames[1, 0x079F] = 4                    # Maridia
+        columns = decode_batch(frames)
+        self.assertEqual(columns['health'].tolist(), [0, 300])
+        self.assertEqual(game_state_at(columns, 1)['area_name'], 'Maridia')
+
+        with self.assertRaises(ValueError):
+            decode_batch(np.zeros((1, 0x1000), dtype=np.uint8), region_layout(WRAM_BASE, 0x1000))
+        with self.assertRaises(ValueError):
+            decode_batch(np.zeros((1, 0x100), dtype=np.uint8))
+
+    def test_rules_match_engine(self):
+        rng = np.random.default_rng(11)
+        words = {name: rng.choice([0, 1, 3, 0x0107, 0x0203, 0x0301, 0x0603, 0x0703, 0xFFFF], size=300).astype(np.uint16)
+                 for name in BOSS_WORDS}
+        columns = evaluate_rules(BOSS_RULES, words)
+        engine = BossRuleEngine(BOSS_RULES)
+        for i in range(300):
+            expected = engine.evaluate(tuple(int(words[name][i]) for name in BOSS_WORDS))
+            self.assertEqual({name: bool(column[i]) for name, column in columns.items()}, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the item/beam bitfield decode tables
+"""
+
+import unittest
+import sys
+import os
+import copy
+import json
+import pickle
+import logging
+
+# Add server_python directory to path to import bitfield_tables
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from bitfield_tables import (BEAM_TABLE, HYPER_BEAMS, ITEM_TABLE, NO_BEAMS, NO_ITEMS, TABLE_SIZE,
+                             TRACKED_BEAM_TABLE, FrozenDict, decode_beams, decode_items)
+from game_state_parser import SuperMetroidGameStateParser
+from memory_layout import BEAM_BITS, ITEM_BITS
+
+
+class TestBitfieldTables(unittest.TestCase):
+
+    def test_tables_match_bit_tests(self):
+        """Every word decodes to the same mapping as testing each bit"""
+        for word in range(TABLE_SIZE):
+            self.assertEqual(ITEM_TABLE[word], {name: bool(word & bit) for name, bit in ITEM_BITS})
+            beams = {name: bool(word & bit) for name, bit in BEAM_BITS}
+            self.assertEqual(BEAM_TABLE[word], beams)
+            beams['hyper'] = False
+            self.assertEqual(list(TRACKED_BEAM_TABLE[word].items()), list(beams.items()))
+
+    def test_identical_tracked_bits_share_one_object(self):
+        self.assertIs(decode_items(0x1004), ITEM_TABLE[0x1004])
+        # 0x0010 and 0x0040 are not tracked item bits
+        self.assertIs(ITEM_TABLE[0x1004], ITEM_TABLE[0x1054])
+        self.assertIsNot(ITEM_TABLE[0x1004], ITEM_TABLE[0x1005])
+        self.assertEqual(len({id(mapping) for mapping in ITEM_TABLE}), 2 ** len(ITEM_BITS))
+        self.assertEqual(len({id(mapping) for mapping in BEAM_TABLE}), 2 ** len(BEAM_BITS))
+
+    def test_unread_words_decode_empty(self):
+        self.assertEqual(decode_items(None), {})
+        self.assertEqual(decode_beams(None), {})
+
+    def test_frozen_dict_is_immutable(self):
+        mapping = ITEM_TABLE[0xFFFF]
+        for mutate in (lambda: mapping.__setitem__('morph', False), lambda: mapping.pop('morph'),
+                       lambda: mapping.update(morph=False), mapping.clear, mapping.popitem,
+                       lambda: mapping.setdefault('x', True), lambda: mapping.__delitem__('morph')):
+            with self.assertRaises(TypeError):
+                mutate()
+        self.assertTrue(mapping['morph'])
+
+    def test_frozen_dict_behaves_as_dict(self):
+        mapping = TRACKED_BEAM_TABLE[0x100F]
+        self.assertIsInstance(mapping, dict)
+        self.assertEqual(json.loads(json.dumps(mapping)), dict(mapping))
+        self.assertIs(copy.deepcopy(mapping), mapping)
+        self.assertEqual(pickle.loads(pickle.dumps(mapping)), mapping)
+        self.assertEqual(hash(mapping), hash(FrozenDict(mapping)))
+        self.assertEqual(HYPER_BEAMS, {'charge': True, 'ice': True, 'wave': True, 'spazer': True,
+                                       'plasma': False, 'hyper': True})
+
+
+class TestParserUsesTables(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.parser = SuperMetroidGameStateParser()
+        self.location = {'area_id': 1, 'room_id': 0x9F11, 'missiles': 10, 'max_missiles': 10}
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_items_and_beams_are_shared_mappings(self):
+        items = self.parser.parse_items(b'\x04\x10', self.location, 300)
+        self.assertIs(items, ITEM_TABLE[0x1004])
+        self.assertIs(self.parser.parse_items(b'\x04\x10', self.location, 300), items)
+        self.assertIs(self.parser.parse_beams(b'\x01\x10', self.location, 300), TRACKED_BEAM_TABLE[0x1001])
+
+    def test_reset_returns_empty_mappings(self):
+        new_game = {'area_id': 0, 'room_id': 500, 'missiles': 0, 'max_missiles': 0}
+        self.assertIs(self.parser.parse_items(b'\xff\xff', new_game, 99), NO_ITEMS)
+        self.assertIs(self.parser.parse_beams(b'\xff\xff', new_game, 99), NO_BEAMS)
+
+    def test_hyper_beam_in_escape(self):
+        self.parser.mb_fsm.set_flags(True, True, 'test')
+        escape = {'area_id': 5, 'room_id': 56867, 'missiles': 50, 'max_missiles': 50}
+        self.assertIs(self.parser.parse_beams(b'\x0f\x10', escape, 500), HYPER_BEAMS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the table-driven boss detection rules
+"""
+
+import unittest
+import sys
+import os
+import json
+import random
+import tempfile
+from unittest import mock
+
+# Add server_python directory to path to import boss_rules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from boss_rules import BOSS_RULES, BOSS_WORDS, BossRuleEngine, compile_rules, load_rules
+
+
+def legacy_bosses(main, croc, p1, p2, p3, p4):
+    """The hand-written checks parse_bosses used before the rule table"""
+    bosses = {}
+    if main is not None:
+        bosses.update({'bomb_torizo': bool(main & 0x04), 'kraid': bool(main & 0x100),
+                       'spore_spawn': bool(main & 0x200), 'mother_brain': bool(main & 0x01)})
+    bosses['crocomire'] = bool(croc & 0x02) and (croc >= 0x0202)
+    bosses['phantoon'] = bool(p3 and (p3 & 0x01))
+    bosses['botwoon'] = bool(((p2 & 0x04) and (p2 > 0x0100)) or ((p4 & 0x02) and (p4 > 0x0001)))
+    bosses['draygon'] = (p3 == 0x0301)
+    ridley = False
+    if p2 & 0x0001:
+        if p2 >= 0x0100 and p2 not in [0x0203]:
+            ridley = True
+    elif p4 & 0x0001:
+        if p4 >= 0x0011 and p4 not in [0x0003, 0x0007]:
+            ridley = True
+    bosses['ridley'] = ridley
+    bosses['golden_torizo'] = bool(((p1 & 0x0700) and (p1 & 0x0003)) or ((p2 & 0x0100) and (p2 >= 0x0400))
+                                   or (p1 >= 0x0603) or (p3 & 0x0100))
+    return bosses
+
+
+class TestBossRules(unittest.TestCase):
+
+    def test_matches_legacy_checks(self):
+        """The compiled table agrees with the old hand-written checks"""
+        rng = random.Random(5)
+        interesting = [0, 1, 2, 3, 4, 7, 0x11, 0x0100, 0x0107, 0x0203, 0x0202, 0x0301, 0x0400, 0x0603, 0x0703, 0xFFFF]
+        engine = BossRuleEngine(BOSS_RULES)
+        for _ in range(5000):
+            values = [rng.choice(interesting) if rng.random() < 0.7 else rng.randrange(0x10000) for _ in range(6)]
+            main = None if rng.random() < 0.1 else values[0]
+            words = (main, values[1], values[2], values[3], values[4], values[5], 0)
+            self.assertEqual(engine.evaluate(words), legacy_bosses(main, *values[1:]), words)
+
+    def test_lru_and_fresh_results(self):
+        """Repeated word tuples hit the cache; callers get their own dict"""
+        engine = BossRuleEngine(BOSS_RULES, cache_size=2)
+        words = (0x0104, 0, 0, 0, 0x0301, 0, 0)
+        first = engine.evaluate(words)
+        first['mother_brain_1'] = True
+        second = engine.evaluate(words)
+        self.assertNotIn('mother_brain_1', second)
+        self.assertTrue(second['draygon'])
+        self.assertEqual(engine.stats()['cache_hits'], 1)
+        for i in range(5):
+            engine.evaluate((i,) + words[1:])
+        self.assertEqual(engine.stats()['cache_size'], 2)
+
+    def test_rules_from_json_file(self):
+        """A rules file replaces the built-in table; bad files fall back"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rules.json')
+            with open(path, 'w') as f:
+                json.dump([{"name": "ridley", "clauses": [[["boss_plus_2", "not_in", [0, 1]]]]}], f)
+            engine = BossRuleEngine(load_rules(path))
+            self.assertEqual(engine.evaluate((None, 0, 0, 5, 0, 0, 0)), {'ridley': True})
+            self.assertIs(load_rules(os.path.join(tmp, 'missing.json')), BOSS_RULES)
+
+        with self.assertRaises(ValueError):
+            compile_rules([BOSS_RULES[0]._replace(clauses=((('boss_plus_9', 'mask', 1),),))])
+        self.assertEqual(len(BOSS_WORDS), 7)
+
+    def test_rules_file_with_bad_terms_falls_back(self):
+        """Valid JSON with an unknown word or a list value for a scalar op uses the built-in table"""
+        bad_files = (
+            [{"name": "x", "clauses": [[["boss_plus_9", "mask", 1]]]}],
+            [{"name": "x", "clauses": [[["boss_plus_1", "bogus", 1]]]}],
+            [{"name": "x", "clauses": [[["boss_plus_1", "mask", [1, 2]]]]}],
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rules.json')
+            for entries in bad_files:
+                with open(path, 'w') as f:
+                    json.dump(entries, f)
+                with self.assertLogs('boss_rules', level='ERROR'):
+                    self.assertIs(load_rules(path), BOSS_RULES)
+            with mock.patch.dict(os.environ, {'BOSS_RULES_FILE': path}), self.assertLogs('boss_rules', level='ERROR'):
+                self.assertEqual(BossRuleEngine().rules, BOSS_RULES)
+
+
+if __name__ == '__main__':
+    unittest.main()
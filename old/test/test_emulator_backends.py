@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Tests for the pluggable emulator backends
+File/replay backends run on temp files; QUsb2Snes and Mesen run against local fakes
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Add server_python directory to path to import the backends
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from emulator_backend import create_backend, parse_backend_config
+from file_backends import WramFileBackend, MmapWramBackend, ReplayBackend, SessionRecorder
+from mesen_backend import MesenHTTPBackend
+from qusb2snes_backend import QUsb2SnesBackend, snes_to_usb2snes, pack_get_address
+from read_plan import ReadPlan, GAME_STATE_FIELDS
+from game_state_parser import SuperMetroidGameStateParser
+
+
+WRAM = bytes((i * 17 + 1) & 0xFF for i in range(0x20000))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeQUsb2SnesSocket:
+    """Speaks just enough usb2snes: DeviceList / Attach / Info / GetAddress"""
+
+    def __init__(self, url, timeout=None, devices=("RetroArch Localhost",)):
+        self.sent = []
+        self.replies = []
+        self.devices = list(devices)
+        self.rom = "Super Metroid"
+        self.broken = False
+
+    def send(self, message):
+        command = json.loads(message)
+        self.sent.append(command)
+        opcode = command["Opcode"]
+        if self.broken:
+            raise ConnectionResetError("bridge went away")
+        if opcode == "DeviceList":
+            self.replies.append(json.dumps({"Results": self.devices}))
+        elif opcode == "Info":
+            self.replies.append(json.dumps({"Results": ["1.10.0", "RetroArch", self.rom, "NO_FILE_CMD"]}))
+        elif opcode == "GetAddress":
+            operands = [int(operand, 16) for operand in command["Operands"]]
+            data = b''.join(WRAM[address - 0xF50000:address - 0xF50000 + size]
+                            for address, size in zip(operands[::2], operands[1::2]))
+            # Replies may be split across binary frames at arbitrary points
+            self.replies.extend([data[:7], data[7:300], data[300:]])
+
+    def recv(self):
+        return self.replies.pop(0)
+
+    def close(self):
+        pass
+
+
+class FakeMesenHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.requests.append(url.path)
+        if url.path == '/api/state':
+            body = {'running': True}
+        elif url.path == '/api/game':
+            body = {'name': 'Super Metroid'}
+        elif url.path == '/api/memory/read':
+            params = parse_qs(url.query)
+            offset = int(params['address'][0], 16) - 0x7E0000
+            body = {'bytes': list(WRAM[offset:offset + int(params['length'][0])])}
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TestBackendConfig(unittest.TestCase):
+
+    def test_cli_overrides_env_overrides_defaults(self):
+        """Precedence matches the TypeScript server: CLI > env > defaults"""
+        config = parse_backend_config(['--backend=mesen', '--mesen-port=9000'],
+                                      {'EMULATOR_BACKEND': 'qusb2snes', 'MESEN_HOST': 'emu', 'MESEN_HTTP_PORT': '1'})
+        self.assertEqual(config['type'], 'mesen')
+        self.assertEqual(config['mesen'], {'host': 'emu', 'http_port': 9000})
+        self.assertEqual(parse_backend_config([], {})['type'], 'retroarch')
+
+    def test_factory_builds_each_backend(self):
+        """Every backend type is constructible without touching the network"""
+        self.assertEqual(create_backend({'type': 'mesen'}).backend_type, 'mesen')
+        self.assertEqual(create_backend({'type': 'qusb2snes'}).backend_type, 'qusb2snes')
+        self.assertEqual(create_backend({'type': 'file', 'file': {'path': 'x.bin'}}).backend_type, 'file')
+        self.assertEqual(create_backend({'type': 'mmap'}).backend_type, 'mmap')
+        self.assertEqual(create_backend({'type': 'replay'}).backend_type, 'replay')
+        self.assertEqual(create_backend({'type': 'nonsense'}).backend_type, 'retroarch')
+
+
+class TestFileBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dump = os.path.join(self.tmp.name, 'wram.bin')
+        with open(self.dump, 'wb') as f:
+            f.write(WRAM)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_wram_file_reads_and_read_plan(self):
+        """File backend serves ranges and satisfies the reader interface"""
+        backend = WramFileBackend(self.dump)
+        self.assertTrue(backend.connect())
+        self.assertEqual(backend.read_ranges([(0x7E09A2, 4), (0x7FFFFE, 2)]), [WRAM[0x9A2:0x9A6], WRAM[-2:]])
+        self.assertEqual(backend.read_memory_range(0x7FFFFF, 2), None)
+        memory_data = ReadPlan(GAME_STATE_FIELDS).execute(backend)
+        self.assertEqual(memory_data['items'], WRAM[0x9A4:0x9A6])
+        self.assertTrue(backend.connection_info()['game_loaded'])
+
+    def test_wram_file_reloads_on_change(self):
+        """A rewritten dump is picked up on the next read"""
+        backend = WramFileBackend(self.dump)
+        backend.connect()
+        with open(self.dump, 'wb') as f:
+            f.write(bytes(0x20000))
+        os.utime(self.dump, ns=(1, 1))
+        self.assertEqual(backend.read_memory_range(0x7E09A2, 2), b'\x00\x00')
+
+    def test_mmap_reads_are_views(self):
+        """mmap backend hands out memoryview slices the parser accepts as-is"""
+        backend = MmapWramBackend(self.dump)
+        self.assertTrue(backend.connect())
+        items, outside = backend.read_ranges([(0x7E09A4, 2), (0x7FFFFF, 2)])
+        self.assertIsInstance(items, memoryview)
+        self.assertEqual(items, WRAM[0x9A4:0x9A6])
+        self.assertIsNone(outside)
+
+        memory_data = ReadPlan(GAME_STATE_FIELDS).execute(backend)
+        expected = ReadPlan(GAME_STATE_FIELDS).execute(WramFileBackend(self.dump))
+        parser = SuperMetroidGameStateParser()
+        self.assertEqual(parser.parse_complete_game_state(memory_data)['health'],
+                         SuperMetroidGameStateParser().parse_complete_game_state(expected)['health'])
+        del items, outside, memory_data
+        backend.close()
+
+    def test_mmap_sees_in_place_writes_and_replacement(self):
+        """In-place writes show up live; a replaced file is re-mapped"""
+        backend = MmapWramBackend(self.dump)
+        backend.connect()
+        with open(self.dump, 'r+b') as f:
+            f.seek(0x9C2)
+            f.write(b'\x63\x00')
+        self.assertEqual(backend.read_memory_range(0x7E09C2, 2), b'\x63\x00')
+        self.assertEqual(backend.remaps, 1)
+
+        replacement = os.path.join(self.tmp.name, 'wram.new')
+        with open(replacement, 'wb') as f:
+            f.write(bytes(0x20000))
+        os.replace(replacement, self.dump)
+        self.assertEqual(backend.read_memory_range(0x7E09C2, 2), b'\x00\x00')
+        self.assertEqual(backend.remaps, 2)
+
+        os.remove(self.dump)
+        self.assertEqual(backend.read_ranges([(0x7E09C2, 2)]), [None])
+        self.assertFalse(backend.health()['connected'])
+
+    def test_record_and_replay(self):
+        """Recorded reads replay at the recorded times"""
+        session = os.path.join(self.tmp.name, 'session.jsonl')
+        live_image = bytearray(WRAM)
+        with open(self.dump, 'wb') as f:
+            f.write(live_image)
+
+        clock = FakeClock()
+        recorder = SessionRecorder(WramFileBackend(self.dump), session, clock=clock)
+        self.assertTrue(recorder.connect())
+        recorder.read_ranges([(0x7E09C2, 2)])
+        clock.now = 2.0
+        live_image[0x9C2:0x9C4] = b'\x05\x00'
+        with open(self.dump, 'wb') as f:
+            f.write(live_image)
+        os.utime(self.dump, ns=(2, 2))
+        recorder.read_ranges([(0x7E09C2, 2)])
+        recorder.close()
+
+        replay_clock = FakeClock()
+        replay = ReplayBackend(session, loop=False, clock=replay_clock)
+        self.assertTrue(replay.connect())
+        self.assertEqual(replay.identity()['emulator'], 'Replay of file')
+        self.assertEqual(replay.read_memory_range(0x7E09C2, 2), WRAM[0x9C2:0x9C4])
+        replay_clock.now = 1.0
+        self.assertEqual(replay.read_memory_range(0x7E09C2, 2), WRAM[0x9C2:0x9C4])
+        replay_clock.now = 2.5
+        self.assertEqual(replay.read_memory_range(0x7E09C2, 2), b'\x05\x00')
+
+
+class TestNetworkBackends(unittest.TestCase):
+
+    def test_address_translation(self):
+        """WRAM maps to the usb2snes 0xF50000 space"""
+        self.assertEqual(snes_to_usb2snes(0x7E0000), 0xF50000)
+        self.assertEqual(snes_to_usb2snes(0x7FFFFF), 0xF6FFFF)
+        with self.assertRaises(ValueError):
+            snes_to_usb2snes(0x808000)
+
+    def test_pack_get_address(self):
+        """Ranges become translated hex pairs, split at 255 bytes, 8 pairs per request"""
+        self.assertEqual(pack_get_address([(0x7E09A2, 4), (0x7ED800, 0x120)]),
+                         [["F509A2", "4", "F5D800", "FF", "F5D8FF", "21"]])
+        requests = pack_get_address([(0x7E0000 + i * 0x10, 2) for i in range(10)])
+        self.assertEqual([len(operands) // 2 for operands in requests], [8, 2])
+
+    def test_qusb2snes_reads(self):
+        """A poll is sent as one multi-operand GetAddress and sliced from split frames"""
+        sockets = []
+
+        def factory(url, timeout=None):
+            sockets.append(FakeQUsb2SnesSocket(url, timeout))
+            return sockets[-1]
+
+        backend = QUsb2SnesBackend(connection_factory=factory)
+        self.assertTrue(backend.connect())
+        self.assertEqual(backend.identity()['game'], 'Super Metroid')
+        self.assertTrue(backend.health()['game_loaded'])
+
+        ranges = [(0x7E09A2, 4), (0x7ED828, 8), (0x7E0900, 0x200), (0x808000, 2)]
+        results = backend.read_ranges(ranges)
+        self.assertEqual(results, [WRAM[0x9A2:0x9A6], WRAM[0xD828:0xD830], WRAM[0x900:0xB00], None])
+        get_address = [c for c in sockets[0].sent if c["Opcode"] == "GetAddress"]
+        self.assertEqual(len(get_address), 1)
+        self.assertEqual(get_address[0]["Operands"][:2], ["F509A2", "4"])
+
+    def test_qusb2snes_reconnects_and_reattaches(self):
+        """A dropped bridge fails the poll, then the next poll reconnects to the same device"""
+        sockets = []
+
+        def factory(url, timeout=None):
+            sockets.append(FakeQUsb2SnesSocket(url, timeout, devices=["SD2SNES COM3", "RetroArch Localhost"]))
+            return sockets[-1]
+
+        backend = QUsb2SnesBackend(device="RetroArch Localhost", connection_factory=factory, reconnect_delay=0.0)
+        self.assertTrue(backend.connect())
+        sockets[0].broken = True
+        self.assertEqual(backend.read_ranges([(0x7E09A2, 2)]), [None])
+        self.assertIsNone(backend.ws)
+
+        self.assertEqual(backend.read_ranges([(0x7E09A2, 2)]), [WRAM[0x9A2:0x9A4]])
+        self.assertEqual(len(sockets), 2)
+        self.assertEqual(backend.attached_device, "RetroArch Localhost")
+        self.assertEqual(backend.reconnects, 1)
+
+    def test_qusb2snes_refreshes_device_info(self):
+        """Device Info is re-queried after info_ttl, so a ROM change while attached is seen"""
+        sockets = []
+
+        def factory(url, timeout=None):
+            sockets.append(FakeQUsb2SnesSocket(url, timeout))
+            return sockets[-1]
+
+        clock = FakeClock()
+        backend = QUsb2SnesBackend(connection_factory=factory, info_ttl=5.0, clock=clock)
+        self.assertTrue(backend.connect())
+        sockets[0].rom = "No Info"
+        clock.now = 4.0
+        self.assertTrue(backend.health()['game_loaded'])
+        info_requests = [c for c in sockets[0].sent if c["Opcode"] == "Info"]
+        self.assertEqual(len(info_requests), 1)
+
+        clock.now = 5.0
+        self.assertFalse(backend.health()['game_loaded'])
+        sockets[0].rom = "Super Metroid Map Rando"
+        backend.invalidate_info("test")
+        self.assertEqual(backend.connection_info()['game_info'], "Super Metroid Map Rando")
+        self.assertEqual(backend.rom_changes, 2)
+        self.assertEqual(len(sockets), 1)
+
+    def test_mesen_reads(self):
+        """Mesen backend reads ranges over one keep-alive connection"""
+        server = HTTPServer(('127.0.0.1', 0), FakeMesenHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            backend = MesenHTTPBackend('127.0.0.1', server.server_address[1])
+            self.assertTrue(backend.connect())
+            self.assertEqual(backend.read_ranges([(0x7E09A2, 4), (0x7E0AF6, 2)]), [WRAM[0x9A2:0x9A6], WRAM[0xAF6:0xAF8]])
+            self.assertEqual(backend.connection_info(),
+                             {'connected': True, 'retroarch_version': 'Mesen (HTTP API)',
+                              'game_info': 'Super Metroid', 'game_loaded': True})
+            backend.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_mesen_probe_is_cached(self):
+        """Steady-state polls make no probe requests until the TTL expires or reads fail"""
+        server = HTTPServer(('127.0.0.1', 0), FakeMesenHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        FakeMesenHandler.requests = requests = []
+        try:
+            clock = FakeClock()
+            backend = MesenHTTPBackend('127.0.0.1', server.server_address[1], info_ttl=5.0, clock=clock)
+            self.assertTrue(backend.connection_info()['game_loaded'])
+            self.assertEqual(requests, ['/api/state', '/api/game'])
+            clock.now = 4.0
+            backend.connection_info()
+            backend.health()
+            self.assertEqual(len(requests), 2)
+
+            clock.now = 5.0
+            backend.connection_info()
+            self.assertEqual(len(requests), 4)
+            backend.invalidate_info("test")
+            backend.connection_info()
+            self.assertEqual(len(requests), 6)
+            self.assertEqual(backend.info_cache_hits, 2)
+            backend.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
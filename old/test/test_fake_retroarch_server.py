@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the fake RetroArch UDP server and the clients that run against it
+"""
+
+import unittest
+import sys
+import os
+
+# Add server_python directory to path to import fake_retroarch_server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from fake_retroarch_server import FakeRetroArchServer, FaultProfile, WramImageSource
+from retroarch_backend import RetroArchUDPBackend
+from read_plan import ReadPlan, GAME_STATE_FIELDS
+
+
+WRAM = bytes((i * 29 + 11) & 0xFF for i in range(0x20000))
+
+
+class TestFakeRetroArchServer(unittest.TestCase):
+
+    def make_backend(self, server):
+        backend = RetroArchUDPBackend('127.0.0.1', server.port)
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_replies(self):
+        """Replies follow RetroArch's network command format"""
+        server = FakeRetroArchServer(WramImageSource(WRAM))
+        self.addCleanup(server.sock.close)
+        self.assertEqual(server.reply_for("VERSION"), "1.19.1")
+        self.assertTrue(server.reply_for("GET_STATUS").startswith("GET_STATUS PLAYING"))
+        self.assertEqual(server.reply_for("READ_CORE_MEMORY 0x7E09A2 2"), f"READ_CORE_MEMORY 7e09a2 {WRAM[0x9A2]:02x} {WRAM[0x9A3]:02x}")
+        self.assertEqual(server.reply_for("READ_CORE_MEMORY 0x7FFFFF 2"), "READ_CORE_MEMORY 7fffff -1 no memory map defined")
+        self.assertIsNone(server.reply_for("QUIT"))
+
+    def test_backend_against_clean_server(self):
+        """Connection probe and a full read plan work end to end"""
+        with FakeRetroArchServer(WramImageSource(WRAM)) as server:
+            backend = self.make_backend(server)
+            info = backend.get_retroarch_info()
+            self.assertTrue(info['connected'])
+            self.assertTrue(info['game_loaded'])
+
+            memory_data = ReadPlan(GAME_STATE_FIELDS).execute(backend)
+            self.assertEqual(memory_data['basic_stats'], WRAM[0x9C2:0x9C2 + 22])
+            self.assertEqual(memory_data['main_bosses'], WRAM[0xD828:0xD82A])
+
+    def test_backend_survives_impairments(self):
+        """Loss is retried, duplicates and reordered replies are matched by address"""
+        faults = FaultProfile(latency=0.001, jitter=0.002, loss=0.15, duplicate=0.2, reorder=0.3, seed=7)
+        with FakeRetroArchServer(WramImageSource(WRAM), faults=faults) as server:
+            backend = self.make_backend(server)
+            backend.engine.max_retries = 5
+            plan = ReadPlan(GAME_STATE_FIELDS)
+            for _ in range(10):
+                memory_data = plan.execute(backend)
+                self.assertEqual(memory_data['items'], WRAM[0x9A4:0x9A6])
+                self.assertEqual(memory_data['boss_hp_1'], WRAM[0xF8C:0xF8E])
+            self.assertGreater(server.stats['dropped'], 0)
+            self.assertGreater(server.stats['duplicated'], 0)
+            print(f"✅ 10 polls through impaired link: {server.stats}")
+
+    def test_large_reads_are_chunked(self):
+        """A 4 KiB read comes back whole from chunked replies"""
+        with FakeRetroArchServer(WramImageSource(WRAM)) as server:
+            backend = self.make_backend(server)
+            self.assertEqual(backend.read_memory_range(0x7ED000, 0x1000), WRAM[0xD000:0xE000])
+
+
+if __name__ == '__main__':
+    unittest.main()
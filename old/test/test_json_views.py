@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-serialized JSON views and ETag/304 handling
+"""
+
+import unittest
+import sys
+import os
+import json
+import logging
+import threading
+import http.client
+
+# Add server_python directory to path to import json_views
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+# ...and this directory for the shared memory fixtures
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from json_views import ViewStore, etag_matches
+from game_state_parser import SuperMetroidGameStateParser
+from pooled_http_server import PooledHTTPServer
+from background_poller_server import BackgroundGamePoller, CacheServingHTTPHandler
+from memory_fixtures import make_memory as make_raw_memory
+
+
+def make_memory(**kwargs):
+    return make_raw_memory(bosses=0, **kwargs)
+
+
+class TestViewStore(unittest.TestCase):
+
+    def test_unchanged_body_keeps_version(self):
+        store = ViewStore()
+        first = store.publish('stats', {'health': 300})
+        self.assertIs(store.publish('stats', {'health': 300}), first)
+        second = store.publish('stats', {'health': 299})
+        self.assertNotEqual(second.etag, first.etag)
+        self.assertGreater(second.version, first.version)
+        self.assertIs(store.get('stats'), second)
+        self.assertEqual(json.loads(second.body), {'health': 299})
+        self.assertEqual(store.stats()['unchanged'], 1)
+
+    def test_version_key_keeps_etag_but_serves_current_body(self):
+        store = ViewStore()
+        first = store.publish('status', {'health': 300, 'poll_count': 1}, version_key={'health': 300})
+        second = store.publish('status', {'health': 300, 'poll_count': 2}, version_key={'health': 300})
+        self.assertEqual((second.etag, second.version), (first.etag, first.version))
+        self.assertTrue(second.etag.startswith('W/'))
+        self.assertEqual(json.loads(store.get('status').body)['poll_count'], 2)
+        third = store.publish('status', {'health': 250, 'poll_count': 3}, version_key={'health': 250})
+        self.assertNotEqual(third.etag, first.etag)
+        self.assertTrue(etag_matches(third.etag, third.etag))
+
+    def test_bodies_are_compact(self):
+        view = ViewStore().publish('stats', {'a': 1, 'b': [1, 2]})
+        self.assertEqual(view.body, b'{"a":1,"b":[1,2]}')
+
+    def test_etags_differ_between_stores(self):
+        """A restarted server never matches an ETag from the previous run"""
+        first, second = ViewStore(), ViewStore()
+        second.epoch = first.epoch + '0'
+        self.assertNotEqual(first.publish('stats', {}).etag, second.publish('stats', {}).etag)
+
+    def test_etag_matches(self):
+        etag = '"abc-3"'
+        self.assertTrue(etag_matches('"abc-3"', etag))
+        self.assertTrue(etag_matches('"abc-1", W/"abc-3"', etag))
+        self.assertTrue(etag_matches('*', etag))
+        self.assertFalse(etag_matches('"abc-2"', etag))
+        self.assertFalse(etag_matches(None, etag))
+        self.assertFalse(etag_matches('', etag))
+
+
+class TestConditionalRequests(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.poller = BackgroundGamePoller()
+        self.parser = SuperMetroidGameStateParser()
+
+        def handler_factory(*args, **kwargs):
+            return CacheServingHTTPHandler(*args, poller=self.poller, **kwargs)
+
+        self.server = PooledHTTPServer(('localhost', 0), handler_factory)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.conn = http.client.HTTPConnection('localhost', self.server.server_address[1], timeout=5)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.poller.backend.close()
+        logging.disable(logging.NOTSET)
+
+    def poll(self, **memory):
+        """What one _poll_loop iteration does with a valid read"""
+        with self.poller.cache_lock:
+            self.poller._store_snapshot(self.parser.parse_complete_game_state(make_memory(**memory)), 0.0)
+            self.poller.cache['poll_count'] += 1
+        self.poller._publish_views()
+
+    def get(self, path, etag=None):
+        self.conn.request('GET', path, headers={'If-None-Match': etag} if etag else {})
+        response = self.conn.getresponse()
+        return response.status, response.getheader('ETag'), response.read()
+
+    def test_stats_not_modified_until_game_state_changes(self):
+        status, etag, body = self.get('/api/stats')
+        self.assertEqual((status, json.loads(body)), (200, {'error': 'No game data available'}))
+
+        self.poll()
+        status, etag, body = self.get('/api/stats', etag)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['health'], 300)
+
+        self.poll()
+        self.assertEqual(self.get('/api/stats', etag), (304, etag, b''))
+
+        self.poll(health=250)
+        status, new_etag, body = self.get('/api/stats', etag)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(json.loads(body)['health'], 250)
+
+    def test_status_views_match_cached_state(self):
+        self.poll()
+        status, etag, body = self.get('/api/status')
+        self.assertEqual(json.loads(body), self.poller.get_cached_state())
+        self.assertEqual(self.get('/game_state', etag)[0], 304)
+
+    def test_status_not_modified_across_unchanged_polls(self):
+        """Per-poll counters stay in the body but don't change the status ETag"""
+        self.poll()
+        status, etag, body = self.get('/api/status')
+        self.assertEqual(status, 200)
+        self.assertTrue(etag.startswith('W/'))
+        self.poll()
+        self.poll()
+        self.assertEqual(self.get('/api/status', etag), (304, etag, b''))
+        status, same_etag, body = self.get('/api/status')
+        self.assertEqual((status, same_etag, json.loads(body)['poll_count']), (200, etag, 3))
+        self.assertEqual(json.loads(self.get('/api/poll-stats')[2])['poll_count'], 3)
+
+        self.poll(health=250)
+        status, new_etag, body = self.get('/api/status', etag)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(json.loads(body)['stats']['health'], 250)
+        self.assertEqual(json.loads(body)['poll_count'], 4)
+
+if __name__ == '__main__':
+    unittest.main()
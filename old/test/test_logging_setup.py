@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the queue-based logging pipeline
+"""
+
+import unittest
+import sys
+import os
+import logging
+import queue
+import tempfile
+import threading
+
+# Add server_python directory to path to import logging_setup
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from logging_setup import DrainingQueueListener, DroppingQueueHandler, logging_stats, setup_logging, shutdown_logging
+
+
+class BlockedHandler(logging.Handler):
+    """Stands in for a stalled disk or terminal"""
+
+    def __init__(self):
+        super().__init__()
+        self.unblock = threading.Event()
+
+    def emit(self, record):
+        self.unblock.wait(5)
+
+
+class TestLoggingPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root_handlers = logging.getLogger().handlers[:]
+        self.root_level = logging.getLogger().level
+
+    def tearDown(self):
+        shutdown_logging()
+        root = logging.getLogger()
+        for handler in self.root_handlers:
+            root.addHandler(handler)
+        root.setLevel(self.root_level)
+        self.tmp.cleanup()
+
+    def test_records_reach_rotating_file(self):
+        """Records go through the queue to a size-rotated file"""
+        log_file = os.path.join(self.tmp.name, 'poller.log')
+        pipeline = setup_logging(log_file, max_bytes=2000, backup_count=2, console=False)
+        log = logging.getLogger('test_logging_setup')
+        for i in range(100):
+            log.info("poll %d finished with a reasonably long message", i)
+        shutdown_logging()
+
+        self.assertFalse(pipeline.running)
+        self.assertTrue(os.path.exists(log_file + '.1'))
+        self.assertFalse(os.path.exists(log_file + '.3'))
+        with open(log_file) as f:
+            self.assertIn("poll 99 finished", f.read())
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """A stalled listener never blocks the logging thread; overflow is counted"""
+        log_queue = queue.Queue(maxsize=3)
+        handler = DroppingQueueHandler(log_queue)
+        blocked = BlockedHandler()
+        listener = DrainingQueueListener(log_queue, blocked)
+        listener.start()
+        try:
+            log = logging.getLogger('test_logging_setup.blocked')
+            log.propagate = False
+            log.addHandler(handler)
+            for i in range(20):
+                log.warning("record %d", i)
+            self.assertGreaterEqual(handler.dropped, 20 - 3 - 1)
+        finally:
+            blocked.unblock.set()
+            listener.stop()
+            log.removeHandler(handler)
+
+    def test_stats(self):
+        """Stats are empty before setup and report the queue afterwards"""
+        self.assertEqual(logging_stats(), {})
+        setup_logging(None, console=False, queue_size=50)
+        stats = logging_stats()
+        self.assertEqual(stats['queue_size'], 50)
+        self.assertEqual(stats['dropped'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the declarative memory layout and its compiled block unpackers
+"""
+
+import unittest
+import sys
+import os
+import struct
+
+# Add server_python directory to path to import memory_layout
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from memory_layout import (BlockLayout, LayoutField, STATS_BLOCK, TRACKER_ALIASES, MEMORY_LAYOUT,
+                           memory_map)
+from game_state_parser import SuperMetroidGameStateParser
+
+
+class TestMemoryLayout(unittest.TestCase):
+
+    def test_stats_block_matches_field_by_field_decode(self):
+        """One unpack_from gives what the old per-field struct.unpack calls gave"""
+        data = struct.pack('<11H', 99, 299, 5, 10, 2, 5, 1, 5, 0xBEEF, 100, 75)
+        stats = STATS_BLOCK.unpack(data)
+        self.assertEqual(STATS_BLOCK.size, 22)
+        self.assertEqual(list(stats), ['health', 'max_health', 'missiles', 'max_missiles', 'supers',
+                                       'max_supers', 'power_bombs', 'max_power_bombs',
+                                       'max_reserve_energy', 'reserve_energy'])
+        self.assertEqual(stats['health'], 99)
+        self.assertEqual(stats['max_power_bombs'], 5)
+        self.assertEqual(stats['max_reserve_energy'], 100)
+        self.assertEqual(stats['reserve_energy'], 75)
+        self.assertEqual(STATS_BLOCK.unpack(memoryview(data + b'extra')), stats)
+
+    def test_block_layout_gaps_and_overlaps(self):
+        """Gaps become pad bytes; overlapping fields are rejected"""
+        block = BlockLayout('test', 0x7E0000, [LayoutField('b', 0x7E0003, 'B'), LayoutField('a', 0x7E0000)], size=6)
+        self.assertEqual(block.size, 6)
+        self.assertEqual(block.unpack(b'\x34\x12\xff\x07\xff\xff'), {'a': 0x1234, 'b': 7})
+        with self.assertRaises(ValueError):
+            BlockLayout('bad', 0x7E0000, [LayoutField('a', 0x7E0000), LayoutField('b', 0x7E0001)])
+
+    def test_memory_maps_share_one_table(self):
+        """Parser and tracker memory maps are views of the same layout"""
+        parser_map = SuperMetroidGameStateParser().memory_map
+        tracker_map = memory_map(aliases=TRACKER_ALIASES)
+        self.assertEqual(len(parser_map), len(MEMORY_LAYOUT))
+        self.assertEqual(parser_map['items'], tracker_map['items_collected'])
+        self.assertEqual(parser_map['bosses'], tracker_map['bosses_defeated'])
+        self.assertEqual(tracker_map['reserve_energy'], 0x7E09D6)
+        self.assertNotIn('items', tracker_map)
+
+
+if __name__ == '__main__':
+    unittest.main()
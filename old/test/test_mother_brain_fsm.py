@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the Mother Brain phase state machine
+"""
+
+import unittest
+import sys
+import os
+import struct
+
+# Add server_python directory to path to import mother_brain_fsm
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from mother_brain_fsm import (ESCAPE, MB1, MB2_ACTIVE, MB2_DONE, PRE_FIGHT, SHIP, MBInputs, MBSnapshot,
+                              MotherBrainFSM, mb_inputs, reset_reason, transition)
+from game_state_parser import SuperMetroidGameStateParser
+
+MB_ROOM = dict(area_id=5, room_id=56664, missiles=40, max_missiles=135, health=300, max_health=999)
+
+
+class TestMotherBrainFSM(unittest.TestCase):
+    """Phase transitions, history and snapshot/restore"""
+
+    def test_fight_progression(self):
+        """pre_fight → mb1 → mb2_active → mb2_done → escape → ship"""
+        fsm = MotherBrainFSM()
+        fsm.step(MBInputs(area_id=5, room_id=1000))
+        self.assertEqual(fsm.phase, PRE_FIGHT)
+        fsm.step(MBInputs(boss_hp_3=45000, **MB_ROOM))
+        self.assertEqual(fsm.phase, MB1)
+
+        result = fsm.step(MBInputs(official_hp=18000, boss_hp_3=45000, **MB_ROOM))
+        self.assertEqual((fsm.phase, result.mb1, result.mb2, result.method),
+                         (MB2_ACTIVE, True, False, 'official_transitions'))
+
+        fsm.step(MBInputs(official_hp=0, boss_hp_3=45000, **MB_ROOM))
+        result = fsm.step(MBInputs(official_hp=36000, **MB_ROOM))
+        self.assertEqual(fsm.phase, MB2_DONE)
+        self.assertTrue(result.mb2)
+
+        fsm.step(MBInputs(area_id=5, room_id=56867, escape_timer=True, escape_timer_primary=True))
+        self.assertEqual(fsm.phase, ESCAPE)
+        fsm.step(MBInputs(area_id=0, room_id=31224), ship=True)
+        self.assertEqual(fsm.phase, SHIP)
+        self.assertEqual((fsm.mb1_detected, fsm.mb2_detected), (True, True))
+
+        phases = [t.target for t in fsm.history]
+        self.assertEqual(phases, [MB1, MB2_ACTIVE, MB2_DONE, ESCAPE, SHIP])
+
+    def test_history_only_on_phase_change(self):
+        fsm = MotherBrainFSM(history_size=3)
+        for _ in range(10):
+            fsm.step(MBInputs())
+        self.assertEqual(len(fsm.history), 0)
+        for _ in range(5):
+            fsm.step(MBInputs(**MB_ROOM, boss_hp_3=45000))
+            fsm.step(MBInputs())
+        self.assertEqual(len(fsm.history), 3)
+        self.assertEqual(fsm.to_dict(history=1)['history'][0]['target'], PRE_FIGHT)
+
+    def test_save_state_reload_in_mb_room(self):
+        """Near-full missiles and health in the MB room drop back to the MB1 fight"""
+        state = MBSnapshot(MB2_DONE, 0)
+        reload_inputs = MBInputs(area_id=5, room_id=56664, missiles=130, max_missiles=135,
+                                 health=950, max_health=999, boss_hp_3=45000)
+        result = transition(state, reload_inputs)
+        self.assertEqual(result.state.phase, MB1)
+        self.assertFalse(result.mb1 or result.mb2)
+
+    def test_golden_torizo_signature_keeps_state(self):
+        """0x0703 outside the MB room hides MB for the poll but keeps the phase"""
+        result = transition(MBSnapshot(MB2_ACTIVE, 0), MBInputs(area_id=2, room_id=1000, boss_plus_1=0x0703))
+        self.assertEqual(result.state.phase, MB2_ACTIVE)
+        self.assertEqual((result.mb1, result.mb2), (False, False))
+
+    def test_snapshot_restore_replays_identically(self):
+        inputs = [MBInputs(boss_hp_3=45000, **MB_ROOM), MBInputs(official_hp=18000, **MB_ROOM),
+                  MBInputs(boss_hp_3=3000, **MB_ROOM), MBInputs(area_id=5, room_id=56867),
+                  MBInputs(area_id=0, room_id=100)]
+        fsm = MotherBrainFSM()
+        fsm.step(inputs[0])
+        saved = fsm.snapshot()
+        first = [fsm.step(x) for x in inputs[1:]]
+
+        replay = MotherBrainFSM()
+        replay.restore(saved._asdict())
+        self.assertEqual([replay.step(x) for x in inputs[1:]], first)
+        self.assertEqual(replay.snapshot(), fsm.snapshot())
+
+        with self.assertRaises(ValueError):
+            replay.restore({'phase': 'kraid', 'previous_hp': 0})
+
+    def test_reset_reason(self):
+        self.assertEqual(reset_reason(MBInputs(area_id=0, room_id=31224, health=99), True, False), 'new game')
+        # Never reset while MB2 is done and the game is probably being finished
+        self.assertIsNone(reset_reason(MBInputs(area_id=0, room_id=31224, health=99), True, True))
+        self.assertIsNone(reset_reason(MBInputs(area_id=2, room_id=40000, health=500), True, False))
+
+    def test_inputs_from_memory(self):
+        word = lambda value: struct.pack('<H', value)
+        scan = bytes(10) + word(250) + bytes(20)
+        x = mb_inputs({'boss_hp_3': word(1234), 'scan_094x': scan, 'boss_plus_1': word(3)},
+                      {'area_id': 5, 'room_id': 56664, 'beams': {'hyper': True}, 'missiles': 7})
+        self.assertEqual((x.boss_hp_3, x.boss_plus_1, x.missiles), (1234, 3, 7))
+        self.assertTrue(x.escape_timer and x.hyper_beam and x.in_mb_room)
+        self.assertFalse(x.escape_timer_primary)
+
+    def test_parser_uses_fsm(self):
+        """parse_bosses reports the FSM flags and the legacy view follows it"""
+        parser = SuperMetroidGameStateParser()
+        location = dict(MB_ROOM, beams={})
+        memory = {'main_bosses': struct.pack('<H', 0), 'mother_brain_official_hp': struct.pack('<H', 18000),
+                  'boss_hp_3': struct.pack('<H', 45000)}
+        bosses = parser.parse_bosses(memory, location)
+        self.assertTrue(bosses['mother_brain_1'])
+        self.assertEqual(parser.mb_fsm.phase, MB2_ACTIVE)
+        self.assertEqual(parser.mother_brain_phase_state, {'mb1_detected': True, 'mb2_detected': False})
+        parser.reset_mb_cache()
+        self.assertEqual(parser.mb_fsm.phase, PRE_FIGHT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for per-section memoization in parse_complete_game_state
+"""
+
+import unittest
+import sys
+import os
+import random
+
+# Add server_python directory to path to import game_state_parser
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+# ...and this directory for the shared memory fixtures
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from game_state_parser import SuperMetroidGameStateParser
+from memory_fixtures import make_memory
+
+
+class UnmemoizedParser(SuperMetroidGameStateParser):
+    """Reference parser that always recomputes every section"""
+
+    def _memoized(self, section, inputs, compute, stateful=False):
+        return compute()
+
+
+class TestParseMemoization(unittest.TestCase):
+
+    def test_unchanged_poll_reuses_section_outputs(self):
+        """Identical raw bytes return the previous output objects"""
+        parser = SuperMetroidGameStateParser()
+        first = parser.parse_complete_game_state(make_memory())
+        parser.parse_complete_game_state(make_memory())
+        third = parser.parse_complete_game_state(make_memory())
+        self.assertIs(third['items'], first['items'])
+        self.assertIs(third['beams'], first['beams'])
+        self.assertEqual(third, first)
+        self.assertGreaterEqual(parser.memo_hits['bosses'], 1)
+
+    def test_changed_bytes_are_reparsed(self):
+        """A changed field re-runs its section and everything that depends on it"""
+        parser = SuperMetroidGameStateParser()
+        first = parser.parse_complete_game_state(make_memory())
+        second = parser.parse_complete_game_state(make_memory(items=0x1006))
+        self.assertIs(second['beams'], first['beams'])
+        self.assertTrue(second['items']['spring'])
+        self.assertFalse(first['items']['spring'])
+
+    def test_live_views_are_not_mistaken_for_unchanged(self):
+        """memoryview inputs are keyed on a copy, so in-place changes are seen"""
+        parser = SuperMetroidGameStateParser()
+        items = bytearray(b'\x04\x10')
+        memory = make_memory()
+        memory['items'] = memoryview(items)
+        self.assertFalse(parser.parse_complete_game_state(memory)['items']['spring'])
+        items[0] |= 0x02
+        self.assertTrue(parser.parse_complete_game_state(memory)['items']['spring'])
+
+    def test_mb_state_change_invalidates_bosses(self):
+        """Resetting the Mother Brain cache is never hidden by a memoized result"""
+        parser = SuperMetroidGameStateParser()
+        parser.parse_complete_game_state(make_memory())
+        parser.parse_complete_game_state(make_memory())
+        parser.mb_fsm.set_flags(True, False, 'test')
+        misses = parser.memo_misses['bosses']
+        parser.parse_complete_game_state(make_memory())
+        self.assertEqual(parser.memo_misses['bosses'], misses + 1)
+
+    def test_matches_unmemoized_parser(self):
+        """A random poll sequence with repeats parses exactly like the reference"""
+        rng = random.Random(17)
+        snapshots = [make_memory(), make_memory(health=99, area=0, room=0x91F8),
+                     make_memory(area=5, room=0xDD58, mb_hp=18000), make_memory(area=5, room=0xDD58, mb_hp=0),
+                     make_memory(beams=0x100F, area=0, room=0x91F8), make_memory(bosses=0x0303)]
+        memoized, reference = SuperMetroidGameStateParser(), UnmemoizedParser()
+        for _ in range(200):
+            memory = rng.choice(snapshots)
+            self.assertEqual(memoized.parse_complete_game_state(memory), reference.parse_complete_game_state(memory))
+            self.assertEqual(memoized.mother_brain_phase_state, reference.mother_brain_phase_state)
+        self.assertGreater(sum(memoized.memo_hits.values()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
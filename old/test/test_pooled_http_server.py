@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled keep-alive HTTP front end
+"""
+
+import unittest
+import sys
+import os
+import json
+import logging
+import socket
+import threading
+import http.client
+
+# Add server_python directory to path to import pooled_http_server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from pooled_http_server import PooledHTTPServer
+from background_poller_server import BackgroundGamePoller, CacheServingHTTPHandler
+
+
+class TestPooledHTTPServer(unittest.TestCase):
+
+    def start_server(self, **kwargs):
+        self.poller = BackgroundGamePoller()
+
+        def handler_factory(*args, **handler_kwargs):
+            return CacheServingHTTPHandler(*args, poller=self.poller, **handler_kwargs)
+
+        self.server = PooledHTTPServer(('localhost', 0), handler_factory, **kwargs)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.sockets = []
+
+    def tearDown(self):
+        for sock in self.sockets:
+            sock.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.poller.backend.close()
+        logging.disable(logging.NOTSET)
+
+    def stalled_client(self):
+        """A client that connects and never finishes its request"""
+        sock = socket.create_connection(('localhost', self.port), timeout=5)
+        sock.sendall(b'GET /api/status HTTP/1.1\r\n')
+        self.sockets.append(sock)
+        return sock
+
+    def get(self, conn, path):
+        conn.request('GET', path)
+        response = conn.getresponse()
+        return response.status, response.read()
+
+    def test_keep_alive_reuses_the_connection(self):
+        self.start_server()
+        conn = http.client.HTTPConnection('localhost', self.port, timeout=5)
+        status, body = self.get(conn, '/api/status')
+        self.assertEqual(status, 200)
+        self.assertIn('poll_count', json.loads(body))
+        sock = conn.sock
+        self.assertIsNotNone(sock)
+        for path in ('/api/stats', '/api/http-stats', '/api/poll-stats', '/api/status'):
+            self.assertEqual(self.get(conn, path)[0], 200)
+            self.assertIs(conn.sock, sock)
+        conn.request('OPTIONS', '/api/status')
+        self.assertEqual(conn.getresponse().read(), b'')
+        self.assertEqual(self.get(conn, '/api/status')[0], 200)
+        self.assertIs(conn.sock, sock)
+        conn.close()
+
+    def test_stalled_client_does_not_block_others(self):
+        self.start_server(max_workers=4)
+        self.stalled_client()
+        conn = http.client.HTTPConnection('localhost', self.port, timeout=2)
+        self.assertEqual(self.get(conn, '/api/status')[0], 200)
+        conn.close()
+
+    def test_idle_keep_alive_clients_do_not_hold_workers(self):
+        # One more keep-alive client than workers, and no queue to hide in
+        self.start_server(max_workers=2, max_pending=0)
+        conns = [http.client.HTTPConnection('localhost', self.port, timeout=2) for _ in range(3)]
+        for conn in conns:
+            self.assertEqual(self.get(conn, '/api/status')[0], 200)
+        socks = [conn.sock for conn in conns]
+        for _ in range(3):
+            for conn, sock in zip(conns, socks):
+                self.assertEqual(self.get(conn, '/api/status')[0], 200)
+                self.assertIs(conn.sock, sock)
+        stats = self.server.stats()
+        self.assertEqual(stats['connections_open'], 3)
+        self.assertEqual(stats['connections_rejected'], 0)
+        for conn in conns:
+            conn.close()
+
+    def test_full_pool_answers_503(self):
+        self.start_server(max_workers=1, max_pending=0)
+        self.stalled_client()
+        # Read the reply without sending: the server answers before reading a request
+        sock = socket.create_connection(('localhost', self.port), timeout=2)
+        self.sockets.append(sock)
+        self.assertTrue(sock.recv(1024).startswith(b'HTTP/1.1 503'))
+        self.assertEqual(self.server.stats()['connections_rejected'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
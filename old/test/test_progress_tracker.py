@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for the stateless decoder / stateful tracker split
+"""
+
+import unittest
+import sys
+import os
+import logging
+import threading
+
+# Add server_python directory to path to import the decoder and tracker
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+# ...and this directory for the shared memory fixtures
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from game_state_decoder import GameStateDecoder
+from game_state_parser import SuperMetroidGameStateParser
+from mother_brain_fsm import MB2_ACTIVE, PRE_FIGHT
+from progress_tracker import ProgressTracker, TrackerState
+from background_poller_server import BackgroundGamePoller
+from memory_fixtures import make_memory as make_raw_memory
+
+
+def make_memory(beams=0x100F, **kwargs):
+    return make_raw_memory(missiles=50, max_missiles=50, beams=beams, **kwargs)
+
+
+class TestGameStateDecoder(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_decode_is_independent_of_earlier_polls(self):
+        decoder = GameStateDecoder()
+        first = decoder.decode(make_memory())
+        decoder.decode(make_memory(area=5, room=56664, mb_hp=18000))
+        self.assertEqual(decoder.decode(make_memory()), first)
+        self.assertEqual(GameStateDecoder().decode(make_memory()), first)
+
+    def test_decode_matches_parser_without_tracked_flags(self):
+        parser = SuperMetroidGameStateParser()
+        game_state = parser.parse_complete_game_state(make_memory())
+        decoded = GameStateDecoder().decode(make_memory())
+        tracked = {'mother_brain_1', 'mother_brain_2', 'samus_ship'}
+        self.assertEqual({k: v for k, v in game_state['bosses'].items() if k not in tracked}, decoded['bosses'])
+        self.assertEqual(dict(game_state, bosses=decoded['bosses']), decoded)
+
+    def test_hyper_beam_only_when_told_mb2_is_done(self):
+        decoder = GameStateDecoder()
+        escape = make_memory(area=5, room=56867)
+        self.assertFalse(decoder.decode(escape)['beams']['hyper'])
+        beams = decoder.decode(escape, mb2_detected=True)['beams']
+        self.assertTrue(beams['hyper'])
+        self.assertFalse(beams['plasma'])
+
+
+class TestProgressTracker(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.parser = SuperMetroidGameStateParser()
+        self.tracker = self.parser.tracker
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_submitted_commands_wait_for_the_owner(self):
+        done = threading.Event()
+        thread = threading.Thread(target=lambda: (self.tracker.submit(
+            'complete', lambda tracker: tracker.set_mb_flags(True, True, 'test')), done.set()))
+        thread.start()
+        thread.join()
+        self.assertTrue(done.is_set())
+        self.assertFalse(self.parser.mb_fsm.mb2_detected)
+
+        bosses = self.parser.parse_complete_game_state(make_memory())['bosses']
+        self.assertTrue(bosses['mother_brain_1'])
+        self.assertTrue(bosses['mother_brain_2'])
+        self.assertEqual(self.tracker.apply_pending(), 0)
+
+    def test_commands_run_in_order_and_survive_failures(self):
+        calls = []
+        self.tracker.submit('first', lambda tracker: calls.append(1))
+        self.tracker.submit('broken', lambda tracker: 1 / 0)
+        self.tracker.submit('reset', lambda tracker: (tracker.reset_mb('test'), calls.append(2)))
+        self.assertEqual(self.tracker.apply_pending(), 3)
+        self.assertEqual(calls, [1, 2])
+
+    def test_state_round_trip(self):
+        self.tracker.set_mb_flags(True, False, 'test')
+        self.tracker.log_transitions('beams', {'ice': True})
+        phase = self.parser.mb_fsm.phase
+        self.assertEqual(phase, MB2_ACTIVE)
+        saved = self.tracker.state()
+        self.assertIsInstance(saved, TrackerState)
+
+        self.tracker.reset_mb('test')
+        self.tracker.reported_flags.clear()
+        self.assertEqual(self.parser.mb_fsm.phase, PRE_FIGHT)
+        self.tracker.restore(saved)
+        self.assertEqual(self.tracker.state(), saved)
+
+        # The restored tracker continues exactly like the original
+        other = ProgressTracker()
+        other.restore(saved)
+        self.assertEqual(other.mb_fsm.phase, phase)
+        other.set_mb_flags(True, True, 'test')
+        self.assertTrue(other.mb_fsm.mb2_detected)
+        self.assertEqual(self.parser.mb_fsm.phase, phase)
+
+
+class TestPollerCommands(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.poller = BackgroundGamePoller()
+
+    def tearDown(self):
+        self.poller.backend.close()
+        logging.disable(logging.NOTSET)
+
+    def test_reset_caches_runs_on_the_poll_thread(self):
+        parser = self.poller.parser
+        parser.tracker.set_mb_flags(True, True, 'test')
+        parser.parse_complete_game_state(make_memory())
+        self.poller.bootstrap_attempted = True
+
+        parser.tracker.submit('reset all caches', lambda tracker: self.poller.reset_caches())
+        self.assertTrue(parser.mb_fsm.mb1_detected)
+        parser.tracker.apply_pending()
+        self.assertFalse(parser.mb_fsm.mb1_detected)
+        self.assertEqual(parser.section_cache, {})
+        self.assertIsNone(self.poller.get_snapshot())
+        self.assertFalse(self.poller.bootstrap_attempted)
+
+
+if __name__ == '__main__':
+    unittest.main()
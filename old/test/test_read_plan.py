@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the coalesced memory read plan
+Verifies block merging and that sliced fields match individual reads
+"""
+
+import unittest
+import sys
+import os
+
+# Add server_python directory to path to import read_plan
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from read_plan import ReadPlan, ReadField, GAME_STATE_FIELDS, BOSS_FIELD_NAMES, coalesce_fields
+
+
+class InMemoryReader:
+    """Serves read_memory_range from a fake WRAM image and counts round trips"""
+
+    def __init__(self, fail_addresses=()):
+        self.wram = bytes((i * 7 + (i >> 8)) & 0xFF for i in range(0x20000))
+        self.fail_addresses = set(fail_addresses)
+        self.reads = []
+
+    def read_memory_range(self, start_address, size):
+        self.reads.append((start_address, size))
+        if start_address in self.fail_addresses:
+            return None
+        offset = start_address - 0x7E0000
+        return self.wram[offset:offset + size]
+
+
+class TestReadPlan(unittest.TestCase):
+
+    def test_game_state_plan_block_count(self):
+        """The poller's ~40 field reads collapse into a handful of block reads"""
+        plan = ReadPlan(GAME_STATE_FIELDS)
+        self.assertLessEqual(len(plan.blocks), 5)
+        for block in plan.blocks:
+            self.assertLessEqual(block.size, plan.max_block_size)
+        print(f"✅ {len(GAME_STATE_FIELDS)} fields → {len(plan.blocks)} blocks")
+
+    def test_sliced_fields_match_individual_reads(self):
+        """Every field sliced from a block equals a direct read of that field"""
+        reader = InMemoryReader()
+        plan = ReadPlan(GAME_STATE_FIELDS)
+        memory_data = plan.execute(reader)
+
+        self.assertEqual(len(reader.reads), len(plan.blocks))
+        for field in GAME_STATE_FIELDS:
+            self.assertEqual(memory_data[field.name], reader.read_memory_range(field.address, field.size),
+                             f"Mismatch for {field.name}")
+
+    def test_gap_tolerance(self):
+        """Fields further apart than the gap tolerance stay in separate blocks"""
+        fields = [ReadField('a', 0x100, 2), ReadField('b', 0x110, 2), ReadField('c', 0x1F0, 2)]
+        self.assertEqual(len(coalesce_fields(fields, gap_tolerance=16)), 2)
+        self.assertEqual(len(coalesce_fields(fields, gap_tolerance=0)), 3)
+        self.assertEqual(len(coalesce_fields(fields, gap_tolerance=0x100)), 1)
+
+    def test_max_block_size(self):
+        """Blocks never grow past max_block_size"""
+        fields = [ReadField(f'f{i}', 0x1000 + i * 2, 2) for i in range(100)]
+        blocks = coalesce_fields(fields, gap_tolerance=64, max_block_size=64)
+        self.assertEqual(len(blocks), 4)
+        self.assertTrue(all(block.size <= 64 for block in blocks))
+
+    def test_failed_block_yields_none(self):
+        """A failed block read marks only that block's fields as missing"""
+        plan = ReadPlan(GAME_STATE_FIELDS)
+        boss_block = next(b for b in plan.blocks if any(f.name == 'main_bosses' for f in b.fields))
+        memory_data = plan.execute(InMemoryReader(fail_addresses=[boss_block.address]))
+
+        self.assertIsNone(memory_data['main_bosses'])
+        self.assertIsNone(memory_data['event_flags'])
+        self.assertIsNotNone(memory_data['basic_stats'])
+
+    def test_boss_subset(self):
+        """The bootstrap subset plan reads only the boss fields"""
+        plan = ReadPlan(GAME_STATE_FIELDS).subset(BOSS_FIELD_NAMES)
+        memory_data = plan.execute(InMemoryReader())
+        self.assertEqual(set(memory_data), set(BOSS_FIELD_NAMES))
+        self.assertEqual(len(plan.blocks), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the zero-copy READ_CORE_MEMORY reply decoder
+"""
+
+import unittest
+import sys
+import os
+import socket
+
+# Add server_python directory to path to import response_decoder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from response_decoder import ReadReplyDecoder, locate_payload
+
+
+def load(decoder, reply):
+    """Place a reply in the decoder's receive buffer as recv_into would"""
+    decoder.buffer[:len(reply)] = reply
+    return len(reply)
+
+
+class TestReadReplyDecoder(unittest.TestCase):
+
+    def setUp(self):
+        self.decoder = ReadReplyDecoder()
+
+    def test_decode_payload(self):
+        """Hex payload is decoded and trailing newline ignored"""
+        nbytes = load(self.decoder, b"READ_CORE_MEMORY 7e09c2 23 00 e7 03\n")
+        self.assertEqual(self.decoder.address(nbytes), 0x7E09C2)
+        self.assertEqual(self.decoder.decode(nbytes), b'\x23\x00\xe7\x03')
+
+    def test_echoed_address_is_validated(self):
+        """A reply for another address is rejected"""
+        nbytes = load(self.decoder, b"READ_CORE_MEMORY 7e079b 68 dd")
+        self.assertIsNone(self.decoder.decode(nbytes, expected_address=0x7E09C2))
+        self.assertEqual(self.decoder.decode(nbytes, expected_address=0x7E079B), b'\x68\xdd')
+
+    def test_error_and_foreign_replies(self):
+        """Error replies and non-memory replies decode to None"""
+        nbytes = load(self.decoder, b"READ_CORE_MEMORY 7e0000 -1 no memory map defined")
+        self.assertEqual(locate_payload(self.decoder.buffer, nbytes)[0], 0x7E0000)
+        self.assertIsNone(self.decoder.decode(nbytes))
+        nbytes = load(self.decoder, b"GET_STATUS PLAYING super_nes,Super Metroid")
+        self.assertIsNone(self.decoder.address(nbytes))
+        self.assertIsNone(self.decoder.decode(nbytes))
+
+    def test_stale_bytes_beyond_reply_are_ignored(self):
+        """Only buffer[:nbytes] is decoded, even after a longer previous reply"""
+        load(self.decoder, b"READ_CORE_MEMORY 7e0900 " + b"ff " * 64)
+        nbytes = load(self.decoder, b"READ_CORE_MEMORY 7e0900 01 02")
+        self.assertEqual(self.decoder.decode(nbytes), b'\x01\x02')
+
+    def test_decode_into_caller_buffer(self):
+        """A decoded reply slice-assigns into a reassembly view without reallocating it"""
+        region = bytearray(8)
+        nbytes = load(self.decoder, b"READ_CORE_MEMORY 7e0902 aa bb cc")
+        memoryview(region)[2:5] = self.decoder.decode(nbytes, expected_address=0x7E0902)
+        self.assertEqual(region, bytearray(b'\x00\x00\xaa\xbb\xcc\x00\x00\x00'))
+
+    def test_recv_into_socket(self):
+        """Datagrams are received straight into the preallocated buffer"""
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            receiver.bind(('127.0.0.1', 0))
+            receiver.settimeout(1.0)
+            sender.sendto(b"READ_CORE_MEMORY 7e09c2 63 00", receiver.getsockname())
+            nbytes = self.decoder.recv_into(receiver)
+            self.assertEqual(self.decoder.decode(nbytes, 0x7E09C2), b'\x63\x00')
+        finally:
+            sender.close()
+            receiver.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
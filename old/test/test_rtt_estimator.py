@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for adaptive RTT-based command timeouts
+"""
+
+import unittest
+import sys
+import os
+
+# Add server_python directory to path to import rtt_estimator
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from rtt_estimator import RTTEstimator, command_type
+
+
+class TestRTTEstimator(unittest.TestCase):
+
+    def test_initial_timeout(self):
+        """Unmeasured command types use the initial RTO"""
+        estimator = RTTEstimator(initial_rto=1.0)
+        self.assertEqual(estimator.timeout("VERSION"), 1.0)
+
+    def test_timeout_converges_to_localhost_rtt(self):
+        """A steady 2 ms RTT pulls the timeout down to the floor"""
+        estimator = RTTEstimator(initial_rto=1.0, min_rto=0.02)
+        for _ in range(20):
+            estimator.observe("READ_CORE_MEMORY", 0.002)
+        self.assertAlmostEqual(estimator.timeout("READ_CORE_MEMORY"), 0.02)
+        # Other command types keep their own estimate
+        self.assertEqual(estimator.timeout("GET_STATUS"), 1.0)
+
+    def test_jitter_widens_timeout(self):
+        """Variance is part of the RTO (SRTT + 4 * RTTVAR)"""
+        estimator = RTTEstimator(min_rto=0.0)
+        for rtt in [0.005, 0.030] * 10:
+            estimator.observe("READ_CORE_MEMORY", rtt)
+        stats = estimator.stats()["READ_CORE_MEMORY"]
+        self.assertGreater(stats['rto_ms'], stats['srtt_ms'] + 2 * stats['rttvar_ms'])
+        self.assertEqual(stats['samples'], 20)
+
+    def test_backoff_doubles_and_is_capped(self):
+        """Timeouts back off exponentially up to max_rto"""
+        estimator = RTTEstimator(initial_rto=0.5, max_rto=2.0)
+        estimator.backoff("VERSION")
+        self.assertEqual(estimator.timeout("VERSION"), 1.0)
+        for _ in range(5):
+            estimator.backoff("VERSION")
+        self.assertEqual(estimator.timeout("VERSION"), 2.0)
+        self.assertEqual(estimator.stats()["VERSION"]['timeouts'], 6)
+
+    def test_command_type(self):
+        """Commands are keyed by name"""
+        self.assertEqual(command_type("READ_CORE_MEMORY 0x7E09C2 22"), "READ_CORE_MEMORY")
+        self.assertEqual(command_type("VERSION"), "VERSION")
+
+
+if __name__ == '__main__':
+    unittest.main()
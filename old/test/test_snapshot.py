@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact game state snapshots
+"""
+
+import unittest
+import sys
+import os
+import json
+import logging
+
+# Add server_python directory to path to import snapshot
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+# ...and this directory for the shared memory fixtures
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from snapshot import BOSS_FLAGS, FlagTable, GameSnapshot
+from game_state_parser import SuperMetroidGameStateParser
+from background_poller_server import BackgroundGamePoller
+from memory_fixtures import make_memory as make_raw_memory
+
+
+def make_memory(**kwargs):
+    return make_raw_memory(boss_plus_3=1, **kwargs)
+
+
+class TestGameSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.parser = SuperMetroidGameStateParser()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_round_trip_matches_parser_output(self):
+        """to_dict reproduces the parsed dict, key order included"""
+        for memory in (make_memory(), make_memory(items=0xF32F, beams=0x100F, area=2, room=0xA59F),
+                       make_memory(health=50, items=0, beams=0, bosses=0)):
+            game_state = self.parser.parse_complete_game_state(memory)
+            snapshot = GameSnapshot.from_game_state(game_state)
+            self.assertEqual(json.dumps(snapshot.to_dict()), json.dumps(game_state))
+            self.assertEqual(json.loads(snapshot.to_json()), game_state)
+
+    def test_word_and_flag_access(self):
+        game_state = self.parser.parse_complete_game_state(make_memory())
+        snapshot = GameSnapshot.from_game_state(game_state, timestamp=12.5, poll=3)
+        self.assertEqual(snapshot.health, 300)
+        self.assertEqual(snapshot.room_id, 0x9F11)
+        self.assertEqual(snapshot.area_name, game_state['area_name'])
+        self.assertTrue(snapshot.items['morph'])
+        self.assertFalse(snapshot.items['varia'])
+        self.assertTrue(snapshot.bosses['phantoon'])
+        self.assertEqual(snapshot.bosses, game_state['bosses'])
+        self.assertEqual((snapshot.timestamp, snapshot.poll), (12.5, 3))
+        with self.assertRaises(AttributeError):
+            snapshot.not_a_field
+
+    def test_missing_sections_are_omitted(self):
+        """Flags a section did not report are absent, not False"""
+        game_state = self.parser.parse_complete_game_state(make_memory())
+        del game_state['bosses']['bomb_torizo']
+        game_state['items'] = {}
+        snapshot = GameSnapshot.from_game_state(game_state)
+        self.assertNotIn('bomb_torizo', snapshot.bosses)
+        self.assertEqual(len(snapshot.items), 0)
+        with self.assertRaises(KeyError):
+            snapshot.bosses['bomb_torizo']
+        self.assertEqual(snapshot.to_dict(), game_state)
+
+    def test_unknown_flag_names_extend_the_table(self):
+        """Custom boss rules (BOSS_RULES_FILE) can add names"""
+        table = FlagTable(['a', 'b'])
+        view = table.pack({'b': True, 'c': True})
+        self.assertEqual(table.names, ('a', 'b', 'c'))
+        self.assertEqual(dict(view), {'b': True, 'c': True})
+        self.assertIs(BOSS_FLAGS.pack({'kraid': True}).table, BOSS_FLAGS)
+
+    def test_same_state_ignores_timestamps(self):
+        game_state = self.parser.parse_complete_game_state(make_memory())
+        first = GameSnapshot.from_game_state(game_state, timestamp=1.0, poll=1)
+        again = GameSnapshot.from_game_state(game_state, timestamp=2.0, poll=2)
+        changed = GameSnapshot.from_game_state(self.parser.parse_complete_game_state(make_memory(health=299)))
+        self.assertTrue(first.same_state(again))
+        self.assertFalse(first.same_state(changed))
+        self.assertFalse(first.same_state(None))
+
+
+class TestPollerSnapshotCache(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.poller = BackgroundGamePoller(history_size=3)
+        self.parser = SuperMetroidGameStateParser()
+
+    def tearDown(self):
+        self.poller.backend.close()
+        logging.disable(logging.NOTSET)
+
+    def poll(self, **memory):
+        game_state = self.parser.parse_complete_game_state(make_memory(**memory))
+        with self.poller.cache_lock:
+            self.poller._store_snapshot(game_state, 0.0)
+            self.poller.cache['poll_count'] += 1
+        return game_state
+
+    def test_unchanged_polls_share_one_snapshot(self):
+        self.poll()
+        snapshot = self.poller.get_snapshot()
+        self.poll()
+        self.assertIs(self.poller.get_snapshot(), snapshot)
+        self.assertEqual(len(self.poller.get_history()), 1)
+
+    def test_history_is_bounded(self):
+        for health in range(300, 306):
+            self.poll(health=health)
+        history = self.poller.get_history()
+        self.assertEqual([snapshot.health for snapshot in history], [303, 304, 305])
+        self.assertEqual([snapshot.poll for snapshot in history], [4, 5, 6])
+        self.assertEqual([snapshot.health for snapshot in self.poller.get_history(2)], [304, 305])
+
+    def test_cached_state_expands_to_dict(self):
+        self.assertEqual(self.poller.get_cached_state()['stats'], {})
+        game_state = self.poll()
+        self.assertEqual(self.poller.get_cached_state()['stats'], game_state)
+
+
+if __name__ == '__main__':
+    unittest.main()
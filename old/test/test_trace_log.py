@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the parser trace ring buffer and transition-only logging
+"""
+
+import unittest
+import sys
+import os
+
+# Add server_python directory to path to import trace_log
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from trace_log import TraceBuffer
+from game_state_parser import SuperMetroidGameStateParser
+
+
+class CountingArg:
+    """Counts how often it is formatted"""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "arg"
+
+
+class TestTraceBuffer(unittest.TestCase):
+
+    def test_ring_keeps_last_polls(self):
+        """Only the last max_polls polls are kept, oldest first"""
+        trace = TraceBuffer(max_polls=3, enabled=True)
+        for poll in range(5):
+            trace.begin_poll()
+            trace.record('beams', "poll %d", poll)
+        dump = trace.dump()
+        self.assertEqual([p['poll'] for p in dump], [3, 4, 5])
+        self.assertEqual(dump[-1]['records'][0]['message'], "poll 4")
+        self.assertEqual([p['poll'] for p in trace.dump(polls=1)], [5])
+
+    def test_formatting_is_lazy(self):
+        """Arguments are only formatted when the buffer is dumped"""
+        trace = TraceBuffer(enabled=True)
+        arg = CountingArg()
+        trace.begin_poll()
+        trace.record('ship', "value=%s", arg)
+        self.assertEqual(arg.formatted, 0)
+        self.assertEqual(trace.dump()[0]['records'][0]['message'], "value=arg")
+        self.assertEqual(arg.formatted, 1)
+
+    def test_disabled_and_capped(self):
+        """A disabled buffer records nothing; a full poll counts dropped records"""
+        trace = TraceBuffer(enabled=False)
+        trace.begin_poll()
+        trace.record('bosses', "ignored")
+        self.assertEqual(trace.dump(), [])
+
+        trace = TraceBuffer(max_records_per_poll=2, enabled=True)
+        trace.begin_poll()
+        for i in range(5):
+            trace.record('bosses', "r%d", i)
+        self.assertEqual(len(trace.dump()[0]['records']), 2)
+        self.assertEqual(trace.stats()['records_dropped'], 3)
+        self.assertEqual(trace.dump(channel='ship')[0]['records'], [])
+
+    def test_parser_logs_only_transitions(self):
+        """Diagnostics land in the trace; the logger only sees flags that change"""
+        parser = SuperMetroidGameStateParser()
+        parser.trace.enabled = True
+        memory_data = {'basic_stats': bytes([200, 0]) + bytes(20), 'items': b'\x00\x00', 'beams': b'\x00\x10',
+                       'main_bosses': b'\x01\x00', 'room_id': b'\x00\x00', 'area_id': b'\x01'}
+
+        with self.assertLogs('game_state_parser', level='INFO') as logs:
+            parser.parse_complete_game_state(memory_data)
+            parser.parse_complete_game_state(memory_data)
+            memory_data['beams'] = b'\x02\x10'
+            parser.parse_complete_game_state(memory_data)
+        messages = [record.getMessage() for record in logs.records]
+        self.assertEqual(sum('bosses: mother_brain already set' in m for m in messages), 1)
+        self.assertEqual(sum('beams: ice set' in m for m in messages), 1)
+        self.assertFalse(any('Raw beam value' in m for m in messages))
+
+        channels = {record['channel'] for poll in parser.trace.dump() for record in poll['records']}
+        self.assertTrue({'beams', 'bosses', 'ship'} <= channels)
+
+
+if __name__ == '__main__':
+    unittest.main()
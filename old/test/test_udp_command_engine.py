@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests for the pipelined RetroArch UDP command engine
+Uses a small local UDP responder that reorders and drops replies
+"""
+
+import unittest
+import sys
+import os
+import socket
+import threading
+import time
+
+# Add server_python directory to path to import udp_command_engine
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from udp_command_engine import PipelinedUDPEngine, parse_read_reply, reply_matches_command, drain_socket, split_range, MAX_READ_CHUNK
+
+
+WRAM = bytes((i * 13 + 5) & 0xFF for i in range(0x20000))
+
+
+class ReorderingResponder:
+    """Answers READ_CORE_MEMORY in reverse batch order, dropping first attempts for some addresses"""
+
+    def __init__(self, batch_size, drop_first=()):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(0.05)
+        self.port = self.sock.getsockname()[1]
+        self.batch_size = batch_size
+        self.drop_first = set(drop_first)
+        self.received = []
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _reply(self, command, addr):
+        _, address_text, size_text = command.split(' ')
+        address, size = int(address_text, 16), int(size_text)
+        offset = address - 0x7E0000
+        hex_bytes = ' '.join(f'{b:02x}' for b in WRAM[offset:offset + size])
+        self.sock.sendto(f"READ_CORE_MEMORY {address:x} {hex_bytes}\n".encode(), addr)
+
+    def _serve(self):
+        batch = []
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(1024)
+            except socket.timeout:
+                # Flush whatever is queued once the client stops sending
+                for command in reversed(batch):
+                    self._reply(command, addr_seen)
+                batch = []
+                continue
+            addr_seen = addr
+            command = data.decode()
+            self.received.append(command)
+            address = int(command.split(' ')[1], 16)
+            if address in self.drop_first:
+                self.drop_first.discard(address)
+                continue
+            batch.append(command)
+            if len(batch) >= self.batch_size:
+                for queued in reversed(batch):
+                    self._reply(queued, addr)
+                batch = []
+
+    def close(self):
+        self.running = False
+        self.thread.join(timeout=1)
+        self.sock.close()
+
+
+class TestPipelinedUDPEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.client.settimeout(1.0)
+        self.responder = None
+
+    def tearDown(self):
+        self.client.close()
+        if self.responder:
+            self.responder.close()
+
+    def test_parse_read_reply(self):
+        """Replies are split into echoed address and payload"""
+        self.assertEqual(parse_read_reply("READ_CORE_MEMORY 7e09c2 23 00 e7 03"), (0x7E09C2, b'\x23\x00\xe7\x03'))
+        self.assertEqual(parse_read_reply("READ_CORE_MEMORY 0x7E09C2 23 00"), (0x7E09C2, b'\x23\x00'))
+        self.assertEqual(parse_read_reply("READ_CORE_MEMORY 7e0000 -1 no memory map defined"), (0x7E0000, None))
+        self.assertEqual(parse_read_reply("GET_STATUS PLAYING super_nes,Super Metroid"), (None, None))
+
+    def test_reply_matches_command(self):
+        """Stale replies to other commands are recognised and skipped"""
+        self.assertTrue(reply_matches_command("READ_CORE_MEMORY 0x7E09C2 22", "READ_CORE_MEMORY 7e09c2 23 00"))
+        self.assertFalse(reply_matches_command("READ_CORE_MEMORY 0x7E09C2 22", "READ_CORE_MEMORY 7e079b 68 dd"))
+        self.assertTrue(reply_matches_command("GET_STATUS", "GET_STATUS PLAYING super_nes,Super Metroid"))
+        self.assertFalse(reply_matches_command("GET_STATUS", "1.19.1"))
+        self.assertTrue(reply_matches_command("VERSION", "1.19.1"))
+        self.assertFalse(reply_matches_command("VERSION", "GET_STATUS PLAYING super_nes,Super Metroid"))
+
+    def test_drain_never_blocks(self):
+        """Draining an idle socket returns immediately; queued datagrams are discarded"""
+        self.client.bind(('127.0.0.1', 0))
+        start = time.monotonic()
+        self.assertEqual(drain_socket(self.client), 0)
+        self.assertLess(time.monotonic() - start, 0.01)
+
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            for _ in range(3):
+                sender.sendto(b"GET_STATUS PAUSED", self.client.getsockname())
+            time.sleep(0.05)
+            self.assertEqual(drain_socket(self.client), 3)
+        finally:
+            sender.close()
+
+    def test_out_of_order_replies_are_matched_by_address(self):
+        """Reversed replies still land in request order"""
+        ranges = [(0x7E079B, 5), (0x7E0900, 256), (0x7E0AF6, 6), (0x7E0F8C, 118), (0x7ED821, 14)]
+        self.responder = ReorderingResponder(batch_size=len(ranges))
+        engine = PipelinedUDPEngine('127.0.0.1', self.responder.port, timeout=0.5)
+
+        results = engine.read_many(self.client, ranges)
+
+        for (address, size), data in zip(ranges, results):
+            offset = address - 0x7E0000
+            self.assertEqual(data, WRAM[offset:offset + size])
+        print(f"✅ {len(ranges)} pipelined reads matched out of order")
+
+    def test_lost_reply_is_retried_individually(self):
+        """A dropped datagram only retries its own request"""
+        ranges = [(0x7E0900, 16), (0x7E0A00, 16), (0x7E0B00, 16)]
+        self.responder = ReorderingResponder(batch_size=1, drop_first=[0x7E0A00])
+        engine = PipelinedUDPEngine('127.0.0.1', self.responder.port, timeout=0.1, max_retries=2)
+
+        start = time.monotonic()
+        results = engine.read_many(self.client, ranges)
+        elapsed = time.monotonic() - start
+
+        self.assertTrue(all(data is not None for data in results))
+        self.assertEqual(sum('0x7E0A00' in c for c in self.responder.received), 2)
+        self.assertEqual(sum('0x7E0900' in c for c in self.responder.received), 1)
+        self.assertLess(elapsed, 0.5)
+
+    def test_unanswered_reads_time_out(self):
+        """Reads with no responder give up after retries and return None"""
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(('127.0.0.1', 0))
+        try:
+            engine = PipelinedUDPEngine('127.0.0.1', silent.getsockname()[1], timeout=0.05, max_retries=1)
+            results = engine.read_many(self.client, [(0x7E0900, 2), (0x7E0902, 2)])
+            self.assertEqual(results, [None, None])
+        finally:
+            silent.close()
+
+    def test_split_range(self):
+        """Large reads split into consecutive chunks with a short tail"""
+        self.assertEqual(split_range(0x7ED800, 1200, 512), [(0x7ED800, 512), (0x7EDA00, 512), (0x7EDC00, 176)])
+        self.assertEqual(split_range(0x7E0900, 256, 512), [(0x7E0900, 256)])
+
+    def test_large_read_is_chunked_and_reassembled(self):
+        """Reads beyond one reply are pipelined in chunks and reassembled in order"""
+        ranges = [(0x7ED800, 0x900), (0x7E09A2, 2)]
+        self.responder = ReorderingResponder(batch_size=3)
+        engine = PipelinedUDPEngine('127.0.0.1', self.responder.port, timeout=0.5)
+
+        results = engine.read_many(self.client, ranges)
+
+        self.assertEqual(results[0], WRAM[0xD800:0xD800 + 0x900])
+        self.assertEqual(results[1], WRAM[0x9A2:0x9A4])
+        expected_chunks = -(-0x900 // MAX_READ_CHUNK) + 1
+        self.assertEqual(len(self.responder.received), expected_chunks)
+        print(f"✅ {0x900}-byte read reassembled from {expected_chunks - 1} chunks")
+
+    def test_lost_reply_costs_milliseconds_once_warmed_up(self):
+        """After measuring localhost RTTs, a dropped datagram is retried well under the initial 1 s"""
+        self.responder = ReorderingResponder(batch_size=1)
+        engine = PipelinedUDPEngine('127.0.0.1', self.responder.port, timeout=1.0, max_retries=2)
+        for _ in range(10):
+            engine.read_many(self.client, [(0x7E0900, 16)])
+
+        self.responder.drop_first.add(0x7E0A00)
+        start = time.monotonic()
+        results = engine.read_many(self.client, [(0x7E0A00, 16)])
+        elapsed = time.monotonic() - start
+
+        self.assertIsNotNone(results[0])
+        self.assertLess(elapsed, 0.3)
+        print(f"✅ Lost reply recovered in {elapsed * 1000:.0f} ms "
+              f"(RTO {engine.rtt.stats()['READ_CORE_MEMORY']['rto_ms']} ms)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the scheduled WRAM mirror
+Checks refresh scheduling, stale-region handling and change tracking
+"""
+
+import unittest
+import sys
+import os
+import time
+
+# Add server_python directory to path to import wram_mirror
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_python'))
+
+from wram_mirror import WramMirror, MirrorRegion, DEFAULT_REGIONS
+from read_plan import ReadPlan, GAME_STATE_FIELDS
+
+
+class FakeWramReader:
+    """Batched reader over a mutable fake WRAM image that records every range"""
+
+    def __init__(self):
+        self.wram = bytearray((i * 11 + 3) & 0xFF for i in range(0x20000))
+        self.fail_addresses = set()
+        self.reads = []
+
+    def read_many(self, ranges):
+        self.reads.extend(ranges)
+        return [None if address in self.fail_addresses else bytes(self.wram[address - 0x7E0000:address - 0x7E0000 + size])
+                for address, size in ranges]
+
+
+class TestWramMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.regions = (
+            MirrorRegion('hot', 0x7E0900, 0x200, 0.0),
+            MirrorRegion('cold', 0x7ED800, 0x100, 3600.0),
+        )
+        self.mirror = WramMirror(self.regions)
+        self.reader = FakeWramReader()
+
+    def test_hot_regions_refresh_every_call(self):
+        """Cold regions are read once, hot regions on every refresh"""
+        self.assertEqual(self.mirror.refresh(self.reader), ['hot', 'cold'])
+        self.assertEqual(self.mirror.refresh(self.reader), ['hot'])
+        self.assertEqual(self.mirror.refresh(self.reader), ['hot'])
+        self.assertEqual(self.reader.reads.count((0x7ED800, 0x100)), 1)
+
+    def test_reads_come_from_mirror(self):
+        """Mirror reads cost no emulator traffic and match WRAM"""
+        self.mirror.refresh(self.reader)
+        reads_before = len(self.reader.reads)
+        self.assertEqual(self.mirror.read_memory_range(0x7E09A4, 4), bytes(self.reader.wram[0x9A4:0x9A8]))
+        self.assertEqual(self.mirror.read_memory_range(0x7ED828, 2), bytes(self.reader.wram[0xD828:0xD82A]))
+        self.assertEqual(len(self.reader.reads), reads_before)
+
+    def test_unmirrored_and_stale_ranges_return_none(self):
+        """Never-loaded ranges and regions whose last refresh failed are not served"""
+        self.assertIsNone(self.mirror.read_memory_range(0x7E09A4, 2))
+        self.mirror.refresh(self.reader)
+        self.assertIsNone(self.mirror.read_memory_range(0x7E0000, 2))
+
+        self.reader.fail_addresses.add(0x7E0900)
+        self.mirror.refresh(self.reader)
+        self.assertIsNone(self.mirror.read_memory_range(0x7E09A4, 2))
+        self.assertIsNotNone(self.mirror.read_memory_range(0x7ED828, 2))
+        self.assertEqual(self.mirror.stats()['hot']['failures'], 1)
+
+    def test_failing_region_backs_off(self):
+        """A failing cold region is retried after a growing delay, not on every call"""
+        mirror = WramMirror((MirrorRegion('hot', 0x7E0900, 0x200, 0.0),
+                             MirrorRegion('sweep', 0x7E0000, 0x20000, 60.0)))
+        self.reader.fail_addresses.add(0x7E0000)
+        mirror.refresh(self.reader)
+        now = time.monotonic()
+        self.assertEqual([r.name for r in mirror.due_regions(now)], ['hot'])
+        self.assertEqual(mirror.due_regions(now + 1.0)[-1].name, 'sweep')
+
+        mirror.refresh(self.reader, force=True)
+        self.assertEqual([r.name for r in mirror.due_regions(time.monotonic() + 1.5)], ['hot'])
+        self.assertEqual(mirror.stats()['sweep']['consecutive_failures'], 2)
+
+        self.reader.fail_addresses.clear()
+        mirror.refresh(self.reader, force=True)
+        self.assertEqual([r.name for r in mirror.due_regions()], ['hot'])
+        self.assertEqual(mirror.stats()['sweep']['consecutive_failures'], 0)
+
+    def test_only_hot_failures_invalidate_reader_info(self):
+        """A failing cold region leaves the reader's connection probe alone"""
+        invalidations = []
+        self.reader.invalidate_info = invalidations.append
+        self.reader.fail_addresses.add(0x7ED800)
+        self.mirror.refresh(self.reader)
+        self.assertEqual(invalidations, [])
+        self.reader.fail_addresses.add(0x7E0900)
+        self.mirror.refresh(self.reader)
+        self.assertEqual(len(invalidations), 1)
+
+    def test_change_tracking(self):
+        """Changed refreshes and differing bytes are counted per region"""
+        self.mirror.refresh(self.reader)
+        self.mirror.refresh(self.reader)
+        self.reader.wram[0x9C2:0x9C4] = b'\x00\x00'
+        self.mirror.refresh(self.reader)
+
+        stats = self.mirror.stats()['hot']
+        self.assertEqual(stats['refreshes'], 3)
+        self.assertEqual(stats['changes'], 1)
+        self.assertEqual(stats['bytes_changed_last'], 2)
+        self.assertGreater(stats['change_rate'], 0)
+        self.assertEqual(self.mirror.read_memory_range(0x7E09C2, 2), b'\x00\x00')
+
+    def test_regions_outside_wram_rejected(self):
+        """Regions must lie within 0x7E0000-0x7FFFFF"""
+        with self.assertRaises(ValueError):
+            WramMirror([MirrorRegion('bad', 0x7FFFF0, 0x20, 0.0)])
+
+    def test_default_hot_regions_cover_game_state_fields(self):
+        """The parser's read plan runs against the mirror with identical results"""
+        mirror = WramMirror(DEFAULT_REGIONS)
+        mirror.refresh(self.reader)
+        hot = [region for region in DEFAULT_REGIONS if region.interval == 0]
+        for field in GAME_STATE_FIELDS:
+            self.assertTrue(any(r.address <= field.address and field.end <= r.address + r.size for r in hot),
+                            f"{field.name} is not in a hot region")
+
+        plan = ReadPlan(GAME_STATE_FIELDS)
+        self.assertEqual(plan.execute(mirror), plan.execute(self.reader))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,18 +10,14 @@ import threading
 import time
 import logging
 import sys
+import os
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from super_metroid_udp_tracker import SuperMetroidUDPTracker
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('tracker_server.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Shared logging setup lives with the background poller server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server_python'))
+from logging_setup import setup_logging
+
 logger = logging.getLogger(__name__)
 
 class TrackerHandler(BaseHTTPRequestHandler):
@@ -278,6 +274,8 @@ class TrackerWebServer:
 
 def main():
     """Start the tracker web server with auto-restart"""
+    setup_logging('tracker_server.log')
+    
     max_restarts = 5
     restart_count = 0
     
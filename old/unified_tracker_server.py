@@ -7,7 +7,6 @@ SIMPLIFIED: No more separate processes or complex state management
 
 import json
 import socket
-import struct
 import time
 import logging
 import sys
@@ -20,15 +19,14 @@ import os
 import sys
 import signal
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('unified_tracker.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Shared RetroArch protocol helpers live with the background poller server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server_python'))
+from udp_command_engine import MAX_READ_CHUNK, drain_socket, reply_buffer_size, reply_matches_command, split_range
+from rtt_estimator import RTTEstimator, command_type
+from memory_layout import STATS_BLOCK, TRACKER_ALIASES, WORD, memory_map
+from bitfield_tables import decode_beams, decode_items
+from logging_setup import logging_stats, setup_logging
+
 logger = logging.getLogger(__name__)
 
 class UnifiedSuperMetroidTracker:
@@ -42,28 +40,7 @@ class UnifiedSuperMetroidTracker:
         self.last_successful_read = 0
         
         # Super Metroid memory addresses
-        self.memory_map = {
-            'health': 0x7E09C2,
-            'max_health': 0x7E09C4,
-            'missiles': 0x7E09C6,
-            'max_missiles': 0x7E09C8,
-            'supers': 0x7E09CA,
-            'max_supers': 0x7E09CC,
-            'power_bombs': 0x7E09CE,
-            'max_power_bombs': 0x7E09D0,
-            'reserve_energy': 0x7E09D6,
-            'max_reserve_energy': 0x7E09D4,
-            'game_state': 0x7E0998,
-            'room_id': 0x7E079B,
-            'area_id': 0x7E079F,
-            'player_x': 0x7E0AF6,
-            'player_y': 0x7E0AFA,
-            'items_collected': 0x7E09A4,
-            'beams_collected': 0x7E09A8,
-            'bosses_defeated': 0x7ED828,
-            'crocomire_defeated': 0x7ED829,
-            'events_flags': 0x7ED870,
-        }
+        self.memory_map = memory_map(aliases=TRACKER_ALIASES)
         
         self.areas = {
             0: "Crateria", 1: "Brinstar", 2: "Norfair",
@@ -79,6 +56,9 @@ class UnifiedSuperMetroidTracker:
             'state': 'closed'        # closed, open, half_open
         }
         
+        # Adaptive per-command UDP timeouts (replaces the fixed 1.5s wait)
+        self.rtt = RTTEstimator(initial_rto=1.5)
+        
         # Health monitoring
         self.health_status = {
             'last_successful_read': time.time(),
@@ -140,7 +120,9 @@ class UnifiedSuperMetroidTracker:
             'consecutive_failures': self.health_status['consecutive_failures'],
             'time_since_last_success': time_since_success,
             'circuit_breaker_state': self.circuit_breaker['state'],
-            'circuit_breaker_failures': self.circuit_breaker['failure_count']
+            'circuit_breaker_failures': self.circuit_breaker['failure_count'],
+            'udp_timing': self.rtt.stats(),
+            'logging': logging_stats()
         }
             
     def connect_udp(self) -> bool:
@@ -171,19 +153,27 @@ class UnifiedSuperMetroidTracker:
                     return None
                     
             try:
-                # Clear any pending data first
-                self.udp_sock.settimeout(0.1)
-                try:
-                    while True:
-                        self.udp_sock.recv(1024)
-                except socket.timeout:
-                    pass
+                # Clear any pending data first - zero-timeout drain, never blocks
+                drain_socket(self.udp_sock)
                 
-                # Set normal timeout and send command
-                self.udp_sock.settimeout(1.5)
+                # Send command and wait for the reply that belongs to it;
+                # stale replies to earlier commands are discarded, not slept on
                 self.udp_sock.sendto(command.encode(), (self.retroarch_host, self.retroarch_port))
-                data, addr = self.udp_sock.recvfrom(1024)
-                response = data.decode().strip()
+                sent_at = time.monotonic()
+                deadline = sent_at + self.rtt.timeout(command_type(command))
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise socket.timeout()
+                    self.udp_sock.settimeout(remaining)
+                    data, addr = self.udp_sock.recvfrom(reply_buffer_size(MAX_READ_CHUNK))
+                    response = data.decode().strip()
+                    if reply_matches_command(command, response):
+                        # Karn's algorithm - only unambiguous first attempts are sampled
+                        if attempt == 0:
+                            self.rtt.observe(command_type(command), time.monotonic() - sent_at)
+                        break
+                    logger.debug(f"Discarding stale reply for {command}: {response[:40]}")
                 
                 # Validate response makes sense for command
                 if command == "VERSION" and response.startswith("GET_STATUS"):
@@ -200,6 +190,7 @@ class UnifiedSuperMetroidTracker:
                 return response
                 
             except socket.timeout:
+                self.rtt.backoff(command_type(command))
                 logger.warning(f"RetroArch command timeout: {command} (attempt {attempt + 1})")
                 self.connect_udp()  # Fresh socket for retry
             except Exception as e:
@@ -233,6 +224,16 @@ class UnifiedSuperMetroidTracker:
         
     def read_memory_range(self, start_address: int, size: int) -> Optional[bytes]:
         """Read memory range from RetroArch"""
+        if size > MAX_READ_CHUNK:
+            # Larger than one reply can carry - read chunk by chunk and reassemble
+            data = bytearray()
+            for chunk_address, chunk_size in split_range(start_address, size):
+                chunk = self.read_memory_range(chunk_address, chunk_size)
+                if chunk is None or len(chunk) != chunk_size:
+                    return None
+                data += chunk
+            return bytes(data)
+            
         command = f"READ_CORE_MEMORY 0x{start_address:X} {size}"
         response = self.send_retroarch_command(command)
         
@@ -252,7 +253,7 @@ class UnifiedSuperMetroidTracker:
         """Read 16-bit word from memory"""
         data = self.read_memory_range(address, 2)
         if data and len(data) >= 2:
-            return struct.unpack('<H', data[:2])[0]
+            return WORD.unpack_from(data)[0]
         return None
         
     def read_byte(self, address: int) -> Optional[int]:
@@ -267,24 +268,13 @@ class UnifiedSuperMetroidTracker:
         try:
             # Read core stats
             base_address = self.memory_map['health']
-            data = self.read_memory_range(base_address, 22)
+            data = self.read_memory_range(base_address, STATS_BLOCK.size)
             
-            if not data or len(data) < 22:
+            if not data or len(data) < STATS_BLOCK.size:
                 self.update_health_status(False)
                 return {}
                 
-            stats = {
-                'health': struct.unpack('<H', data[0:2])[0],
-                'max_health': struct.unpack('<H', data[2:4])[0],
-                'missiles': struct.unpack('<H', data[4:6])[0],
-                'max_missiles': struct.unpack('<H', data[6:8])[0],
-                'supers': struct.unpack('<H', data[8:10])[0],
-                'max_supers': struct.unpack('<H', data[10:12])[0],
-                'power_bombs': struct.unpack('<H', data[12:14])[0],
-                'max_power_bombs': struct.unpack('<H', data[14:16])[0],
-                'max_reserve_energy': struct.unpack('<H', data[18:20])[0],
-                'reserve_energy': struct.unpack('<H', data[20:22])[0],
-            }
+            stats = STATS_BLOCK.unpack(data)
             
             # Read location data
             stats['room_id'] = self.read_word(self.memory_map['room_id']) or 0
@@ -299,33 +289,9 @@ class UnifiedSuperMetroidTracker:
             beams_data = self.read_word(self.memory_map['beams_collected'])
             bosses_data = self.read_word(self.memory_map['bosses_defeated'])
             
-            # Parse items
-            stats['items'] = {}
-            if items_data is not None:
-                stats['items'] = {
-                    'morph': bool(items_data & 0x04),
-                    'bombs': bool(items_data & 0x1000),
-                    'varia': bool(items_data & 0x01),
-                    'gravity': bool(items_data & 0x20),
-                    'hijump': bool(items_data & 0x100),
-                    'speed': bool(items_data & 0x2000),
-                    'space': bool(items_data & 0x200),
-                    'screw': bool(items_data & 0x08),
-                    'spring': bool(items_data & 0x02),
-                    'xray': bool(items_data & 0x8000),
-                    'grapple': bool(items_data & 0x4000),
-                }
-                
-            # Parse beams
-            stats['beams'] = {}
-            if beams_data is not None:
-                stats['beams'] = {
-                    'charge': bool(beams_data & 0x1000),
-                    'ice': bool(beams_data & 0x02),
-                    'wave': bool(beams_data & 0x01),
-                    'spazer': bool(beams_data & 0x04),
-                    'plasma': bool(beams_data & 0x08),
-                }
+            # Parse items and beams (shared mappings from the decode tables)
+            stats['items'] = decode_items(items_data)
+            stats['beams'] = decode_beams(beams_data)
                 
             # Parse bosses with our fixed logic
             stats['bosses'] = {}
@@ -613,6 +579,9 @@ class UnifiedTrackerServer:
 
 def main():
     """Start the unified server with auto-restart"""
+    # Queue-based logging: file/terminal I/O happens off the polling thread
+    setup_logging('unified_tracker.log')
+    
     max_restarts = 3
     restart_count = 0
     